@@ -0,0 +1,130 @@
+###########################################################################
+###########################################################################
+#
+# Alex Heinrich
+# Batch Evaluation
+# Solves each row of a CSV file of parameter sets, streaming it in chunks.
+#
+###########################################################################
+###########################################################################
+
+###########################################################################
+# Default Defined Parameters
+# These are variables that may be adjusted in the program.
+
+import io
+import csv
+import itertools
+import argparse
+import numpy as np
+from Circuit_Models import model_defaults, solve, result_unit, column_title
+from Circuit_Sweep import parameter_unit
+
+batch_rows = 2**14 # Rows read and solved at once, so memory stays the same however long the file.
+
+
+###########################################################################
+# Columns
+# Titles may be parameter names (tuning_capacitance) or export titles (Tuning capacitance [F]). Other columns, such as names of builds,
+# are copied to the output unchanged. Parameters left empty, or without a column, take the defaults of the circuit.
+# Impedance columns may be complex (50+10j), and are written as real and imaginary parts.
+
+def column_name(title):
+    """ Returns the parameter name of a column title. """
+    return title.split("[")[0].strip().replace(" ", "_").lower()
+
+def column_type(name):
+    """ Returns the type of a parameter column: complex for impedances, float otherwise. """
+    return complex if name.endswith("impedance") else float
+
+def parse_column(cells, default, kind=float):
+    """ Returns a column of cells as floats, or complex numbers, with empty cells as the default and unreadable ones as nan. """
+    cells = [cell.replace(" ", "") or default for cell in cells]
+    try:
+        return np.asarray([kind(cell) for cell in cells], dtype=kind)
+    except ValueError:
+        values = np.empty(len(cells), dtype=kind)
+        for i, cell in enumerate(cells):
+            try:
+                values[i] = kind(cell)
+            except ValueError:
+                values[i] = np.nan
+        return values
+
+def read_chunks(data_file, topology, delimiter=None, chunk=None):
+    """ Yields (text columns, parameter columns) of the rows of a CSV file, chunk by chunk. """
+    chunk = batch_rows if chunk is None else chunk
+    header = data_file.readline()
+    delimiter = ("\t" if "\t" in header else ",") if delimiter is None else delimiter
+    titles = next(csv.reader([header], delimiter=delimiter))
+    names = [column_name(title) for title in titles]
+    if topology in model_defaults and len(set(names) & set(model_defaults[topology])) == 0:
+        raise ValueError(f"No column names a {topology} parameter. Columns: {', '.join(titles)}")
+    rows = csv.reader(data_file, delimiter=delimiter)
+    while True:
+        block = list(itertools.islice(rows, chunk))
+        if not block:
+            return
+        block = [row for row in block if row] # Blank lines are skipped.
+        if not block:
+            continue
+        width = len(titles)
+        block = [row + [""] * (width - len(row)) for row in block]
+        cells = list(zip(*block))
+        text = {titles[i]: cells[i] for i in range(width) if names[i] not in model_defaults[topology]}
+        parameters = {names[i]: parse_column(cells[i], str(model_defaults[topology][names[i]]), column_type(names[i])) for i in range(width) if names[i] in model_defaults[topology]}
+        yield text, parameters
+
+
+###########################################################################
+# Evaluation
+
+def evaluate_csv(input_name, topology="probe", output_name="=batch.txt", delimiter=None, chunk=None):
+    """ Solves every row of a CSV file of parameters, appending each chunk's results to a tab separated text file as it goes. Returns the number of rows. """
+    rows = 0
+    with open(input_name, 'r', encoding='utf-8', newline='') as data_file, open(output_name, 'w', encoding='utf-8') as output_file:
+        for text, parameters in read_chunks(data_file, topology, delimiter, chunk):
+            results = solve(topology, parameters)
+            if rows == 0: # Titles follow the columns of the first chunk.
+                titles = list(text)
+                for name in parameters:
+                    parts = ["real", "imaginary"] if column_type(name) is complex else [None]
+                    titles += [column_title(name, parameter_unit(name), part) for part in parts]
+                for name in results:
+                    titles += [column_title(name, result_unit(name), part) for part in ("real", "imaginary")]
+                print("\t".join(titles), file=output_file)
+            length = len(next(iter(parameters.values())))
+            block = []
+            for name, value in parameters.items():
+                block += [value.real, value.imag] if column_type(name) is complex else [value]
+            for value in results.values():
+                value = np.broadcast_to(value, (length,))
+                block += [value.real, value.imag]
+            numbers = io.StringIO()
+            np.savetxt(numbers, np.column_stack(block), delimiter="\t", fmt="%.17g")
+            lines = numbers.getvalue().splitlines()
+            if text:
+                lines = ["\t".join(cells) for cells in zip(*text.values(), lines)]
+            output_file.write("\n".join(lines) + "\n")
+            rows += length
+    return rows
+
+
+###########################################################################
+# Global Script
+#   python Circuit_Batch.py builds.csv --topology probe --output =batch.txt
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Solves each row of a CSV file of parameter sets, writing the results to a tab separated text file.")
+    parser.add_argument("file")
+    parser.add_argument("--topology", default="probe", choices=list(model_defaults))
+    parser.add_argument("--output", default="=batch.txt")
+    parser.add_argument("--delimiter", help="Comma, or tab if the header has one, by default.")
+    parser.add_argument("--chunk", type=int, default=batch_rows)
+    arguments = parser.parse_args()
+    rows = evaluate_csv(arguments.file, arguments.topology, arguments.output, arguments.delimiter, arguments.chunk)
+    print(f"Solved {rows} rows to {arguments.output}.")
+
+
+###########################################################################
+###########################################################################
@@ -0,0 +1,117 @@
+###########################################################################
+###########################################################################
+#
+# Alex Heinrich
+# Branch and Bound
+# Finds the largest inductor voltage of the probe over both capacitors, without solving the whole grid.
+#
+###########################################################################
+###########################################################################
+
+###########################################################################
+# Default Defined Parameters
+# These are variables that may be adjusted in the program.
+
+import numpy as np
+from Circuit_Models import model_parameters, solve
+from Circuit_Sweep import axis_length
+
+bound_batch = 4096 # Number of cells subdivided at once, those with the largest bounds first.
+bound_tolerance = 1e-9 # Cells are discarded once their bound is within this fraction of the best value. Also covers rounding in the bounds, so keep it above 1e-12.
+
+
+###########################################################################
+# Bounds
+# The inductor voltage of the probe is V_L = V / D, with D = 1 + (Z_in + Z_c) Y_p, Y_p = 1/Z_L + iωC_t, and Z_c = 1/(iωC_c).
+# Writing 1/Z_L = g - i b, Z_in = R_in + i X_in, B = ωC_t - b, and Y = 1/(ωC_c) - X_in gives
+#   D = (1 + R_in g + Y B) + i(R_in B - g Y),
+# which is bilinear in B and Y. Over a cell, B and Y lie in intervals, so interval arithmetic bounds |D| from below and |V_L| from above.
+
+def interval_product(a_low, a_high, b_low, b_high):
+    """ Returns the interval containing every product of values from two intervals. """
+    products = np.stack([a_low*b_low, a_low*b_high, a_high*b_low, a_high*b_high])
+    return products.min(axis=0), products.max(axis=0)
+
+def interval_distance(low, high):
+    """ Returns the smallest magnitude of any value in an interval. """
+    return np.where(low > 0, low, np.where(high < 0, -high, 0))
+
+def voltage_bound(parameters, tuning_low, tuning_high, coupling_low, coupling_high):
+    """ Returns an upper bound on |V_L| over cells of tuning and coupling capacitance. """
+    angular_frequency = 2 * 3.14159265359 * parameters["frequency"] # Units of radians per second.
+    inductor = parameters["inductor_resistance"] + 1j * angular_frequency * parameters["inductance"]
+    g, b = (1 / inductor).real, -(1 / inductor).imag
+    r_in, x_in = np.real(parameters["input_impedance"]), np.imag(parameters["input_impedance"])
+    b_low, b_high = angular_frequency*tuning_low - b, angular_frequency*tuning_high - b
+    y_low, y_high = 1/(angular_frequency*coupling_high) - x_in, 1/(angular_frequency*coupling_low) - x_in
+    product_low, product_high = interval_product(y_low, y_high, b_low, b_high)
+    real_low, real_high = 1 + r_in*g + product_low, 1 + r_in*g + product_high
+    imaginary = np.stack([r_in*b_low - g*y_low, r_in*b_low - g*y_high, r_in*b_high - g*y_low, r_in*b_high - g*y_high])
+    smallest = np.hypot(interval_distance(real_low, real_high), interval_distance(imaginary.min(axis=0), imaginary.max(axis=0)))
+    with np.errstate(divide='ignore'):
+        return np.abs(parameters["input_voltage"]) / smallest
+
+
+###########################################################################
+# Search
+# Cells are rectangles of grid indices, so the maximum found is that of the full grid. Each cell is solved at its centre,
+# and split in half along each axis with more than one datapoint until its bound falls below the best value found.
+
+def axis_index_values(axis, indices):
+    """ Returns the values at grid indices along an axis, without forming the axis. """
+    indices = np.asarray(indices, dtype=float)
+    if axis["scale"] == "explicit":
+        return np.asarray(axis["values"])[indices.astype(np.int64)]
+    fraction = indices / max(axis["sampling_rate"], 1)
+    if axis["scale"] == "logarithmic":
+        return axis["minimum"] * (axis["maximum"] / axis["minimum"])**fraction
+    return axis["minimum"] + (axis["maximum"] - axis["minimum"]) * fraction
+
+def cell_values(tuning_axis, coupling_axis, cells):
+    """ Returns the capacitance intervals [low, high] covered by each cell of indices [tuning first, tuning last, coupling first, coupling last]. """
+    tuning = axis_index_values(tuning_axis, cells[:, :2])
+    coupling = axis_index_values(coupling_axis, cells[:, 2:])
+    return tuning.min(axis=1), tuning.max(axis=1), coupling.min(axis=1), coupling.max(axis=1)
+
+def bound_search(tuning_axis, coupling_axis, fixed=None, tolerance=None, batch=None):
+    """ Returns the largest |inductor voltage| of the probe over a grid of tuning and coupling capacitance, found by branch and bound.
+        The true grid maximum is at most (1 + tolerance) times the value returned. """
+    tolerance = bound_tolerance if tolerance is None else tolerance
+    batch = bound_batch if batch is None else batch
+    parameters = model_parameters("probe", fixed)
+    for axis in (tuning_axis, coupling_axis):
+        if axis["scale"] == "explicit" and np.any(np.diff(axis["values"]) <= 0):
+            raise ValueError("Explicit axes must be sorted in increasing order.")
+    cells = np.array([[0, axis_length(tuning_axis) - 1, 0, axis_length(coupling_axis) - 1]], dtype=np.int64)
+    bounds = np.array([np.inf])
+    best, best_cell, evaluations = -np.inf, None, 0
+    while len(cells):
+        chosen = np.argsort(-bounds)[:batch] # The most promising cells first.
+        rest = np.setdiff1d(np.arange(len(cells)), chosen)
+        parents = cells[chosen]
+        cells, bounds = cells[rest], bounds[rest]
+        tuning_split, coupling_split = (parents[:, 0] + parents[:, 1]) // 2, (parents[:, 2] + parents[:, 3]) // 2
+        children = np.concatenate([np.stack([parents[:, 0], tuning_split, parents[:, 2], coupling_split], axis=1),
+            np.stack([tuning_split+1, parents[:, 1], parents[:, 2], coupling_split], axis=1),
+            np.stack([parents[:, 0], tuning_split, coupling_split+1, parents[:, 3]], axis=1),
+            np.stack([tuning_split+1, parents[:, 1], coupling_split+1, parents[:, 3]], axis=1)])
+        children = children[(children[:, 0] <= children[:, 1]) & (children[:, 2] <= children[:, 3])] # Axes with one datapoint are not split.
+        centre = np.stack([(children[:, 0] + children[:, 1]) // 2, (children[:, 2] + children[:, 3]) // 2], axis=1)
+        columns = dict(fixed or {}, tuning_capacitance=axis_index_values(tuning_axis, centre[:, 0]), coupling_capacitance=axis_index_values(coupling_axis, centre[:, 1]))
+        values = np.nan_to_num(np.abs(solve("probe", columns)["inductor_voltage"]), nan=-np.inf)
+        evaluations += len(children)
+        i = int(np.argmax(values))
+        if values[i] > best:
+            best, best_cell = values[i], centre[i]
+        single = (children[:, 0] == children[:, 1]) & (children[:, 2] == children[:, 3])
+        child_bounds = np.where(single, values, voltage_bound(parameters, *cell_values(tuning_axis, coupling_axis, children))) # A single datapoint is bounded by its own value.
+        cells, bounds = np.concatenate([cells, children]), np.concatenate([bounds, child_bounds])
+        keep = bounds > best * (1 + tolerance)
+        cells, bounds = cells[keep], bounds[keep]
+    return {"tuning_capacitance": float(axis_index_values(tuning_axis, best_cell[0])), "coupling_capacitance": float(axis_index_values(coupling_axis, best_cell[1])),
+        "inductor_voltage": float(best), "indices": (int(best_cell[0]), int(best_cell[1])), "evaluations": evaluations,
+        "grid size": axis_length(tuning_axis) * axis_length(coupling_axis)}
+
+
+###########################################################################
+###########################################################################
@@ -0,0 +1,109 @@
+###########################################################################
+###########################################################################
+#
+# Alex Heinrich
+# Cascaded Networks
+# Chains two-ports by their ABCD matrices, for probes fed through lossy transmission lines.
+#
+###########################################################################
+###########################################################################
+
+###########################################################################
+# Default Defined Parameters
+# These are variables that may be adjusted in the program.
+
+import numpy as np
+from Circuit_Kernel import add, multiply, divide, parallel
+from Circuit_Models import model_parameters, impedance_calculations
+
+speed_of_light = 299792458 # Units of metres per second.
+attenuation_frequency = 10*(10**6) # Frequency at which the line attenuation is given. Units of Hz.
+attenuation_exponent = 0.5 # Loss of the line grows with frequency to this power: a half for the conductors of coaxial cable, one for its dielectric.
+decibels_per_neper = 20 / float(np.log(10)) # A Python float, so single precision arrays stay single.
+
+
+###########################################################################
+# Two-Ports
+# A two-port is a tuple (A, B, C, D) of arrays, relating the voltage and current at its input to those at its output:
+#   V_1 = A V_2 + B I_2,  I_1 = C V_2 + D I_2.
+# Each element is solved at every datapoint at once, and chained by 2x2 products written out elementwise.
+# Every element here is reciprocal (AD - BC = 1), so a chain may also be followed from its input to its output.
+
+def series_element(impedance):
+    """ Returns the two-port of an impedance in series. """
+    return (1, impedance, 0, 1)
+
+def shunt_element(impedance):
+    """ Returns the two-port of an impedance across the line. """
+    return (1, 0, divide(1, impedance), 1)
+
+def transmission_line(frequency, length, characteristic_impedance=50, velocity_factor=0.66, attenuation=0):
+    """ Returns the two-port of a transmission line of a given length (m), losing attenuation in dB per metre at the attenuation frequency. """
+    loss = attenuation * (frequency / attenuation_frequency)**attenuation_exponent / decibels_per_neper # Units of nepers per metre.
+    propagation = (loss + 1j * 2 * 3.14159265359 * frequency / (velocity_factor * speed_of_light)) * length
+    cosh, sinh = np.cosh(propagation), np.sinh(propagation)
+    return (cosh, characteristic_impedance * sinh, sinh / characteristic_impedance, cosh)
+
+def cascade(*networks):
+    """ Returns the two-port of networks chained in order, from the input to the output. """
+    a, b, c, d = networks[0]
+    for a_2, b_2, c_2, d_2 in networks[1:]:
+        a, b, c, d = a*a_2 + b*c_2, a*b_2 + b*d_2, c*a_2 + d*c_2, c*b_2 + d*d_2
+    return (a, b, c, d)
+
+def terminate(network, load):
+    """ Returns the impedance at the input of a two-port whose output is loaded. """
+    a, b, c, d = network
+    return divide(add(multiply(a, load), b), add(multiply(c, load), d))
+
+def forward(network, voltage, current):
+    """ Returns the voltage and current at the output of a reciprocal two-port, from those at its input. """
+    a, b, c, d = network
+    return d*voltage - b*current, a*current - c*voltage
+
+
+###########################################################################
+# Probe Through a Line
+# The probe at the end of a line from the instrument: the feed line, the coupling capacitor in series, the tuning capacitor across,
+# and a second line to the coil where the matching network is not at the coil (coil_line_length, zero by default). Both lines are the same cable.
+# Impedances are transformed back from the coil, element by element, and the source's current is then followed forward to the coil.
+# With both lines of zero length, this is the probe of LRCC_Probe.
+
+def cascade_solve(parameters, impedances=None):
+    """ Solves a probe fed by a lossy line for arrays of parameters, as the cascade circuit of Circuit_Models. The total is seen at the instrument,
+        and probe_... at the far end of the feed line; the difference of their powers is lost in the line. """
+    parameters = dict(model_parameters("cascade"), **parameters) # Only missing parameters are filled, keeping the precision of those given.
+    impedances = impedance_calculations(parameters) if impedances is None else impedances
+    frequency = parameters["frequency"]
+    inductor, tuning, coupling = impedances["inductor"], impedances["tuning"], impedances["coupling"]
+    cable = (parameters["characteristic_impedance"], parameters["velocity_factor"], parameters["line_attenuation"])
+    feed_line = transmission_line(frequency, parameters["line_length"], *cable)
+    coil_line = transmission_line(frequency, parameters["coil_line_length"], *cable)
+    coil_impedance = terminate(coil_line, inductor) # Seen from the tuning capacitor.
+    parallel_impedance = parallel(coil_impedance, tuning)
+    probe_impedance = add(parallel_impedance, coupling)
+    total_impedance = terminate(feed_line, probe_impedance)
+    total_current = divide(parameters["input_voltage"], add(total_impedance, parameters["input_impedance"]))
+    probe_voltage, probe_current = forward(feed_line, multiply(total_current, total_impedance), total_current)
+    tuning_voltage = multiply(probe_current, parallel_impedance) # Rather than the probe voltage less the coupling capacitor's, which cancel.
+    tuning_current = divide(tuning_voltage, tuning)
+    inductor_voltage, inductor_current = forward(coil_line, tuning_voltage, divide(tuning_voltage, coil_impedance))
+    return {"total_voltage": parameters["input_voltage"] + 0j,
+        "total_current": total_current,
+        "total_impedance": total_impedance,
+        "probe_voltage": probe_voltage,
+        "probe_current": probe_current,
+        "probe_impedance": probe_impedance,
+        "inductor_voltage": inductor_voltage,
+        "inductor_current": inductor_current,
+        "inductor_impedance": inductor,
+        "tuning_voltage": tuning_voltage,
+        "tuning_current": tuning_current,
+        "tuning_impedance": tuning,
+        "coupling_voltage": multiply(probe_current, coupling),
+        "coupling_current": probe_current,
+        "coupling_impedance": coupling}
+
+
+###########################################################################
+###########################################################################
@@ -0,0 +1,131 @@
+###########################################################################
+###########################################################################
+#
+# Alex Heinrich
+# Sweep Checkpoints
+# Saves long sweeps to disk as they run, so that an interrupted sweep resumes where it stopped.
+#
+###########################################################################
+###########################################################################
+
+###########################################################################
+# Default Defined Parameters
+# These are variables that may be adjusted in the program.
+
+import os
+import json
+import time
+import hashlib
+import numpy as np
+from Circuit_Models import model_precisions
+from Circuit_Sweep import chunk_size, space_size, space_shape, axis_values, solve_chunks
+from Circuit_Reduce import reduce_chunk, reducer_json
+
+checkpoint_interval = 60 # Time between checkpoints. Units of seconds.
+checkpoint_file = "=checkpoint_{job}.json" # Progress, and any reducer, of each job.
+checkpoint_column = "=checkpoint_{job}_{name}.npy" # Results of each job kept as a grid.
+
+
+###########################################################################
+# Jobs
+# A job is named by a hash of everything that decides its result, so that re-running the same sweep finds its checkpoint,
+# and a changed sweep starts afresh. Chunks are always solved in the same order, so a resumed job gives the same result.
+
+def job_name(*specification):
+    """ Returns a short name for a job from its JSON-friendly specification. """
+    return hashlib.sha256(json.dumps(specification, sort_keys=True, default=str).encode('utf-8')).hexdigest()[:16]
+
+def load_checkpoint(job, directory="."):
+    """ Returns the saved state of a job, or None if it has none. """
+    path = os.path.join(directory, checkpoint_file.format(job=job))
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r', encoding='utf-8') as data_file:
+        return json.load(data_file)
+
+def save_checkpoint(job, state, directory="."):
+    """ Saves the state of a job. The file is replaced whole, so an interruption while saving leaves the last checkpoint. """
+    path = os.path.join(directory, checkpoint_file.format(job=job))
+    with open(path + ".tmp", 'w', encoding='utf-8') as data_file:
+        json.dump(state, data_file, default=reducer_json)
+        data_file.flush()
+        os.fsync(data_file.fileno())
+    os.replace(path + ".tmp", path)
+
+def clear_checkpoint(job, directory="."):
+    """ Deletes the checkpoint files of a job. """
+    state = load_checkpoint(job, directory)
+    for name in (state or {}).get("columns", []):
+        os.remove(os.path.join(directory, checkpoint_column.format(job=job, name=name)))
+    if state is not None:
+        os.remove(os.path.join(directory, checkpoint_file.format(job=job)))
+
+
+###########################################################################
+# Checkpointed Sweeps
+# Progress is the index of the first datapoint not yet solved. It is saved after the results before it,
+# so a checkpoint never counts a chunk whose results were lost. An interruption (including Ctrl-C) saves a last checkpoint.
+# Each chunk's changes to the state are made on copies, and stored together with its progress in one update, so that checkpoint never holds half a chunk.
+
+def checkpointed_chunks(job, state, space, topology, chunk, interval, directory, precision, keep, flush=None, stop=None):
+    """ Solves the chunks of a sweep (or of the shard of it before stop) after the saved progress, passing each to keep(first, columns, results),
+        which returns any new values for the state without changing it, and saving the state at each interval. Any flush() is called before each save,
+        to write out results kept elsewhere. """
+    size = space_size(space) if stop is None else min(stop, space_size(space))
+    saved = time.monotonic()
+    try:
+        for first, columns, results in solve_chunks(space, topology, chunk, state["next"], size, precision):
+            state.update(keep(first, columns, results) or {}, next=min(first + chunk, size))
+            if time.monotonic() - saved >= interval:
+                if flush is not None:
+                    flush()
+                save_checkpoint(job, state, directory)
+                saved = time.monotonic()
+    finally:
+        if flush is not None:
+            flush()
+        state["complete"] = state["next"] >= size
+        save_checkpoint(job, state, directory)
+    return state
+
+def checkpointed_reduce(space, topology, reducer, chunk=None, interval=None, directory=".", precision="double"):
+    """ Feeds a sweep through a reducer as in Circuit_Reduce, checkpointing the reducer. Returns the reducer and the job name. """
+    chunk = chunk_size if chunk is None else chunk
+    interval = checkpoint_interval if interval is None else interval
+    job = job_name("reduce", space, topology, {name: value for name, value in reducer.items() if name not in ("scores", "indices", "points")}, chunk, precision)
+    state = load_checkpoint(job, directory) or {"next": 0, "complete": False, "reducer": reducer}
+    if not state["complete"]:
+        def keep(first, columns, results):
+            return {"reducer": reduce_chunk(dict(state["reducer"]), first, columns, results)}
+        state = checkpointed_chunks(job, state, space, topology, chunk, interval, directory, precision, keep)
+    return state["reducer"], job
+
+def checkpointed_grid(space, topology, columns=None, chunk=None, interval=None, directory=".", precision="double"):
+    """ Solves a sweep into a grid as in Circuit_Grid, kept in memory-mapped .npy files that are checkpointed. Returns the grid and the job name. """
+    chunk = chunk_size if chunk is None else chunk
+    interval = checkpoint_interval if interval is None else interval
+    job = job_name("grid", space, topology, columns, chunk, precision)
+    shape = space_shape(space)
+    state = load_checkpoint(job, directory)
+    grid = {"space": space, "topology": topology, "shape": shape, "axes": [axis_values(axis) for axis in space["axes"]], "columns": {}}
+    if state is None:
+        state = {"next": 0, "complete": False, "columns": []}
+    for name in state["columns"]:
+        grid["columns"][name] = np.lib.format.open_memmap(os.path.join(directory, checkpoint_column.format(job=job, name=name)), mode="r+")
+    if not state["complete"]:
+        def keep(first, parameters, results):
+            for name in (results if columns is None else columns):
+                if name not in grid["columns"]:
+                    grid["columns"][name] = np.lib.format.open_memmap(os.path.join(directory, checkpoint_column.format(job=job, name=name)), mode="w+",
+                        dtype=model_precisions[precision][1], shape=shape)
+                    state["columns"] = state["columns"] + [name] # Its file exists before it is named.
+                grid["columns"][name].reshape(-1)[first:first+len(results[name])] = results[name]
+        def flush(): # Results reach the disk before the progress that counts them.
+            for values in grid["columns"].values():
+                values.flush()
+        state = checkpointed_chunks(job, state, space, topology, chunk, interval, directory, precision, keep, flush)
+    return grid, job
+
+
+###########################################################################
+###########################################################################
@@ -0,0 +1,149 @@
+###########################################################################
+###########################################################################
+#
+# Alex Heinrich
+# Circuit Comparison
+# Solves the series, parallel, and probe circuits over the same sweep in one pass.
+#
+###########################################################################
+###########################################################################
+
+###########################################################################
+# Default Defined Parameters
+# These are variables that may be adjusted in the program.
+
+import numpy as np
+from Circuit_Models import model_defaults, impedance_calculations, solve, reflection
+from Circuit_Sweep import parameter_units, sweep_axis, sweep_space, sweep_chunks, space_shape, axis_values, sweep_point
+from Circuit_Transfer import resonance_summary
+
+compare_topologies = ["series", "parallel", "probe"] # Circuits built from the same inductor and capacitors.
+compare_defaults = dict(model_defaults["probe"], frequency=40*(10**6)) # Shared by every circuit, so that they are compared on equal terms.
+compare_columns = ["total_impedance", "total_current", "inductor_voltage", "inductor_current", "s11"] # Results kept for each circuit.
+compare_names = {"series": "Series", "parallel": "Parallel", "probe": "Probe"}
+
+
+###########################################################################
+# Functions
+
+def shared_parameters(columns=None):
+    """ Fills any missing parameters with the shared defaults, as arrays. """
+    filled = dict(compare_defaults)
+    filled.update({name: value for name, value in (columns or {}).items() if name in filled})
+    return {name: np.asarray(value) for name, value in filled.items()}
+
+def compare_circuits(space, topologies=None, chunk=None):
+    """ Solves each circuit over a sweep space, computing the impedance of each component once per chunk for all of them. """
+    topologies = compare_topologies if topologies is None else list(topologies)
+    for topology in topologies:
+        if topology not in compare_topologies:
+            raise ValueError(f"Only {', '.join(compare_topologies)} may be compared.")
+    shape = space_shape(space)
+    axes = [axis_values(axis) for axis in space["axes"]]
+    comparison = {"space": space, "shape": shape, "axes": axes, "topologies": topologies, "grids": {}}
+    for topology in topologies: # One grid per circuit, as in Circuit_Grid, so each may be interpolated.
+        comparison["grids"][topology] = {"space": space, "topology": topology, "shape": shape, "axes": axes,
+            "columns": {name: np.empty(shape, dtype=complex) for name in compare_columns}}
+    for first, columns in sweep_chunks(space, chunk):
+        parameters = shared_parameters(columns)
+        impedances = impedance_calculations(parameters) # Shared by every circuit.
+        for topology in topologies:
+            results = solve(topology, parameters, impedances)
+            results["s11"] = reflection(results["total_impedance"], parameters["input_impedance"])
+            for name in compare_columns:
+                values = np.broadcast_to(results[name], np.shape(results["total_current"])).reshape(-1)
+                comparison["grids"][topology]["columns"][name].reshape(-1)[first:first+len(values)] = values
+    return comparison
+
+def comparison_summary(comparison):
+    """ Returns the peak coil current, best match, and loaded resonance of each circuit. """
+    space, summary = comparison["space"], {}
+    for topology in comparison["topologies"]:
+        columns = comparison["grids"][topology]["columns"]
+        current = np.nan_to_num(np.abs(columns["inductor_current"]).reshape(-1), nan=-1)
+        match = np.nan_to_num(np.abs(columns["s11"]).reshape(-1), nan=np.inf)
+        peak, best = int(np.argmax(current)), int(np.argmin(match))
+        point = {name: float(value) for name, value in shared_parameters(sweep_point(space, peak)).items()}
+        resonance = resonance_summary(topology, point, point["input_impedance"]) # Loaded resonance of the components at the peak.
+        summary[topology] = {"peak coil current": current[peak],
+            "peak coil voltage": float(np.abs(columns["inductor_voltage"].reshape(-1)[peak])),
+            "peak point": point,
+            "resonant frequency": float(resonance["frequency"]),
+            "quality factor": float(resonance["quality factor"]),
+            "bandwidth": float(resonance["bandwidth"]),
+            "best s11": match[best],
+            "best match point": {name: float(value) for name, value in shared_parameters(sweep_point(space, best)).items()}}
+    return summary
+
+def print_summary(summary):
+    """ Prints the summary of each circuit side by side. """
+    topologies = list(summary)
+    rows = [("Peak coil current [A]", lambda values: values["peak coil current"]),
+        ("Peak coil voltage [V]", lambda values: values["peak coil voltage"]),
+        ("  at frequency [Hz]", lambda values: values["peak point"]["frequency"]),
+        ("Resonant frequency [Hz]", lambda values: values["resonant frequency"]),
+        ("Quality factor", lambda values: values["quality factor"]),
+        ("Bandwidth [Hz]", lambda values: values["bandwidth"]),
+        ("Best |S11|", lambda values: values["best s11"]),
+        ("  at frequency [Hz]", lambda values: values["best match point"]["frequency"])]
+    print("##################################################################################")
+    print(f"{'':<26}" + "".join(f"{compare_names[topology]:>16}" for topology in topologies))
+    for title, value in rows:
+        print(f"{title:<26}" + "".join(f"{value(summary[topology]):>16.4e}" for topology in topologies))
+    print("##################################################################################\n\n")
+
+def export_comparison(comparison, file_name="=compare.txt", chunk=None):
+    """ Saves the swept variables and each circuit's results side by side, as tab separated values in a text file. """
+    space = comparison["space"]
+    titles = [f"{axis['name'].replace('_', ' ').capitalize()} [{parameter_units[axis['name']]}]" for axis in space["axes"]]
+    for topology in comparison["topologies"]:
+        name = compare_names[topology]
+        titles += [f"{name} total impedance (real) [Ω]", f"{name} total impedance (imaginary) [Ω]",
+            f"{name} inductor voltage (real) [V]", f"{name} inductor voltage (imaginary) [V]",
+            f"{name} inductor current (real) [A]", f"{name} inductor current (imaginary) [A]",
+            f"{name} |S11|"]
+    with open(file_name, 'w', encoding='utf-8') as data_file:
+        print("\t".join(titles), file=data_file)
+        for first, columns in sweep_chunks(space, chunk): # Written a chunk at a time, like the sweep itself.
+            count = len(np.atleast_1d(columns[space["axes"][0]["name"]])) if space["axes"] else 1
+            block = [columns[axis["name"]] for axis in space["axes"]]
+            for topology in comparison["topologies"]:
+                results = {name: value.reshape(-1)[first:first+count] for name, value in comparison["grids"][topology]["columns"].items()}
+                block += [results["total_impedance"].real, results["total_impedance"].imag,
+                    results["inductor_voltage"].real, results["inductor_voltage"].imag,
+                    results["inductor_current"].real, results["inductor_current"].imag,
+                    np.abs(results["s11"])]
+            np.savetxt(data_file, np.column_stack(block), delimiter="\t", fmt="%.17g")
+
+def main():
+    """ Prompts for a sweep, then compares every circuit over it. """
+    print("Enter each variable to sweep, or leave blank to finish. The default is a frequency sweep from 30 MHz to 50 MHz.")
+    print("Variables: " + ", ".join(name for name in compare_defaults if name != "input_voltage") + "\n")
+    axes = []
+    while True:
+        name = input("Variable:\t").strip()
+        if not name:
+            break
+        minimum = float(input("Minimum value:\t"))
+        maximum = float(input("Maximum value:\t"))
+        sampling_rate = int(input("Sampling rate:\t"))
+        scale = "logarithmic" if input("1) Linear.\n2) Logarithmic.\n\n").strip() == "2" else "linear"
+        axes.append(sweep_axis(name, minimum, maximum, sampling_rate, scale))
+        print("\n")
+    if not axes:
+        axes = [sweep_axis("frequency", 30*(10**6), 50*(10**6), 2000)]
+    comparison = compare_circuits(sweep_space(*axes))
+    print_summary(comparison_summary(comparison))
+    export_comparison(comparison)
+    print("Data exported successfully.\n\n")
+
+
+###########################################################################
+# Global Script
+
+if __name__ == "__main__":
+    main()
+
+
+###########################################################################
+###########################################################################
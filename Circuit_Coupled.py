@@ -0,0 +1,117 @@
+###########################################################################
+###########################################################################
+#
+# Alex Heinrich
+# Coupled Coils
+# Solves probes whose coils share mutual inductance, such as crossed coils or transmit and receive pairs.
+#
+###########################################################################
+###########################################################################
+
+###########################################################################
+# Default Defined Parameters
+# These are variables that may be adjusted in the program.
+
+import numpy as np
+from Circuit_Kernel import add, multiply, divide, parallel
+from Circuit_Models import model_defaults
+
+coupled_coils = 2 # Number of coils solved by default.
+
+# Parameters of each coil, named with its number (inductance_2), or without one to set every coil alike. Only the first coil is driven by default.
+coil_defaults = {name: value for name, value in model_defaults["probe"].items() if name not in ("frequency", "temperature", "receiver_temperature")}
+
+
+###########################################################################
+# Parameters
+# Each coil is a probe: a source with its input impedance, the coupling capacitor, and the tuning capacitor across the coil.
+# Coils j and k share a mutual inductance M = k_jk sqrt(L_j L_k), with the coupling coefficient k_jk named coupling_coefficient_jk.
+
+def coupled_parameters(columns=None, coils=None):
+    """ Fills any missing parameters of each coil, as arrays. """
+    coils = coupled_coils if coils is None else coils
+    columns = columns or {}
+    parameters = {"frequency": np.asarray(columns.get("frequency", model_defaults["probe"]["frequency"]))}
+    for k in range(1, coils+1):
+        for name, value in coil_defaults.items():
+            value = 0 if (name == "input_voltage" and k > 1) else value
+            parameters[f"{name}_{k}"] = np.asarray(columns.get(f"{name}_{k}", columns.get(name, value)))
+        for j in range(1, k):
+            parameters[f"coupling_coefficient_{j}{k}"] = np.asarray(columns.get(f"coupling_coefficient_{j}{k}", columns.get("coupling_coefficient", 0)))
+    return parameters
+
+
+###########################################################################
+# Mesh Solution
+# Seen from its coil, each probe's source, input impedance, and coupling capacitor form a Thevenin source across the tuning capacitor:
+#   V_k Z_T/(Z_in + Z_C + Z_T), behind Z_T || (Z_in + Z_C).
+# The coil currents I_k then satisfy one equation per coil, A I = b, with
+#   A_kk = Z_L + Z_T || (Z_in + Z_C), and A_jk = iωM_jk.
+# One and two coils are solved in closed form, elementwise like the single coil; more coils are solved as stacked matrices.
+
+def solve_mesh(matrix, vectors):
+    """ Solves matrix · x = vector for each vector at every datapoint. The matrix is a list of rows of arrays, and each vector a list of arrays. """
+    if len(matrix) == 1:
+        return [[divide(vector[0], matrix[0][0])] for vector in vectors]
+    if len(matrix) == 2:
+        determinant = matrix[0][0]*matrix[1][1] - matrix[0][1]*matrix[1][0]
+        return [[divide(vector[0]*matrix[1][1] - matrix[0][1]*vector[1], determinant), divide(matrix[0][0]*vector[1] - matrix[1][0]*vector[0], determinant)] for vector in vectors]
+    shape = np.broadcast_shapes(*[np.shape(value) for row in matrix for value in row], *[np.shape(value) for vector in vectors for value in vector])
+    stacked = np.stack([np.stack(np.broadcast_arrays(*row, np.empty(shape))[:-1], axis=-1) for row in matrix], axis=-2)
+    right = np.stack([np.stack(np.broadcast_arrays(*vector, np.empty(shape))[:-1], axis=-1) for vector in vectors], axis=-1)
+    solution = np.linalg.solve(stacked, right.astype(complex))
+    return [[solution[..., i, v] for i in range(len(matrix))] for v in range(len(vectors))]
+
+def coupled_solve(columns=None, coils=None):
+    """ Solves mutually coupled probes for arrays of parameters. Returns the voltage, current, and impedance of each component of each coil
+        (inductor_2_voltage), as driven by every source at once, and the scattering parameters between the inputs (s21), each input driven alone. """
+    coils = coupled_coils if coils is None else coils
+    parameters = coupled_parameters(columns, coils)
+    angular_frequency = 2 * 3.14159265359 * parameters["frequency"] # Units of radians per second.
+    inductor, tuning, coupling, source, voltage = [], [], [], [], []
+    for k in range(1, coils+1):
+        inductor.append(parameters[f"inductor_resistance_{k}"] + 1j * angular_frequency * parameters[f"inductance_{k}"])
+        tuning.append(divide(-1j, angular_frequency * parameters[f"tuning_capacitance_{k}"]))
+        coupling.append(divide(-1j, angular_frequency * parameters[f"coupling_capacitance_{k}"]))
+        source.append(parameters[f"input_impedance_{k}"])
+        voltage.append(parameters[f"input_voltage_{k}"])
+    feed = [add(source[k], coupling[k]) for k in range(coils)] # Input impedance and coupling capacitor of each coil.
+    loop = [add(feed[k], tuning[k]) for k in range(coils)] # The whole input loop of each coil.
+    matrix = [[add(inductor[k], parallel(tuning[k], feed[k])) if j == k else
+        1j * angular_frequency * parameters[f"coupling_coefficient_{min(j, k)+1}{max(j, k)+1}"] * np.sqrt(parameters[f"inductance_{j+1}"] * parameters[f"inductance_{k+1}"])
+        for k in range(coils)] for j in range(coils)]
+    share = [divide(tuning[k], loop[k]) for k in range(coils)] # Share of each source across its tuning capacitor, unloaded.
+    vectors = [[multiply(voltage[k], share[k]) for k in range(coils)]] + [[share[k] if k == p else 0*share[k] for k in range(coils)] for p in range(coils)]
+    solutions = solve_mesh(matrix, vectors)
+    results = {}
+    coil_current = solutions[0]
+    for k in range(coils):
+        input_current = divide(add(voltage[k], multiply(tuning[k], coil_current[k])), loop[k])
+        coil_voltage = multiply(inductor[k], coil_current[k]) # From the coil's own loop, rather than the input and coil currents, which cancel near resonance.
+        for j in range(coils):
+            if j != k:
+                coil_voltage = coil_voltage + multiply(matrix[k][j], coil_current[j])
+        tuning_current = divide(coil_voltage, tuning[k])
+        results.update({f"total_{k+1}_voltage": voltage[k] + 0j, f"total_{k+1}_current": input_current,
+            f"inductor_{k+1}_voltage": coil_voltage, f"inductor_{k+1}_current": coil_current[k], f"inductor_{k+1}_impedance": inductor[k],
+            f"tuning_{k+1}_voltage": coil_voltage, f"tuning_{k+1}_current": tuning_current, f"tuning_{k+1}_impedance": tuning[k],
+            f"coupling_{k+1}_voltage": multiply(input_current, coupling[k]), f"coupling_{k+1}_current": input_current, f"coupling_{k+1}_impedance": coupling[k]})
+    # With input p driven by 1 V alone, b_j = (δ_jp - 2 R_j I_j) sqrt(R_p / R_j) for power waves referred to each input impedance.
+    resistance = [np.real(source[k]) for k in range(coils)]
+    for p in range(coils):
+        for j in range(coils):
+            input_current = divide(multiply(tuning[j], solutions[p+1][j]) + (1 if j == p else 0), loop[j])
+            results[f"s{j+1}{p+1}"] = ((1 if j == p else 0) - 2 * resistance[j] * input_current) * np.sqrt(divide(resistance[p], resistance[j]))
+        driven = divide(multiply(tuning[p], solutions[p+1][p]) + 1, loop[p])
+        results[f"total_{p+1}_impedance"] = divide(1, driven) - source[p] # Seen from input p, with the others terminated.
+    shape = np.broadcast_shapes(*[np.shape(value) for value in parameters.values()])
+    return {name: np.broadcast_to(value, shape) for name, value in results.items()}
+
+def isolation(results, j, k):
+    """ Returns the isolation between inputs j and k, -20 log10|s_jk|. Units of dB. """
+    with np.errstate(divide='ignore'):
+        return -20 * np.log10(np.abs(results[f"s{j}{k}"]))
+
+
+###########################################################################
+###########################################################################
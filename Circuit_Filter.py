@@ -0,0 +1,100 @@
+###########################################################################
+###########################################################################
+#
+# Alex Heinrich
+# Export Filters
+# Writes only the interesting rows of a sweep, as it streams.
+#
+###########################################################################
+###########################################################################
+
+###########################################################################
+# Default Defined Parameters
+# These are variables that may be adjusted in the program.
+
+import numpy as np
+from Circuit_Models import model_parameters, solve, reflection, result_column, result_unit, column_title, derived_title, driven_name
+from Circuit_Sweep import parameter_unit, explicit_axis, sweep_space, axis_values, space_shape, solve_chunks
+
+
+###########################################################################
+# Filters
+# A filter is a dictionary, as for sweep spaces, so that it may be saved or sent as JSON.
+
+def export_filter(voltage_minimum=0, s11_maximum=1, window=0, stride=1, quantity="inductor_voltage"):
+    """ Returns a filter keeping rows whose quantity is at least voltage_minimum and whose |S11| is at most s11_maximum,
+        within window datapoints of the peak quantity along each axis (0 for every row), and then every stride-th row. """
+    return {"voltage_minimum": voltage_minimum, "s11_maximum": s11_maximum, "window": int(window), "stride": max(int(stride), 1), "quantity": quantity}
+
+def row_mask(export, topology, columns, results):
+    """ Flags the rows of a chunk that pass the thresholds of a filter. """
+    keep = np.ones(np.shape(results[driven_name(topology, "total_current")]), dtype=bool)
+    if export["voltage_minimum"] > 0:
+        keep &= np.abs(result_column(results, driven_name(topology, export["quantity"]))) >= export["voltage_minimum"]
+    if export["s11_maximum"] < 1: # At the driven input.
+        keep &= np.abs(reflection(results[driven_name(topology, "total_impedance")], model_parameters(topology, columns)[driven_name(topology, "input_impedance")])) <= export["s11_maximum"]
+    return keep
+
+def sweep_peak(space, topology, quantity="inductor_voltage", chunk=None):
+    """ Returns the index of the largest |quantity| in a sweep space, without keeping any results. """
+    best, peak = -np.inf, 0
+    for first, columns, results in solve_chunks(space, topology, chunk):
+        values = np.nan_to_num(np.abs(result_column(results, driven_name(topology, quantity))), nan=-np.inf)
+        i = int(np.argmax(values))
+        if values[i] > best:
+            best, peak = values[i], first + i
+    return peak
+
+def window_space(space, index, window):
+    """ Returns the part of a sweep space within window datapoints of the given index along each axis, as explicit axes. """
+    centre = np.unravel_index(index, space_shape(space))
+    axes = []
+    for i, axis in enumerate(space["axes"]):
+        values = axis_values(axis)
+        axes.append(explicit_axis(axis["name"], values[max(centre[i] - window, 0):centre[i] + window + 1]))
+    return sweep_space(*axes, fixed=space["fixed"])
+
+def filtered_chunks(space, topology, export, chunk=None, derived=()):
+    """ Yields (columns, results) for the rows of each chunk that pass a filter, with any derived quantities named. Outside a window, nothing is solved. """
+    if export["window"] > 0:
+        space = window_space(space, sweep_peak(space, topology, export["quantity"], chunk), export["window"])
+    kept = 0
+    for first, columns, results in solve_chunks(space, topology, chunk):
+        keep = row_mask(export, topology, columns, results)
+        order = kept + np.cumsum(keep) - 1 # Position of each kept row among all kept rows, for striding across chunks.
+        kept += int(np.sum(keep))
+        keep &= (order % export["stride"]) == 0
+        if keep.any():
+            rows = {name: value[keep] for name, value in results.items()}
+            rows.update({name: result_column(rows, name) for name in derived}) # Only for the rows kept.
+            yield {name: np.broadcast_to(value, keep.shape)[keep] for name, value in columns.items()}, rows
+
+
+###########################################################################
+# Export
+
+def export_sweep(space, topology, export=None, file_name="=data.txt", chunk=None, derived=()):
+    """ Saves the swept variables and every result of the rows passing a filter, as tab separated values in a text file. Returns the number of rows.
+        Derived quantities named (such as inductor_power) follow the results, as real values. """
+    export = export_filter() if export is None else export
+    names = [axis["name"] for axis in space["axes"]]
+    rows = 0
+    with open(file_name, 'w', encoding='utf-8') as data_file:
+        titles = [column_title(name, parameter_unit(name)) for name in names] # Written first, so a file with no rows still has them.
+        for name in list(solve(topology)) + list(derived):
+            if name in derived:
+                titles.append(derived_title(name))
+            else:
+                titles += [column_title(name, result_unit(name), part) for part in ("real", "imaginary")]
+        print("\t".join(titles), file=data_file)
+        for columns, results in filtered_chunks(space, topology, export, chunk, derived):
+            block = [columns[name] for name in names]
+            for name, value in results.items():
+                block += [value.real] if name in derived else [value.real, value.imag]
+            np.savetxt(data_file, np.column_stack(block), delimiter="\t", fmt="%.17g")
+            rows += len(block[0])
+    return rows
+
+
+###########################################################################
+###########################################################################
@@ -0,0 +1,204 @@
+###########################################################################
+###########################################################################
+#
+# Alex Heinrich
+# Component Fitting
+# Estimates the probe's component values from measured impedance or S11.
+#
+###########################################################################
+###########################################################################
+
+###########################################################################
+# Default Defined Parameters
+# These are variables that may be adjusted in the program.
+
+import numpy as np
+from Circuit_Models import model_defaults, reflection
+
+fit_parameters = ["inductance", "inductor_resistance", "tuning_capacitance", "coupling_capacitance"] # Fitted in this order.
+fit_iterations = 100 # Largest number of Levenberg-Marquardt steps.
+fit_tolerance = 1e-12 # Fitting stops once a step improves the cost by less than this fraction.
+fit_damping = 1e-3 # Initial Levenberg-Marquardt damping.
+fit_stall = 1e12 # Fitting gives up once the damping grows this large without a step that helps.
+fit_floor = 1e-12 # Fits whose residuals are this fraction of the weighted measurements are converged, as roundoff leaves no step that helps.
+fit_step = 1 # Largest change of any parameter's logarithm in one step, a factor of e.
+fit_range = 10**4 # Fitted values are kept within this factor of the defaults.
+estimate_iterations = 3 # Number of reweighted linear fits used for the starting values.
+resonance_inductances = [0.5, 1, 2] # Inductances, as fractions of the default, of the starts placed on the best matched frequency.
+
+
+###########################################################################
+# Network
+# Z = Z_L Z_T/(Z_L + Z_T) + Z_C, with Z_L = R + sL, Z_T = 1/(sC_t), and Z_C = 1/(sC_c).
+# Parameters are fitted as logarithms, so they stay positive and the Jacobian is scaled alike for each.
+
+def probe_jacobian(frequency, inductance, inductor_resistance, tuning_capacitance, coupling_capacitance):
+    """ Returns the total impedance [..., frequency] and its derivatives by the logarithm of each parameter [..., frequency, parameter]. """
+    s = 1j * 2 * 3.14159265359 * np.asarray(frequency)
+    inductance, inductor_resistance, tuning_capacitance, coupling_capacitance = [np.asarray(value)[..., None] for value in (inductance, inductor_resistance, tuning_capacitance, coupling_capacitance)]
+    inductor, tuning, coupling = inductor_resistance + s*inductance, 1 / (s*tuning_capacitance), 1 / (s*coupling_capacitance)
+    total = inductor + tuning
+    by_inductor, by_tuning = (tuning / total)**2, (inductor / total)**2 # Derivatives of the parallel impedance by each branch.
+    jacobian = np.stack([by_inductor * s*inductance, # d/d(ln L)
+        by_inductor * inductor_resistance, # d/d(ln R)
+        -by_tuning * tuning, # d/d(ln C_t)
+        np.broadcast_to(-coupling, total.shape)], axis=-1) # d/d(ln C_c)
+    return inductor*tuning/total + coupling, jacobian
+
+def rational_estimate(frequency, impedance):
+    """ Estimates the component values by fitting Z = N(s)/D(s) linearly, with N = a_2 s² + a_1 s + 1 and D = b_3 s³ + b_2 s² + b_1 s.
+        Each fit is reweighted by the last denominator (Sanathanan-Koerner). Returns nan where no physical values result. """
+    frequency, impedance = np.broadcast_arrays(np.asarray(frequency, dtype=float), np.asarray(impedance, dtype=complex))
+    valid = np.isfinite(impedance)
+    reference = 2 * 3.14159265359 * np.median(frequency, axis=-1, keepdims=True) # Scales s to near one, for conditioning.
+    s = 1j * 2 * 3.14159265359 * frequency / reference
+    z = np.where(valid, impedance, 0)
+    weight = valid.astype(float)
+    for _ in range(estimate_iterations):
+        columns = np.stack([z*s**3, z*s**2, z*s, -s**2, -s], axis=-1) * weight[..., None]
+        columns = np.concatenate([columns.real, columns.imag], axis=-2)
+        target = np.concatenate([weight, np.zeros_like(weight)], axis=-1)
+        scale = np.linalg.norm(columns, axis=-2, keepdims=True)
+        scale = np.where(scale > 0, scale, 1)
+        q, r = np.linalg.qr(columns / scale)
+        solution = np.linalg.solve(r, np.einsum('...ij,...i->...j', q, target)[..., None])[..., 0] / scale[..., 0, :]
+        b_3, b_2, b_1, a_2, a_1 = np.moveaxis(solution[..., None], -2, 0)
+        denominator = np.abs(b_3*s**3 + b_2*s**2 + b_1*s)
+        weight = np.where(valid, 1 / np.where(denominator > 0, denominator, 1), 0)
+    b_3, b_2, b_1, a_2, a_1, reference = b_3[..., 0], b_2[..., 0], b_1[..., 0], a_2[..., 0], a_1[..., 0], reference[..., 0]
+    b_3, b_2, b_1, a_2 = b_3 / reference**3, b_2 / reference**2, b_1 / reference, a_2 / reference**2 # Undoes the scaling of s.
+    with np.errstate(divide='ignore', invalid='ignore'):
+        coupling_capacitance = b_1
+        inductance = (a_2 - b_3/b_1) / coupling_capacitance
+        tuning_capacitance = (b_3/b_1) / inductance
+        inductor_resistance = (b_2/b_1) / tuning_capacitance
+    estimate = np.stack([inductance, inductor_resistance, tuning_capacitance, coupling_capacitance], axis=-1)
+    lower, upper = fit_bounds()
+    return np.where(np.all((estimate > np.exp(lower)) & (estimate < np.exp(upper)), axis=-1, keepdims=True), estimate, np.nan)
+
+def fit_bounds():
+    """ Returns the lowest and highest logarithm of each parameter. """
+    defaults = np.log(np.array([model_defaults["probe"][name] for name in fit_parameters], dtype=float))
+    return defaults - np.log(fit_range), defaults + np.log(fit_range)
+
+def resonance_starts(frequency, impedance, valid, reference):
+    """ Returns starts [..., start, parameter] resonating where the data is best matched: the default resistance and share of coupling capacitance,
+        each inductance of resonance_inductances, and the total capacitance resonating with it. """
+    mismatch = np.where(valid, np.abs(reflection(np.where(valid, impedance, 0), reference)), np.inf)
+    resonance = 2 * 3.14159265359 * np.take_along_axis(frequency, np.argmin(mismatch, axis=-1)[..., None], axis=-1)
+    defaults = model_defaults["probe"]
+    share = defaults["coupling_capacitance"] / (defaults["tuning_capacitance"] + defaults["coupling_capacitance"])
+    inductance = defaults["inductance"] * np.array(resonance_inductances)
+    capacitance = 1 / (resonance**2 * inductance)
+    return np.stack(np.broadcast_arrays(inductance, defaults["inductor_resistance"], capacitance * (1 - share), capacitance * share), axis=-1)
+
+
+###########################################################################
+# Fitting
+# Residuals are stacked as [real parts, imaginary parts] over frequency, for every measurement at once.
+
+def fit_residuals(log_values, frequency, measured, quantity, reference, weight):
+    """ Returns the residuals [..., 2 frequency] and their Jacobian [..., 2 frequency, parameter]. """
+    with np.errstate(over='ignore', divide='ignore', invalid='ignore'): # Steps that overflow are rejected by their cost.
+        impedance, jacobian = probe_jacobian(frequency, *np.moveaxis(np.exp(log_values), -1, 0))
+        if quantity == "s11":
+            model = reflection(impedance, reference)
+            jacobian = (2 * reference / (impedance + reference)**2)[..., None] * jacobian
+        else:
+            model = impedance
+        residual = (model - measured) * weight
+        jacobian = jacobian * weight[..., None]
+    return np.concatenate([residual.real, residual.imag], axis=-1), np.concatenate([jacobian.real, jacobian.imag], axis=-2)
+
+def residual_cost(residual):
+    """ Returns the sum of squared residuals, or infinity where it is not finite. """
+    with np.errstate(over='ignore', invalid='ignore'):
+        cost = np.sum(residual**2, axis=-1)
+    return np.where(np.isfinite(cost), cost, np.inf)
+
+def levenberg_marquardt(values, frequency, measured, quantity, reference, weight):
+    """ Refines the logarithms of the parameters [..., parameter] by Levenberg-Marquardt, within the bounds. Returns them with their cost,
+        the number of steps, and whether each fit converged, improving negligibly or fitting to roundoff (rather than stalling or running out of steps). """
+    lower, upper = fit_bounds()
+    values = np.clip(values, lower, upper)
+    residual, jacobian = fit_residuals(values, frequency, measured, quantity, reference, weight)
+    cost = residual_cost(residual)
+    damping = np.full(cost.shape, fit_damping)
+    active = np.isfinite(cost)
+    floor = fit_floor**2 * np.sum(np.abs(measured * weight)**2, axis=-1) # Cost of residuals at the limit of roundoff.
+    converged = active & (cost <= floor)
+    active = active & ~converged
+    iterations = np.zeros(cost.shape, dtype=np.int64)
+    for _ in range(fit_iterations):
+        if not active.any():
+            break
+        finite = np.all(np.isfinite(jacobian), axis=(-2, -1)) & active
+        safe_jacobian, safe_residual = np.where(finite[..., None, None], jacobian, 0), np.where(finite[..., None], residual, 0)
+        normal = np.einsum('...ki,...kj->...ij', safe_jacobian, safe_jacobian)
+        gradient = np.einsum('...ki,...k->...i', safe_jacobian, safe_residual)
+        diagonal = np.diagonal(normal, axis1=-2, axis2=-1)
+        damped = normal + (damping[..., None] * np.where(diagonal > 0, diagonal, 1))[..., None] * np.eye(len(fit_parameters))
+        step = -np.linalg.solve(damped, gradient[..., None])[..., 0]
+        step = step * np.minimum(1, fit_step / np.maximum(np.max(np.abs(step), axis=-1, keepdims=True), 1e-300)) # Long steps are shortened, keeping their direction.
+        trial_values = np.clip(values + np.where(finite[..., None], np.nan_to_num(step), 0), lower, upper)
+        trial_residual, trial_jacobian = fit_residuals(trial_values, frequency, measured, quantity, reference, weight)
+        trial_cost = residual_cost(trial_residual)
+        accepted = finite & (trial_cost < cost)
+        improvement = np.where(accepted, (cost - trial_cost) / np.where(cost > 0, cost, 1), 0)
+        values = np.where(accepted[..., None], trial_values, values)
+        residual = np.where(accepted[..., None], trial_residual, residual)
+        jacobian = np.where(accepted[..., None, None], trial_jacobian, jacobian)
+        cost = np.where(accepted, trial_cost, cost)
+        damping = np.where(accepted, damping / 10, damping * 10)
+        iterations = iterations + active
+        converged |= active & ((accepted & (improvement < fit_tolerance)) | (cost <= floor)) # Stops on a negligible improvement or an exact fit,
+        active = active & ~converged & (damping < fit_stall) & finite # or once no step helps.
+    return values, cost, iterations, converged
+
+def fit_probe(frequency, measured, quantity="impedance", reference=50, initial=None):
+    """ Fits the probe's components to measured impedance or S11 [..., frequency] by Levenberg-Marquardt, for any number of measurements at once.
+        Impedance residuals are weighted by 1/|Z|. Every measurement is fitted from several starts at once, keeping the best fit: the initial values given,
+        those estimated from the data, the defaults, and the resonance_starts. """
+    frequency = np.asarray(frequency, dtype=float)
+    measured = np.asarray(measured, dtype=complex)
+    reference = np.asarray(reference, dtype=float)[..., None] if np.ndim(reference) else reference
+    frequency, measured = np.broadcast_arrays(frequency, measured)
+    valid = np.isfinite(measured)
+    measured = np.where(valid, measured, 0)
+    impedance = measured if quantity == "impedance" else reference * (1 + measured) / (1 - measured)
+    weight = np.where(valid, 1, 0) / (np.where(valid & (np.abs(measured) > 0), np.abs(measured), 1) if quantity == "impedance" else 1)
+    defaults = np.array([model_defaults["probe"][name] for name in fit_parameters], dtype=float)
+    shape = measured.shape[:-1] + (len(fit_parameters),)
+    starts = [np.broadcast_to(defaults, shape), rational_estimate(frequency, np.where(valid, impedance, np.nan))]
+    if initial is not None:
+        starts.append(np.broadcast_to(np.stack(np.broadcast_arrays(*[np.asarray(initial[name], dtype=float) for name in fit_parameters]), axis=-1), shape))
+    starts = np.concatenate([np.stack(starts, axis=-2), resonance_starts(frequency, impedance, valid, reference)], axis=-2)
+    starts = np.where(np.all(np.isfinite(starts) & (starts > 0), axis=-1, keepdims=True), starts, defaults) # Failed estimates start from the defaults.
+    expand = lambda array: np.asarray(array)[..., None, :] if np.ndim(array) else array # Adds an axis over the starts.
+    values, cost, iterations, converged = levenberg_marquardt(np.log(starts), expand(frequency), expand(measured), quantity, expand(reference), expand(weight))
+    best = np.argmin(cost, axis=-1)[..., None]
+    fitted = np.exp(np.take_along_axis(values, best[..., None], axis=-2)[..., 0, :])
+    cost, iterations, converged = [np.take_along_axis(array, best, axis=-1)[..., 0] for array in (cost, iterations, converged)]
+    result = {name: fitted[..., i] for i, name in enumerate(fit_parameters)}
+    result["rms residual"] = np.sqrt(cost / np.maximum(np.sum(valid, axis=-1), 1))
+    result["iterations"] = iterations
+    result["converged"] = converged
+    return result
+
+def fit_touchstone(file_names):
+    """ Fits each one-port Touchstone file by its S11. Files with the same number of datapoints are fitted together. """
+    from Circuit_Touchstone import read_touchstone
+    measurements = [read_touchstone(file_name) for file_name in file_names]
+    results = [None] * len(measurements)
+    for size in sorted(set(len(measurement["frequency"]) for measurement in measurements)):
+        batch = [i for i in range(len(measurements)) if len(measurements[i]["frequency"]) == size]
+        fitted = fit_probe(np.stack([measurements[i]["frequency"] for i in batch]), np.stack([measurements[i]["s11"] for i in batch]),
+            "s11", np.array([measurements[i]["reference"] for i in batch]))
+        for j, i in enumerate(batch):
+            results[i] = {name: value[j] for name, value in fitted.items()}
+            results[i]["file"] = measurements[i]["file"]
+    return results
+
+
+###########################################################################
+###########################################################################
@@ -0,0 +1,259 @@
+###########################################################################
+###########################################################################
+#
+# Alex Heinrich
+# Golden Results
+# Checks the array engines against the scripts' own calculations.
+#
+###########################################################################
+###########################################################################
+
+###########################################################################
+# Default Defined Parameters
+# These are variables that may be adjusted in the program.
+
+import json
+import time
+import argparse
+import importlib
+import numpy as np
+from Circuit_Models import model_defaults, model_components, solve
+from Circuit_Transfer import total_transfer
+from Circuit_Sweep import sweep_axis
+from Circuit_Search import default_objectives, pareto_search
+
+golden_file = "=golden_{topology}.json" # One file of golden results for each circuit.
+golden_seed = 0 # Seeds the random parameter sets, so that the reference points never change.
+golden_random_points = 200 # Number of random parameter sets for each circuit.
+golden_sampling_rate = 200 # Number of datapoints in each reference frequency sweep.
+throughput_points = 2**16 # Number of datapoints solved when timing each engine.
+throughput_repeats = 3 # The fastest of these timings is reported.
+
+# Script behind each circuit.
+golden_scripts = {"probe": "LRCC_Probe", "series": "LRC_Series", "parallel": "LRC_Parallel", "seop": "LRC_SEOP"}
+
+# Reference frequency sweep of each circuit: (minimum, maximum, scale), across its resonance.
+golden_sweeps = {"probe": (30*(10**6), 50*(10**6), "linear"),
+    "series": (100*(10**6), 300*(10**6), "linear"),
+    "parallel": (30*(10**6), 50*(10**6), "linear"),
+    "seop": (0.01, 10**6, "logarithmic")}
+
+
+###########################################################################
+# Reference Points
+# Each circuit is checked at its defaults, along a frequency sweep, and at random parameter sets within a decade of its defaults.
+
+def reference_points(topology):
+    """ Returns the parameters of every reference point of a circuit, as a dictionary of lists. """
+    defaults = model_defaults[topology]
+    minimum, maximum, scale = golden_sweeps[topology]
+    sweep = np.geomspace(minimum, maximum, golden_sampling_rate) if scale == "logarithmic" else np.linspace(minimum, maximum, golden_sampling_rate)
+    generator = np.random.default_rng(golden_seed)
+    points = {}
+    for name, value in defaults.items():
+        if name in ("input_voltage", "input_impedance"):
+            random = np.full(golden_random_points, value, dtype=float) # The source is kept as in the script.
+        else:
+            random = value * 10**generator.uniform(-1, 1, golden_random_points) # Log-uniform within a decade.
+        swept = sweep if name == "frequency" else np.full(golden_sampling_rate, value, dtype=float)
+        points[name] = [float(value)] + [float(x) for x in swept] + [float(x) for x in random]
+    return points
+
+def point_count(points):
+    """ Returns the number of reference points. """
+    return len(next(iter(points.values())))
+
+
+###########################################################################
+# Scalar Path
+# The script's own fixed_calculation() is run once per point, with its globals set to the point's parameters.
+
+def script_results(topology, points):
+    """ Solves each point with the script of a circuit, returning each branch quantity as a complex array. """
+    script = importlib.import_module(golden_scripts[topology])
+    names = ["total"] + model_components[topology]
+    results = {f"{name}_{quantity}": [] for name in names for quantity in ("voltage", "current", "impedance")}
+    for i in range(point_count(points)):
+        for name, values in points.items():
+            setattr(script, name, complex(values[i]) if name in ("input_voltage", "input_impedance") else values[i])
+        for name in names + ["frequency"]: # The lists themselves are cleared, as reset_lists() differs between scripts.
+            getattr(script, f"{name}_list").clear()
+        script.fixed_calculation()
+        for name in names:
+            values = getattr(script, f"{name}_list")[-1] # [Voltage, current, impedance, ...]
+            for j, quantity in enumerate(("voltage", "current", "impedance")):
+                results[f"{name}_{quantity}"].append(complex(values[j]))
+    return {name: np.array(values, dtype=complex) for name, values in results.items()}
+
+def record_golden(topology):
+    """ Runs the scalar path over the reference points of a circuit and saves the results as a golden file. """
+    points = reference_points(topology)
+    start = time.perf_counter()
+    results = script_results(topology, points)
+    elapsed = time.perf_counter() - start
+    golden = {"topology": topology, "points": points, "throughput": point_count(points) / elapsed,
+        "results": {name: {"real": values.real.tolist(), "imag": values.imag.tolist()} for name, values in results.items()}}
+    with open(golden_file.format(topology=topology), 'w', encoding='utf-8') as data_file:
+        json.dump(golden, data_file)
+    return golden
+
+def load_golden(topology):
+    """ Reads the golden file of a circuit, returning its points and results as arrays. """
+    with open(golden_file.format(topology=topology), 'r', encoding='utf-8') as data_file:
+        golden = json.load(data_file)
+    golden["points"] = {name: np.array(values) for name, values in golden["points"].items()}
+    golden["results"] = {name: np.array(values["real"]) + 1j*np.array(values["imag"]) for name, values in golden["results"].items()}
+    return golden
+
+
+###########################################################################
+# Accelerated Paths
+# Each path takes (topology, columns) and returns whichever results it provides. Only those are checked.
+
+def models_path(topology, columns):
+    """ Every branch quantity, from Circuit_Models. """
+    return solve(topology, columns)
+
+def transfer_path(topology, columns):
+    """ Total impedance and current, from the rational functions of Circuit_Transfer. """
+    numerator, denominator = total_transfer(topology, columns)
+    s = 1j * 2 * 3.14159265359 * np.asarray(columns["frequency"])
+    top, bottom = numerator[..., 0] + 0j, denominator[..., 0] + 0j
+    for i in range(1, numerator.shape[-1]): # Horner's method, with each point at its own frequency.
+        top = top * s + numerator[..., i]
+    for i in range(1, denominator.shape[-1]):
+        bottom = bottom * s + denominator[..., i]
+    total_impedance = top / bottom
+    return {"total_impedance": total_impedance, "total_current": columns["input_voltage"] / (total_impedance + columns["input_impedance"])}
+
+def single_path(topology, columns):
+    """ Every branch quantity, from Circuit_Models in single precision. """
+    return solve(topology, columns, precision="single")
+
+def coupled_path(topology, columns):
+    """ Every branch quantity of the first of two uncoupled probes, from Circuit_Coupled. """
+    from Circuit_Coupled import coupled_solve
+    coils = {f"{name}_{k}": value for name, value in columns.items() if name != "frequency" for k in (1, 2)}
+    results = coupled_solve(dict(coils, frequency=columns["frequency"], coupling_coefficient_12=0))
+    return {name.replace("_1_", "_"): value for name, value in results.items() if "_1_" in name}
+
+def cascade_path(topology, columns):
+    """ Every branch quantity of the probe behind lines of zero length, from Circuit_Cascade. """
+    return solve("cascade", dict(columns, line_length=0, coil_line_length=0))
+
+# Each path, with the relative error it must stay within (for each circuit, where they differ), and the circuits it solves where not all of them.
+# Single precision keeps about seven significant digits, less where the SEOP circuit's branch currents cancel.
+golden_paths = {"models": {"function": models_path, "tolerance": 1e-12},
+    "transfer": {"function": transfer_path, "tolerance": 1e-9},
+    "single": {"function": single_path, "tolerance": {"probe": 1e-3, "series": 1e-3, "parallel": 1e-3, "seop": 1e-2}},
+    "coupled": {"function": coupled_path, "tolerance": 1e-12, "topologies": ["probe"]},
+    "cascade": {"function": cascade_path, "tolerance": 1e-12, "topologies": ["probe"]}}
+
+# Searches over the probe's capacitors (those of the driven coil, for coupled probes), each through another circuit which reduces to the probe,
+# with its default objectives.
+# Each must find the probe's front, within the relative error given.
+search_axes = [sweep_axis("tuning_capacitance", 10*(10**(-12)), 1000*(10**(-12)), 8, "logarithmic"),
+    sweep_axis("coupling_capacitance", 1*(10**(-12)), 100*(10**(-12)), 8, "logarithmic")]
+search_levels = 4 # Levels of each search checked.
+golden_searches = {"cascade": {"fixed": {"line_length": 0, "coil_line_length": 0}, "tolerance": 1e-9},
+    "coupled": {"axes": [dict(axis, name=f"{axis['name']}_1") for axis in search_axes], "fixed": {"coupling_coefficient_12": 0}, "tolerance": 1e-9}}
+
+
+###########################################################################
+# Checks
+
+def relative_error(values, golden):
+    """ Returns |values - golden| / |golden| for each point, or the absolute error where the golden value is zero. """
+    values, golden = np.asarray(values, dtype=complex), np.asarray(golden, dtype=complex)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        error = np.abs(values - golden) / np.where(golden == 0, 1, np.abs(golden))
+    same = (values == golden) | (np.isnan(values) & np.isnan(golden)) # Matching infinities and undefined values agree.
+    return np.where(same, 0, np.nan_to_num(error, nan=np.inf))
+
+def path_throughput(function, topology, points):
+    """ Returns the number of datapoints solved per second, for a batch of reference points repeated to throughput_points. """
+    repeats = -(-throughput_points // point_count(points))
+    columns = {name: np.tile(values, repeats)[:throughput_points] for name, values in points.items()}
+    fastest = float("inf")
+    for _ in range(throughput_repeats):
+        start = time.perf_counter()
+        function(topology, columns)
+        fastest = min(fastest, time.perf_counter() - start)
+    return throughput_points / fastest
+
+def check_golden(topologies=None, paths=None):
+    """ Checks each path against the golden files, returning a row of errors and throughput for each path and circuit. """
+    report = []
+    for topology in (golden_scripts if topologies is None else topologies):
+        golden = load_golden(topology)
+        for name in (golden_paths if paths is None else paths):
+            path = golden_paths[name]
+            if topology not in path.get("topologies", golden_scripts):
+                continue
+            tolerance = path["tolerance"][topology] if isinstance(path["tolerance"], dict) else path["tolerance"]
+            results = path["function"](topology, golden["points"])
+            errors = {result: float(np.max(relative_error(results[result], golden["results"][result]))) for result in golden["results"] if result in results}
+            worst = max(errors.values()) if errors else 0.0
+            report.append({"path": name, "topology": topology, "errors": errors, "maximum error": worst, "tolerance": tolerance,
+                "passed": worst <= tolerance, "throughput": path_throughput(path["function"], topology, golden["points"]),
+                "scalar throughput": golden["throughput"]})
+    return report
+
+def check_search(topologies=None):
+    """ Runs pareto_search through each circuit of golden_searches, returning a row of the error of its front against the probe's front. """
+    report = []
+    for topology in (golden_searches if topologies is None else topologies):
+        search = golden_searches[topology]
+        objectives = default_objectives(topology)
+        start = time.perf_counter()
+        front = pareto_search(search.get("axes", search_axes), search["fixed"], topology=topology, levels=search_levels)
+        seconds = time.perf_counter() - start
+        reference = pareto_search(search_axes, objectives=objectives, levels=search_levels)
+        if len(front["violation"]) == len(reference["violation"]):
+            errors = {name: float(np.max(relative_error(front[name], reference[name]))) for name in objectives}
+        else:
+            errors = {name: np.inf for name in objectives}
+        worst = max(errors.values())
+        report.append({"path": "search", "topology": topology, "errors": errors, "maximum error": worst, "tolerance": search["tolerance"],
+            "passed": worst <= search["tolerance"], "throughput": front["evaluations"] / seconds, "scalar throughput": None})
+    return report
+
+def print_report(report):
+    """ Prints the worst relative error and throughput of each path and circuit. """
+    print("##################################################################################")
+    print(f"{'Path':<12}{'Circuit':<10}{'Error':>12}{'Tolerance':>12}{'Points/s':>12}{'Speedup':>10}   Result")
+    for row in report:
+        speedup = f"{row['throughput'] / row['scalar throughput']:>10.1f}" if row["scalar throughput"] else f"{'':>10}" # Searches have no script to compare.
+        print(f"{row['path']:<12}{row['topology']:<10}{row['maximum error']:>12.2e}{row['tolerance']:>12.0e}{row['throughput']:>12.2e}"
+            f"{speedup}   {'Passed' if row['passed'] else 'Failed'}")
+        if not row["passed"]:
+            for result, error in row["errors"].items():
+                if error > row["tolerance"]:
+                    print(f"    {result}: {error:.2e}")
+    print("##################################################################################\n\n")
+
+
+###########################################################################
+# Global Script
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Records golden results from the scripts, or checks the array engines against them.")
+    parser.add_argument("action", choices=["record", "check"])
+    parser.add_argument("--topology", action="append", choices=list(golden_scripts), help="Circuit to record or check. Every circuit by default.")
+    parser.add_argument("--path", action="append", choices=list(golden_paths) + ["search"], help="Engine to check. Every engine, and the searches, by default.")
+    arguments = parser.parse_args()
+    if arguments.action == "record":
+        for topology in (arguments.topology or golden_scripts):
+            golden = record_golden(topology)
+            print(f"Recorded {point_count(golden['points'])} points of the {topology} circuit to {golden_file.format(topology=topology)}.")
+    else:
+        paths = None if arguments.path is None else [name for name in arguments.path if name != "search"]
+        report = check_golden(arguments.topology, paths) if paths is None or paths else []
+        if arguments.path is None or "search" in arguments.path:
+            report += check_search()
+        print_report(report)
+        raise SystemExit(0 if all(row["passed"] for row in report) else 1)
+
+
+###########################################################################
+###########################################################################
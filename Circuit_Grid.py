@@ -0,0 +1,139 @@
+###########################################################################
+###########################################################################
+#
+# Alex Heinrich
+# Gridded Results
+# Stores a sweep as an indexed grid, with interpolation between datapoints.
+#
+###########################################################################
+###########################################################################
+
+###########################################################################
+# Default Defined Parameters
+# These are variables that may be adjusted in the program.
+
+import numpy as np
+from itertools import product
+from Circuit_Models import derived_column
+from Circuit_Sweep import axis_values, space_shape, solve_chunks
+
+query_chunk_size = 2**16 # Number of queries interpolated at once.
+
+
+###########################################################################
+# Grids
+# A grid is a dictionary holding the sweep space and one array per result, shaped like the space.
+
+def build_grid(space, topology, columns=None, chunk=None, precision="double"):
+    """ Solves a sweep space chunk by chunk, storing the chosen results (or all of them) as grids of the given precision. """
+    shape = space_shape(space)
+    grid = {"space": space, "topology": topology, "shape": shape, "axes": [axis_values(axis) for axis in space["axes"]], "columns": {}}
+    for first, parameters, results in solve_chunks(space, topology, chunk, precision=precision):
+        for name in (results if columns is None else columns):
+            if name not in grid["columns"]:
+                grid["columns"][name] = np.empty(shape, dtype=results[name].dtype)
+            grid["columns"][name].reshape(-1)[first:first+len(results[name])] = results[name]
+    return grid
+
+def axis_coordinates(axis, values, spacing):
+    """ Converts values along an axis into fractional indices, or nan outside the axis. """
+    values = np.asarray(values, dtype=float)
+    if len(axis) == 1:
+        return np.where(values == axis[0], 0.0, np.nan)
+    if spacing == "linear":
+        coordinates = (values - axis[0]) / (axis[1] - axis[0]) # One division, however long the axis.
+    elif spacing == "logarithmic":
+        coordinates = np.log(values / axis[0]) / np.log(axis[1] / axis[0])
+    elif np.all(np.diff(axis) > 0):
+        coordinates = np.interp(values, axis, np.arange(len(axis)), left=np.nan, right=np.nan) # Explicit axes are searched, rather than computed.
+    elif np.all(np.diff(axis) < 0):
+        coordinates = np.interp(values, axis[::-1], np.arange(len(axis))[::-1], left=np.nan, right=np.nan)
+    else:
+        raise ValueError("Explicit axes must be sorted to be interpolated.")
+    tolerance = 1e-9 * (len(axis) - 1) # Allows queries on the last datapoint despite rounding.
+    coordinates = np.where((coordinates < -tolerance) | (coordinates > len(axis) - 1 + tolerance), np.nan, coordinates)
+    return np.clip(coordinates, 0, len(axis) - 1)
+
+def grid_column(grid, name):
+    """ Returns a stored result, or a derived quantity computed from the stored results and cached in grid["derived"].
+        The cache is kept until a result it used is replaced, or touch_grid() is called after changing results in place. """
+    if name in grid["columns"]:
+        return grid["columns"][name]
+    cache = grid.setdefault("derived", {})
+    if name in cache:
+        version, sources, values = cache[name]
+        if version == grid.get("version", 0) and all(grid["columns"].get(source) is array for source, array in sources):
+            return values
+    sources = []
+    def column(source):
+        sources.append((source, grid["columns"][source]))
+        return grid["columns"][source]
+    values = derived_column(column, name)
+    cache[name] = (grid.get("version", 0), sources, values)
+    return values
+
+def touch_grid(grid):
+    """ Marks the results of a grid as changed in place, so derived quantities are computed again. """
+    grid["version"] = grid.get("version", 0) + 1
+
+def grid_coordinates(grid, queries):
+    """ Returns the fractional index along every axis for each query, given as a dictionary of arrays by variable. """
+    return [axis_coordinates(grid["axes"][i], queries[grid["space"]["axes"][i]["name"]], grid["space"]["axes"][i]["scale"]) for i in range(len(grid["axes"]))]
+
+def grid_lookup(grid, name, queries):
+    """ Returns the stored value at the datapoint nearest each query. """
+    coordinates = grid_coordinates(grid, queries)
+    valid = np.all([np.isfinite(coordinate) for coordinate in coordinates], axis=0)
+    indices = tuple(np.where(valid, np.rint(coordinate), 0).astype(np.int64) for coordinate in coordinates)
+    values = grid_column(grid, name)[indices]
+    return np.where(valid, values, np.nan)
+
+
+###########################################################################
+# Interpolation
+# Both methods combine the datapoints around each query with separable weights along every axis.
+
+def linear_weights(fraction):
+    """ Weights of the two datapoints either side of a fractional position. """
+    return [1 - fraction, fraction], [0, 1]
+
+def cubic_weights(fraction):
+    """ Catmull-Rom spline weights of the four datapoints around a fractional position. """
+    f_2, f_3 = fraction**2, fraction**3
+    return [(-f_3 + 2*f_2 - fraction)/2, (3*f_3 - 5*f_2 + 2)/2, (-3*f_3 + 4*f_2 + fraction)/2, (f_3 - f_2)/2], [-1, 0, 1, 2]
+
+def interpolate(grid, name, queries, method="linear"):
+    """ Interpolates a stored result at off-grid queries, multilinearly or by cubic splines. Returns nan outside the grid. """
+    weight_function = cubic_weights if method == "cubic" else linear_weights
+    values = grid_column(grid, name)
+    flat_values = np.ascontiguousarray(values).reshape(-1)
+    strides = [int(np.prod(values.shape[i+1:], dtype=np.int64)) for i in range(values.ndim)] # Datapoints between neighbours along each axis.
+    queries = {key: np.asarray(value) for key, value in queries.items()}
+    size = np.broadcast_shapes(*[value.shape for value in queries.values()])
+    queries = {key: np.broadcast_to(value, size).reshape(-1) for key, value in queries.items()}
+    count = int(np.prod(size, dtype=np.int64))
+    result = np.empty(count, dtype=np.result_type(values.dtype, float))
+    for start in range(0, count, query_chunk_size):
+        coordinates = grid_coordinates(grid, {key: value[start:start+query_chunk_size] for key, value in queries.items()})
+        valid = np.all([np.isfinite(coordinate) for coordinate in coordinates], axis=0)
+        axis_weights, axis_indices = [], []
+        for i in range(len(coordinates)):
+            coordinate = np.where(valid, coordinates[i], 0)
+            cell = np.clip(np.floor(coordinate), 0, max(values.shape[i] - 2, 0)).astype(np.int64)
+            weights, offsets = weight_function(coordinate - cell)
+            indices = [np.clip(cell + offset, 0, values.shape[i] - 1) for offset in offsets] # Edge datapoints are repeated beyond the grid.
+            axis_weights.append(weights)
+            axis_indices.append(indices)
+        total = 0
+        for corner in product(*[range(len(weights)) for weights in axis_weights]): # Every combination of neighbouring datapoints.
+            weight, flat_index = 1, 0
+            for i in range(len(corner)):
+                weight = weight * axis_weights[i][corner[i]]
+                flat_index = flat_index + axis_indices[i][corner[i]] * strides[i]
+            total = total + weight * flat_values[flat_index]
+        result[start:start+query_chunk_size] = np.where(valid, total, np.nan)
+    return result.reshape(size)
+
+
+###########################################################################
+###########################################################################
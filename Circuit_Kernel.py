@@ -0,0 +1,100 @@
+###########################################################################
+###########################################################################
+#
+# Alex Heinrich
+# Complex Arithmetic Kernel
+# Shared by every circuit script and engine.
+#
+###########################################################################
+###########################################################################
+
+###########################################################################
+# Basic Operations
+# Each operation accepts Python complex numbers or NumPy arrays, with the same results for both.
+# An impedance of zero is a short circuit, and an infinite impedance is an open circuit:
+#   divide(z, 0) is infinite (nan for 0/0), and divide(z, ∞) is zero (nan for ∞/∞).
+#   parallel(z, ∞) is z, parallel(0, 0) is zero, and parallel(z, -z) is infinite.
+
+from cmath import isinf, isnan
+
+infinity = complex(float("inf"), 0) # Returned for division by zero and for parallel resonance.
+undefined = complex(float("nan"), float("nan")) # Returned for 0/0 and ∞/∞.
+
+def is_array(*values):
+    """ Checks whether any value is a NumPy array or scalar. """
+    return any(hasattr(value, "ndim") for value in values)
+
+def add(z_1, z_2):
+    """ Adds complex numbers. """
+    return z_1 + z_2
+
+def subtract(z_1, z_2):
+    """ Subtracts complex numbers. """
+    return z_1 - z_2
+
+def multiply(z_1, z_2):
+    """ Multiplies complex numbers. """
+    return z_1 * z_2
+
+def divide(z_1, z_2):
+    """ Divides complex numbers. """
+    if is_array(z_1, z_2):
+        return divide_array(z_1, z_2)
+    if z_2 == 0:
+        return undefined if (z_1 == 0 or isnan(z_1)) else infinity
+    if isinf(z_2):
+        return undefined if (isinf(z_1) or isnan(z_1)) else 0j
+    return z_1 / z_2
+
+def parallel(z_1, z_2):
+    """ Adds two complex numbers as an inverse reciprocal sum. """
+    if is_array(z_1, z_2):
+        return parallel_array(z_1, z_2)
+    if isinf(z_1):
+        return complex(z_2)
+    if isinf(z_2):
+        return complex(z_1)
+    total = z_1 + z_2
+    if total == 0:
+        return 0j if z_1 == 0 else infinity
+    return (z_1 * z_2) / total
+
+def magnitude(z):
+    """ Returns the magnitude of complex numbers. """
+    return abs(z)
+
+
+###########################################################################
+# Array Operations
+# The special cases are only searched for when they are present, so ordinary arrays take one pass.
+
+def divide_array(z_1, z_2):
+    """ Divides complex arrays elementwise. """
+    import numpy as np
+    z_1, z_2 = np.asarray(z_1, dtype=np.result_type(z_1, z_2, 1j)), np.asarray(z_2, dtype=np.result_type(z_1, z_2, 1j))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        result = np.divide(z_1, z_2)
+    zero, infinite = (z_2 == 0), np.isinf(z_2)
+    if zero.any():
+        result = np.where(zero, np.where((z_1 == 0) | np.isnan(z_1), undefined, infinity), result)
+    if infinite.any():
+        result = np.where(infinite, np.where(np.isinf(z_1) | np.isnan(z_1), undefined, 0), result)
+    return result.astype(z_1.dtype, copy=False)
+
+def parallel_array(z_1, z_2):
+    """ Adds two complex arrays elementwise as an inverse reciprocal sum. """
+    import numpy as np
+    z_1, z_2 = np.asarray(z_1, dtype=np.result_type(z_1, z_2, 1j)), np.asarray(z_2, dtype=np.result_type(z_1, z_2, 1j))
+    total = z_1 + z_2
+    with np.errstate(divide='ignore', invalid='ignore'):
+        result = (z_1 * z_2) / total
+    short, infinite_1, infinite_2 = (total == 0), np.isinf(z_1), np.isinf(z_2)
+    if short.any():
+        result = np.where(short, np.where(z_1 == 0, 0, infinity), result)
+    if infinite_1.any() or infinite_2.any():
+        result = np.where(infinite_2, z_1, np.where(infinite_1, z_2, result))
+    return result.astype(total.dtype, copy=False)
+
+
+###########################################################################
+###########################################################################
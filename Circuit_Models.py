@@ -0,0 +1,282 @@
+###########################################################################
+###########################################################################
+#
+# Alex Heinrich
+# Circuit Models
+# Each circuit solved for whole arrays of parameters at once.
+#
+###########################################################################
+###########################################################################
+
+###########################################################################
+# Default Defined Parameters
+# These are variables that may be adjusted in the program.
+
+import numpy as np
+from Circuit_Kernel import add, subtract, multiply, divide, parallel
+
+# Default parameters of each circuit, matching their scripts.
+# The coil circuits also take the temperature of the coil and the noise temperature of the receiver at the input, for their noise.
+model_defaults = {"probe": {"frequency": 10*(10**6), "input_voltage": 1, "input_impedance": 50, "inductance": 0.6*(10**(-6)), "inductor_resistance": 0.1, "tuning_capacitance": 25.2*(10**(-12)), "coupling_capacitance": 1.19*(10**(-12)), "temperature": 293.15, "receiver_temperature": 35},
+    "series": {"frequency": 40*(10**6), "input_voltage": 1, "input_impedance": 0, "inductance": 0.6*(10**(-6)), "inductor_resistance": 0.1, "coupling_capacitance": 1.19*(10**(-12)), "temperature": 293.15, "receiver_temperature": 35},
+    "parallel": {"frequency": 40*(10**6), "input_voltage": 1, "input_impedance": 50, "inductance": 0.6*(10**(-6)), "inductor_resistance": 0.1, "tuning_capacitance": 25.2*(10**(-12)), "temperature": 293.15, "receiver_temperature": 35},
+    "seop": {"frequency": 1, "input_voltage": 1, "input_impedance": 0, "R_op": 1, "C_Rb": 1*(10**(-6)), "R_sr": 1, "R_ex": 1, "C_Xe": 1*(10**(-6)), "R_w": 1}}
+
+# Two probes with mutually coupled coils, as in Circuit_Coupled. Each probe parameter is given per coil (inductance_2), and only the first coil is driven.
+model_defaults["coupled"] = {"frequency": 10*(10**6), "coupling_coefficient_12": 0}
+model_defaults["coupled"].update({f"{name}_{k}": (0 if (name, k) == ("input_voltage", 2) else value) for k in (1, 2)
+    for name, value in model_defaults["probe"].items() if name not in ("frequency", "temperature", "receiver_temperature")})
+
+# The probe fed through a line from the instrument, as in Circuit_Cascade: RG-58 by default, losing 0.046 dB per metre at 10 MHz.
+model_defaults["cascade"] = {name: value for name, value in model_defaults["probe"].items() if name not in ("temperature", "receiver_temperature")}
+model_defaults["cascade"].update({"line_length": 1, "coil_line_length": 0, "characteristic_impedance": 50, "velocity_factor": 0.66, "line_attenuation": 0.046})
+
+# Components of each circuit, in the order of their export columns.
+model_components = {"probe": ["inductor", "tuning", "coupling"],
+    "series": ["inductor", "coupling"],
+    "parallel": ["inductor", "tuning"],
+    "seop": ["R_op", "C_Rb", "R_sr", "R_ex", "C_Xe", "R_w"],
+    "coupled": ["inductor_1", "tuning_1", "coupling_1", "inductor_2", "tuning_2", "coupling_2"],
+    "cascade": ["probe", "inductor", "tuning", "coupling"]}
+
+# Real and complex types of each precision. Single precision halves the memory of large sweeps, at about seven significant digits.
+model_precisions = {"double": (np.float64, np.complex128), "single": (np.float32, np.complex64)}
+
+boltzmann_constant = 1.380649*(10**(-23)) # Units of joules per kelvin.
+
+
+###########################################################################
+# Functions
+
+def model_parameters(topology, columns=None, precision="double"):
+    """ Fills any missing parameters with the defaults of a circuit, as arrays. In single precision, they are cast to float32 or complex64. """
+    filled = dict(model_defaults[topology])
+    filled.update({name: value for name, value in (columns or {}).items() if name in filled})
+    if precision == "double":
+        return {name: np.asarray(value) for name, value in filled.items()}
+    real, imaginary = model_precisions[precision]
+    return {name: np.asarray(value, dtype=imaginary if np.iscomplexobj(value) else real) for name, value in filled.items()}
+
+def impedance_calculations(parameters):
+    """ Returns the impedance of each component present in the parameters. Shared by every circuit. """
+    angular_frequency = 2 * 3.14159265359 * parameters["frequency"] # Units of radians per second.
+    impedances = {}
+    if "inductance" in parameters:
+        impedances["inductor"] = parameters["inductor_resistance"] + 1j * angular_frequency * parameters["inductance"]
+    if "tuning_capacitance" in parameters:
+        impedances["tuning"] = divide(-1j, angular_frequency * parameters["tuning_capacitance"])
+    if "coupling_capacitance" in parameters:
+        impedances["coupling"] = divide(-1j, angular_frequency * parameters["coupling_capacitance"])
+    for name in ("R_op", "R_sr", "R_ex", "R_w"):
+        if name in parameters:
+            impedances[name] = parameters[name] + 0j
+    for name in ("C_Rb", "C_Xe"):
+        if name in parameters:
+            impedances[name] = divide(-1j, angular_frequency * parameters[name])
+    return impedances
+
+def solve_probe(parameters, impedances):
+    """ Follows reduce_circuit() and solve_circuit() in LRCC_Probe. """
+    parallel_impedance = parallel(impedances["inductor"], impedances["tuning"]) # Inductor and tuning capacitor.
+    total_impedance = add(parallel_impedance, impedances["coupling"]) # Inductor, tuning capacitor, and coupling capacitor.
+    total_current = divide(parameters["input_voltage"], add(total_impedance, parameters["input_impedance"])) # Current as influenced by the input resistance.
+    parallel_voltage = multiply(total_current, parallel_impedance) # Tuning capacitor and inductor.
+    return {"total_voltage": parameters["input_voltage"] + 0j,
+        "total_current": total_current,
+        "total_impedance": total_impedance,
+        "inductor_voltage": parallel_voltage,
+        "inductor_current": divide(parallel_voltage, impedances["inductor"]),
+        "inductor_impedance": impedances["inductor"],
+        "tuning_voltage": parallel_voltage,
+        "tuning_current": divide(parallel_voltage, impedances["tuning"]),
+        "tuning_impedance": impedances["tuning"],
+        "coupling_voltage": multiply(total_current, impedances["coupling"]),
+        "coupling_current": total_current,
+        "coupling_impedance": impedances["coupling"]}
+
+def solve_series(parameters, impedances):
+    """ Follows reduce_circuit() and solve_circuit() in LRC_Series. """
+    total_impedance = add(impedances["inductor"], impedances["coupling"])
+    total_current = divide(parameters["input_voltage"], add(total_impedance, parameters["input_impedance"]))
+    return {"total_voltage": parameters["input_voltage"] + 0j,
+        "total_current": total_current,
+        "total_impedance": total_impedance,
+        "inductor_voltage": multiply(total_current, impedances["inductor"]),
+        "inductor_current": total_current,
+        "inductor_impedance": impedances["inductor"],
+        "coupling_voltage": multiply(total_current, impedances["coupling"]),
+        "coupling_current": total_current,
+        "coupling_impedance": impedances["coupling"]}
+
+def solve_parallel(parameters, impedances):
+    """ Follows reduce_circuit() and solve_circuit() in LRC_Parallel. """
+    total_impedance = parallel(impedances["inductor"], impedances["tuning"])
+    total_current = divide(parameters["input_voltage"], add(total_impedance, parameters["input_impedance"]))
+    parallel_voltage = multiply(total_current, total_impedance)
+    return {"total_voltage": parameters["input_voltage"] + 0j,
+        "total_current": total_current,
+        "total_impedance": total_impedance,
+        "inductor_voltage": parallel_voltage,
+        "inductor_current": divide(parallel_voltage, impedances["inductor"]),
+        "inductor_impedance": impedances["inductor"],
+        "tuning_voltage": parallel_voltage,
+        "tuning_current": divide(parallel_voltage, impedances["tuning"]),
+        "tuning_impedance": impedances["tuning"]}
+
+def solve_seop(parameters, impedances):
+    """ Follows reduce_circuit() and solve_circuit() in LRC_SEOP. """
+    input_voltage = parameters["input_voltage"]
+    parallel_1 = parallel(impedances["R_w"], impedances["C_Xe"])
+    series_1 = add(parallel_1, impedances["R_ex"])
+    parallel_2 = parallel(series_1, impedances["R_sr"])
+    parallel_3 = parallel(parallel_2, impedances["C_Rb"])
+    total_impedance = add(parallel_3, impedances["R_op"])
+    total_current = divide(input_voltage, add(total_impedance, parameters["input_impedance"]))
+    R_op_voltage = multiply(total_current, impedances["R_op"])
+    C_Rb_voltage = subtract(input_voltage, R_op_voltage)
+    C_Rb_current = divide(C_Rb_voltage, impedances["C_Rb"])
+    other_current = subtract(total_current, C_Rb_current)
+    R_sr_current = divide(C_Rb_voltage, impedances["R_sr"])
+    R_ex_current = subtract(other_current, R_sr_current)
+    R_ex_voltage = multiply(R_ex_current, impedances["R_ex"])
+    C_Xe_voltage = subtract(C_Rb_voltage, R_ex_voltage)
+    C_Xe_current = divide(C_Xe_voltage, impedances["C_Xe"])
+    R_w_current = subtract(R_ex_current, C_Xe_current)
+    return {"total_voltage": input_voltage + 0j,
+        "total_current": total_current,
+        "total_impedance": total_impedance + 1j*np.imag(parameters["input_impedance"]), # As in the script, only the input resistance is removed.
+        "R_op_voltage": R_op_voltage, "R_op_current": total_current, "R_op_impedance": impedances["R_op"],
+        "C_Rb_voltage": C_Rb_voltage, "C_Rb_current": C_Rb_current, "C_Rb_impedance": impedances["C_Rb"],
+        "R_sr_voltage": C_Rb_voltage, "R_sr_current": R_sr_current, "R_sr_impedance": impedances["R_sr"],
+        "R_ex_voltage": R_ex_voltage, "R_ex_current": R_ex_current, "R_ex_impedance": impedances["R_ex"],
+        "C_Xe_voltage": C_Xe_voltage, "C_Xe_current": C_Xe_current, "C_Xe_impedance": impedances["C_Xe"],
+        "R_w_voltage": multiply(R_w_current, impedances["R_w"]), "R_w_current": R_w_current, "R_w_impedance": impedances["R_w"]}
+
+def solve_coupled(parameters, impedances):
+    """ Solves two probes with mutually coupled coils, each with its own components (inductor_2_voltage), and the scattering parameters between them (s21). """
+    from Circuit_Coupled import coupled_solve
+    return coupled_solve(parameters, 2)
+
+def solve_cascade(parameters, impedances):
+    """ Solves the probe fed through a lossy line, seen from the instrument (total_...) and from the end of the line (probe_...). """
+    from Circuit_Cascade import cascade_solve
+    return cascade_solve(parameters, impedances)
+
+model_solvers = {"probe": solve_probe, "series": solve_series, "parallel": solve_parallel, "seop": solve_seop, "coupled": solve_coupled, "cascade": solve_cascade}
+
+
+###########################################################################
+# Noise
+# The coil resistance is the circuit's noise source, in series with the EMF that a signal induces in the coil, so both reach the input alike:
+#   V_input = H ε, with H = Z_T/(Z_L + Z_T) · Z_in/(Z + Z_in)   (Z_T/(Z_L + Z_T) is one without a tuning capacitor).
+# The coil's noise at the input is then sqrt(4kTR)|H|, equal to sqrt(4kT Re Z)|Z_in/(Z + Z_in)| by reciprocity.
+# The receiver adds the noise of its input resistance at the receiver temperature, sqrt(4kT_rx Re Z_in)|Z/(Z + Z_in)|.
+# The signal to noise ratio is that of a 1 V EMF in a 1 Hz bandwidth; only the receiver's noise makes it depend on the tuning.
+# It is referred to the coil EMF, 1/sqrt(4kTR + receiver/|H|²), so a noiseless receiver (Re Z_in = 0, as in the series circuit) leaves 1/sqrt(4kTR).
+# The noise current is that through the input, sqrt(4kTR|T|² + 4kT_rx Re Z_in)/|Z + Z_in| with T = Z_T/(Z_L + Z_T), the current into a short for Z_in = 0.
+
+def noise_calculations(parameters, impedances, results):
+    """ Returns the noise spectral densities at the input of a coil circuit, the transfer of a coil EMF to the input, and the signal to noise ratio. """
+    total_impedance, input_impedance = results["total_impedance"], parameters["input_impedance"]
+    loaded = add(total_impedance, input_impedance)
+    tuned = divide(impedances["tuning"], add(impedances["inductor"], impedances["tuning"])) if "tuning" in impedances else 1
+    transfer = multiply(tuned, divide(input_impedance, loaded))
+    coil_emf = 4 * boltzmann_constant * parameters["temperature"] * parameters["inductor_resistance"]
+    receiver_emf = 4 * boltzmann_constant * parameters["receiver_temperature"] * np.real(input_impedance)
+    receiver = receiver_emf * np.abs(divide(total_impedance, loaded))**2
+    with np.errstate(divide='ignore', invalid='ignore'):
+        referred = np.where(receiver > 0, receiver / np.abs(transfer)**2, 0) # Receiver noise referred to the coil EMF.
+    return {"signal_transfer": transfer,
+        "noise_voltage": np.sqrt(coil_emf * np.abs(transfer)**2 + receiver) + 0j, # Units of V/√Hz.
+        "noise_current": divide(np.sqrt(coil_emf * np.abs(tuned)**2 + receiver_emf), np.abs(loaded)) + 0j, # Through the input. Units of A/√Hz.
+        "snr": divide(1, np.sqrt(coil_emf + referred))} # Units of √Hz/V.
+
+def solve(topology, columns=None, impedances=None, precision="double"):
+    """ Solves a circuit for arrays of parameters, returning each branch quantity as a complex array of the given precision. """
+    parameters = model_parameters(topology, columns, precision)
+    if impedances is None:
+        impedances = impedance_calculations(parameters)
+    shape = np.broadcast_shapes(*[np.shape(value) for value in parameters.values()])
+    results = model_solvers[topology](parameters, impedances)
+    if "temperature" in parameters:
+        results.update(noise_calculations(parameters, impedances, results))
+    return {name: np.broadcast_to(value, shape) for name, value in results.items()}
+
+###########################################################################
+# Derived Quantities
+# Computed from the voltage, current, and impedance of a component only when asked for by name, so solve() and its exports stay the same size.
+# Currents are peak phasors, so the average power is ½|I|²R and the reactive power ½|I|²X. For the total, this is the power entering the circuit,
+# without that lost in the input impedance.
+
+def component_power(voltage, current, impedance):
+    """ Returns the average power dissipated in a component. Units of W. """
+    return 0.5 * np.abs(current)**2 * np.real(impedance) + 0j
+
+def component_reactive_power(voltage, current, impedance):
+    """ Returns the reactive power of a component, positive when inductive. Units of var. """
+    return 0.5 * np.abs(current)**2 * np.imag(impedance) + 0j
+
+def component_q(voltage, current, impedance):
+    """ Returns the quality factor |X|/R of a component, infinite for a lossless one. """
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.abs(np.imag(impedance)) / np.abs(np.real(impedance)) + 0j
+
+# Derived quantities of each component (and of the whole circuit, as "total"), with their titles.
+derived_quantities = {"reactive_power": (component_reactive_power, "reactive power [var]"), "power": (component_power, "power [W]"), "q": (component_q, "Q")}
+
+def derived_names(topology):
+    """ Returns the name of every derived quantity of a circuit. """
+    return [f"{name}_{quantity}" for name in ["total"] + model_components[topology] for quantity in derived_quantities]
+
+# Units of the results that are not branch voltages, currents, or impedances. Scattering parameters (s21) have none.
+result_units = {"signal_transfer": "", "noise_voltage": "V/√Hz", "noise_current": "A/√Hz", "snr": "√Hz/V"}
+
+def result_unit(name):
+    """ Returns the unit of a result of solve(). """
+    if name in result_units:
+        return result_units[name]
+    for quantity, unit in (("voltage", "V"), ("current", "A"), ("impedance", "Ω")):
+        if name.endswith("_" + quantity):
+            return unit
+    return ""
+
+def column_title(name, unit, part=None):
+    """ Returns the export title of a column, with its part (real or imaginary) and its unit, which unitless columns go without. """
+    title = name.replace('_', ' ').capitalize() + (f" ({part})" if part else "")
+    return f"{title} [{unit}]" if unit else title
+
+# Results and parameters of the driven input, where a circuit names them otherwise. Coupled probes are driven at the first coil.
+driven_names = {"coupled": {"inductor_voltage": "inductor_1_voltage", "total_current": "total_1_current", "total_impedance": "total_1_impedance",
+    "input_impedance": "input_impedance_1"}}
+
+def driven_name(topology, name):
+    """ Returns a circuit's own name for a result or parameter of its driven input. """
+    return driven_names.get(topology, {}).get(name, name)
+
+def derived_title(name):
+    """ Returns the export title of a derived quantity. """
+    for quantity, (function, title) in derived_quantities.items():
+        if name.endswith("_" + quantity):
+            return f"{name[:-len(quantity)-1].replace('_', ' ').capitalize()} {title}"
+    raise KeyError(f"Unknown result: {name}")
+
+def derived_column(column, name):
+    """ Computes a derived quantity by name, getting the results it needs from column(result name). """
+    for quantity, (function, title) in derived_quantities.items(): # reactive_power is checked before power.
+        if name.endswith("_" + quantity):
+            component = name[:-len(quantity)-1]
+            return function(column(f"{component}_voltage"), column(f"{component}_current"), column(f"{component}_impedance"))
+    raise KeyError(f"Unknown result: {name}")
+
+def result_column(results, name):
+    """ Returns a result by name, deriving it from the others where it is not among them. """
+    return results[name] if name in results else derived_column(results.__getitem__, name)
+
+def reflection(total_impedance, input_impedance=50):
+    """ Returns the reflection coefficient S11 of the circuit, as seen from the input impedance. """
+    input_impedance = np.asarray(input_impedance)
+    return divide(total_impedance - np.conj(input_impedance), total_impedance + input_impedance)
+
+
+###########################################################################
+###########################################################################
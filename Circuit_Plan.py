@@ -0,0 +1,158 @@
+###########################################################################
+###########################################################################
+#
+# Alex Heinrich
+# Memory Planner
+# Fits a sweep to a memory budget before it runs, spilling to disk or refusing where it cannot.
+#
+###########################################################################
+###########################################################################
+
+###########################################################################
+# Default Defined Parameters
+# These are variables that may be adjusted in the program.
+
+import os
+import shutil
+import numpy as np
+from Circuit_Models import model_precisions, solve
+from Circuit_Sweep import chunk_size, space_size, space_shape, axis_values, solve_chunks
+
+memory_fraction = 0.5 # Share of the available memory used when no budget is given.
+fallback_budget = 2**30 # Budget used where the available memory cannot be read. Units of bytes.
+working_copies = 4 # Temporary arrays formed for each result while a chunk is solved.
+minimum_chunk = 2**10 # Fewest datapoints solved at once. At most Circuit_Sweep's chunk size are, as larger chunks fall out of cache.
+spill_file = "=spill_{name}.npy" # Results kept on disk are saved as NumPy arrays, which np.load may reopen.
+
+# Results kept first when not all of them fit.
+column_priority = ["total_impedance", "total_current", "inductor_voltage", "inductor_current", "tuning_voltage", "tuning_current", "coupling_voltage", "coupling_current"]
+
+# Memory taken by each row the scripts append to their lists, measured with tracemalloc. Units of bytes.
+script_row_bytes = {"probe": 700, "series": 510, "parallel": 540, "seop": 1260}
+
+
+###########################################################################
+# Estimates
+
+def available_memory():
+    """ Returns the memory available to new processes in bytes, or None where it cannot be read. """
+    try:
+        with open("/proc/meminfo", 'r', encoding='utf-8') as meminfo:
+            for line in meminfo:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    if hasattr(os, "sysconf") and "SC_AVPHYS_PAGES" in os.sysconf_names:
+        return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+    return None
+
+def default_budget():
+    """ Returns a share of the available memory, or the fallback budget. """
+    available = available_memory()
+    return fallback_budget if available is None else int(available * memory_fraction)
+
+def result_names(topology):
+    """ Returns the names of every result of a circuit. """
+    return list(solve(topology))
+
+def value_bytes(precision="double"):
+    """ Returns the size of one complex result in bytes. """
+    return np.dtype(model_precisions[precision][1]).itemsize
+
+def point_bytes(space, topology, precision="double"):
+    """ Estimates the working memory of each datapoint while a chunk is solved: its swept values, component impedances, and results with their temporaries. """
+    results = len(result_names(topology))
+    return 8*(len(space["axes"]) + len(space["fixed"])) + value_bytes(precision)*results*working_copies
+
+
+###########################################################################
+# Plans
+# A plan is a dictionary, as for sweep spaces, and is reported before anything is solved.
+
+def plan_sweep(space, topology, budget=None, columns=None, spill=True, directory=".", precision="double"):
+    """ Picks the chunk size, the results kept, and where they are kept (memory or disk) for a sweep within a memory budget.
+        Given no columns, as many results are kept as fit in memory, or all on disk if none fit. Given columns, all of them are kept, on disk if need be.
+        Single precision halves the memory of the results kept. """
+    budget = default_budget() if budget is None else int(budget)
+    points, working, size = space_size(space), point_bytes(space, topology, precision), value_bytes(precision)
+    names = result_names(topology)
+    requested = names if columns is None else list(columns)
+    plan = {"topology": topology, "points": points, "budget": budget, "point bytes": working, "columns": requested, "dropped": [], "storage": "memory", "directory": directory, "precision": precision}
+    room = budget - minimum_chunk*working # Memory left for kept results once the smallest chunk is allowed for.
+    if columns is None and points*size*len(requested) > room: # Keeps results in order of priority, while they fit.
+        ordered = [name for name in column_priority if name in names] + [name for name in names if name not in column_priority]
+        fitting = max(int(room // max(points*size, 1)), 0)
+        if fitting:
+            plan["columns"], plan["dropped"] = ordered[:fitting], ordered[fitting:]
+    plan["retained bytes"] = points*size*len(plan["columns"])
+    if plan["retained bytes"] <= room:
+        plan["chunk"] = int(min(max((budget - plan["retained bytes"]) // working, minimum_chunk), chunk_size, max(points, 1)))
+    elif spill and shutil.disk_usage(directory).free > plan["retained bytes"]:
+        plan["storage"] = "disk"
+        plan["chunk"] = int(min(max(budget // working, minimum_chunk), chunk_size, max(points, 1)))
+    else:
+        plan["storage"], plan["chunk"] = None, 0
+        plan["reason"] = "the results fit neither in memory nor on disk" if spill else "the results do not fit in memory"
+    if budget < minimum_chunk*working:
+        plan["storage"], plan["chunk"] = None, 0
+        plan["reason"] = "the budget is smaller than the smallest chunk"
+    plan["peak bytes"] = (plan["retained bytes"] if plan["storage"] == "memory" else 0) + plan["chunk"]*working
+    return plan
+
+def script_plan(rows, topology, budget=None):
+    """ Plans a script calculation, whose lists must hold every row in memory. """
+    budget = default_budget() if budget is None else int(budget)
+    plan = {"topology": topology, "points": rows, "budget": budget, "point bytes": script_row_bytes[topology], "columns": ["every result"], "dropped": [],
+        "storage": "memory", "chunk": rows, "retained bytes": rows*script_row_bytes[topology], "peak bytes": rows*script_row_bytes[topology], "precision": "double"}
+    if plan["retained bytes"] > budget:
+        plan["storage"], plan["chunk"] = None, 0
+        plan["reason"] = "the script's lists do not fit in memory"
+    return plan
+
+def print_plan(plan):
+    """ Prints a plan. """
+    print("##################################################################################")
+    print(f"Datapoints:\t\t\t{plan['points']}\n"
+        f"Memory budget [B]:\t\t{plan['budget']:.3e}\n"
+        f"Memory per datapoint [B]:\t{plan['point bytes']}\n"
+        f"Results kept:\t\t\t{', '.join(plan['columns'])}")
+    if plan["precision"] != "double":
+        print(f"Precision:\t\t\t{plan['precision']}")
+    if plan["dropped"]:
+        print(f"Results dropped:\t\t{', '.join(plan['dropped'])}")
+    if plan["storage"] is None:
+        print(f"Refused, as {plan['reason']}.")
+    else:
+        print(f"Results stored in:\t\t{plan['storage']}\n"
+            f"Chunk size:\t\t\t{plan['chunk']}\n"
+            f"Peak memory [B]:\t\t{plan['peak bytes']:.3e}")
+    print("##################################################################################\n\n")
+
+
+###########################################################################
+# Running
+
+def run_plan(plan, space):
+    """ Solves a sweep as planned, returning a grid as in Circuit_Grid. Results kept on disk are memory-mapped .npy files. """
+    dtype = model_precisions[plan["precision"]][1]
+    if plan["storage"] is None:
+        raise MemoryError(f"Sweep refused, as {plan['reason']}.")
+    shape = space_shape(space)
+    grid = {"space": space, "topology": plan["topology"], "shape": shape, "axes": [axis_values(axis) for axis in space["axes"]], "columns": {}}
+    for name in plan["columns"]:
+        if plan["storage"] == "disk":
+            grid["columns"][name] = np.lib.format.open_memmap(os.path.join(plan["directory"], spill_file.format(name=name)), mode="w+", dtype=dtype, shape=shape)
+        else:
+            grid["columns"][name] = np.empty(shape, dtype=dtype)
+    for first, columns, results in solve_chunks(space, plan["topology"], plan["chunk"], precision=plan["precision"]):
+        for name in plan["columns"]:
+            grid["columns"][name].reshape(-1)[first:first+len(results[name])] = results[name]
+    for name in plan["columns"]:
+        if plan["storage"] == "disk":
+            grid["columns"][name].flush()
+    return grid
+
+
+###########################################################################
+###########################################################################
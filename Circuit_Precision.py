@@ -0,0 +1,97 @@
+###########################################################################
+###########################################################################
+#
+# Alex Heinrich
+# Single Precision Sweeps
+# Searches large sweeps in single precision, then re-solves the best datapoints in double precision.
+#
+###########################################################################
+###########################################################################
+
+###########################################################################
+# Default Defined Parameters
+# These are variables that may be adjusted in the program.
+
+import numpy as np
+from Circuit_Models import solve
+from Circuit_Sweep import space_size, index_columns
+from Circuit_Reduce import top_k, pool_best, separated_search, candidates, shortfall
+
+precision_samples = 4096 # Random datapoints solved in both precisions, for the error of each result.
+precision_margin = 4 # Factor applied to the largest error found, since the samples may miss the worst datapoint.
+precision_seed = 0 # Seed for the random datapoints, so that reports repeat.
+
+
+###########################################################################
+# Errors
+
+def relative_error(single, double):
+    """ Returns the largest relative difference between single and double precision results, over finite values. """
+    single, double = np.asarray(single, dtype=complex), np.asarray(double, dtype=complex)
+    finite = np.isfinite(double) & (double != 0)
+    if not finite.any():
+        return 0.0
+    return float(np.max(np.abs(np.nan_to_num(single[finite] - double[finite], nan=np.inf)) / np.abs(double[finite])))
+
+def precision_errors(space, topology, indices):
+    """ Solves the datapoints at the given sweep indices in both precisions, returning the largest relative error of each result. """
+    columns = index_columns(space, np.asarray(indices, dtype=np.int64))
+    single, double = solve(topology, columns, precision="single"), solve(topology, columns)
+    return {name: relative_error(single[name], double[name]) for name in double}
+
+
+###########################################################################
+# Refinement
+# The pool of a reducer holds the best datapoints by single precision score. Each is re-solved in double precision and the pool re-sorted.
+# With a relative error of at most e, no datapoint left out of the pool can be better than the last pooled score, widened by e.
+# Candidates beyond that bound are exact, as every better datapoint was pooled and re-solved.
+
+def refine(reducer, space, topology, samples=None):
+    """ Re-solves the pool of a single precision reducer in double precision. Returns the refined reducer and a report of the errors. """
+    samples = precision_samples if samples is None else samples
+    indices = np.asarray(reducer["indices"], dtype=np.int64)
+    columns = index_columns(space, indices)
+    single, double = solve(topology, columns, precision="single"), solve(topology, columns)
+    errors = {name: relative_error(single[name], double[name]) for name in double}
+    if samples > 0 and space_size(space) > 0:
+        sampled = precision_errors(space, topology, np.random.default_rng(precision_seed).integers(0, space_size(space), samples))
+        errors = {name: max(errors[name], sampled[name]) for name in errors}
+    values = np.abs(double[reducer["quantity"]]).reshape(-1)
+    scores = np.nan_to_num(values if reducer["direction"] == "maximum" else -values, nan=-np.inf)
+    points = {name: np.asarray(values, dtype=float) for name, values in reducer["points"].items()}
+    refined = pool_best(dict(reducer), scores, indices, points)
+    error = min(errors[reducer["quantity"]] * precision_margin, 0.5)
+    if len(reducer["scores"]) < reducer["pool"]: # Every datapoint was pooled, so nothing was left out.
+        bound = np.inf if reducer["direction"] == "minimum" else 0.0
+    else:
+        last = abs(reducer["scores"][-1])
+        bound = last / (1 - error) if reducer["direction"] == "maximum" else last / (1 + error)
+    chosen = candidates(refined)
+    beyond = [candidate["score"] > bound if reducer["direction"] == "maximum" else candidate["score"] < bound for candidate in chosen]
+    certified = beyond.index(False) if False in beyond else len(beyond)
+    return refined, {"errors": errors, "error": error, "bound": float(bound), "certified": certified, "candidates": len(chosen),
+        "shortfall": shortfall(refined, chosen)}
+
+def single_search(space, topology, k=1, separation=None, quantity="inductor_voltage", direction="maximum", pool=None, chunk=None):
+    """ Finds the k best separated datapoints of a sweep in single precision, then refines them in double precision.
+        Returns the candidates, with double precision scores, and the report of refine(). """
+    reducer = separated_search(space, topology, top_k(k, separation, quantity, direction, pool), chunk, precision="single")
+    refined, report = refine(reducer, space, topology)
+    return candidates(refined), report
+
+def print_precision(report):
+    """ Prints the errors of a single precision sweep. """
+    print("##################################################################################")
+    for name, error in report["errors"].items():
+        print(f"{name.replace('_', ' ').capitalize()} relative error:\t{error:.2e}")
+    print(f"\nError bound used:\t\t{report['error']:.2e}\n"
+        f"Exact candidates:\t\t{report['certified']} of {report['candidates']}")
+    if report["certified"] < report["candidates"]:
+        print("Enlarge the pool, or sweep in double precision, for the rest.")
+    if report["shortfall"]:
+        print(f"Candidates not found:\t\t{report['shortfall']}, as the pool ran out. Enlarge the pool.")
+    print("##################################################################################\n\n")
+
+
+###########################################################################
+###########################################################################
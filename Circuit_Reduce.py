@@ -0,0 +1,178 @@
+###########################################################################
+###########################################################################
+#
+# Alex Heinrich
+# Sweep Reducers
+# Keeps the best datapoints of a sweep as it streams, in bounded memory.
+#
+###########################################################################
+###########################################################################
+
+###########################################################################
+# Default Defined Parameters
+# These are variables that may be adjusted in the program.
+
+import numpy as np
+from Circuit_Models import result_column
+from Circuit_Sweep import space_size, solve_chunks
+
+candidate_pool = 256 # Number of datapoints pooled for each candidate requested.
+candidate_block = 256 # Number of sorted datapoints checked for separation at once.
+candidate_growth = 8 # Factor by which separated_search enlarges a pool that ran out of candidates.
+candidate_pool_limit = 2**20 # Largest pool separated_search grows to, beyond which the shortfall is reported instead.
+
+
+###########################################################################
+# Top-K Candidates
+# A reducer is a dictionary of lists, so that shards may save or send it as JSON and merge it later.
+# Each chunk replaces the values of a reducer rather than changing them in place, so a copy of the dictionary keeps the reducer as it was.
+# It pools the best datapoints by score alone, which merges exactly: ties go to the lower sweep index, so the pool is the same however the sweep is split.
+# Candidates are then chosen from the pool best first, skipping any datapoint closer than the separation in every variable to one already chosen.
+# Every candidate chosen is exact, since all better datapoints are pooled. Fewer than k are returned only if the pool runs out; separated_search then enlarges the pool to find the rest.
+# Memory grows with the pool, not with k alone. The pool is kept as arrays while a sweep is reduced, and written to JSON as lists by reducer_json.
+
+def top_k(k, separation=None, quantity="inductor_voltage", direction="maximum", pool=None):
+    """ Returns an empty reducer for the k best datapoints by |quantity|, each at least separation[name] from the others in some variable. """
+    return {"type": "top_k", "k": int(k), "separation": dict(separation or {}), "quantity": quantity, "direction": direction,
+        "pool": int(candidate_pool * k if pool is None else pool), "scores": [], "indices": [], "points": {}}
+
+def pool_best(reducer, scores, indices, points):
+    """ Keeps the pool's worth of best datapoints, best first, then lowest index. """
+    if len(scores) > reducer["pool"]:
+        boundary = np.partition(-scores, reducer["pool"] - 1)[reducer["pool"] - 1] # Score of the last pooled datapoint.
+        inside = np.flatnonzero(-scores <= boundary) # Includes every tie at the boundary, which the sort below settles.
+        scores, indices, points = scores[inside], indices[inside], {name: values[inside] for name, values in points.items()}
+    order = np.lexsort((indices, -scores))[:reducer["pool"]]
+    reducer["scores"] = scores[order]
+    reducer["indices"] = indices[order]
+    reducer["points"] = {name: values[order] for name, values in points.items()}
+    return reducer
+
+def reducer_json(value):
+    """ Returns an array of a reducer as a list, for json.dump(..., default=reducer_json). """
+    return value.tolist()
+
+def reduce_top_k(reducer, first, columns, results):
+    """ Adds a solved chunk of a sweep to a top-k reducer. """
+    values = np.abs(result_column(results, reducer["quantity"])).reshape(-1)
+    scores = np.nan_to_num(values if reducer["direction"] == "maximum" else -values, nan=-np.inf)
+    indices = first + np.arange(len(scores), dtype=np.int64)
+    keep = scores > -np.inf
+    if len(reducer["scores"]) == reducer["pool"]: # Only datapoints at least as good as the last pooled may enter.
+        keep &= scores >= reducer["scores"][-1]
+    if not keep.any() and reducer["points"]: # Nothing enters, so the pool is left as it is.
+        return reducer
+    names = set(reducer["points"]) | set(reducer["separation"]) | set(name for name in columns if np.ndim(columns[name]))
+    points = {name: np.concatenate([np.asarray(reducer["points"].get(name, []), dtype=float), np.broadcast_to(columns[name], scores.shape)[keep]]) for name in names}
+    return pool_best(reducer, np.concatenate([np.asarray(reducer["scores"], dtype=float), scores[keep]]),
+        np.concatenate([np.asarray(reducer["indices"], dtype=np.int64), indices[keep]]), points)
+
+def merge_top_k(*reducers):
+    """ Combines top-k reducers from separate shards of the same sweep into one. """
+    merged = dict(reducers[0], scores=[], indices=[], points={})
+    names = set().union(*[reducer["points"] for reducer in reducers])
+    points = {name: np.concatenate([np.asarray(reducer["points"].get(name, []), dtype=float) for reducer in reducers]) for name in names} # Shards with no chunks have no points.
+    return pool_best(merged, np.concatenate([np.asarray(reducer["scores"], dtype=float) for reducer in reducers]),
+        np.concatenate([np.asarray(reducer["indices"], dtype=np.int64) for reducer in reducers]), points)
+
+def extreme(quantity="inductor_voltage", direction="maximum"):
+    """ Returns an empty reducer for the single best datapoint by |quantity|: a top-k reducer pooling one datapoint. """
+    return top_k(1, None, quantity, direction, pool=1)
+
+def reduce_sweep(space, topology, reducer, chunk=None, start=0, stop=None, precision="double"):
+    """ Feeds a sweep space, or the shard of it from start to stop, through a reducer as it is solved. """
+    for first, columns, results in solve_chunks(space, topology, chunk, start, stop, precision):
+        reducer = reduce_chunk(reducer, first, columns, results)
+    return reducer
+
+def conflicts(points, separation, i, j):
+    """ Flags pairs of datapoints i and j that lie within the separation in every variable. """
+    close = np.ones(np.broadcast_shapes(np.shape(i), np.shape(j)), dtype=bool)
+    for name, distance in separation.items():
+        close &= np.abs(points[name][i] - points[name][j]) < distance
+    return close
+
+def candidates(reducer):
+    """ Returns up to k separated datapoints from the pool, best first, as dictionaries of their variables, score, and sweep index. """
+    points = {name: np.asarray(values) for name, values in reducer["points"].items()}
+    separation = reducer["separation"]
+    chosen = []
+    for start in range(0, len(reducer["scores"]), candidate_block):
+        block = np.arange(start, min(start + candidate_block, len(reducer["scores"])))
+        if chosen and separation: # Most of a block usually lies beside a chosen peak, and is discarded at once.
+            block = block[~np.any(conflicts(points, separation, block[:, None], np.array(chosen)[None, :]), axis=-1)]
+        for i in block:
+            if not chosen or not separation or not np.any(conflicts(points, separation, i, np.array(chosen))):
+                chosen.append(i)
+                if len(chosen) == reducer["k"]:
+                    break
+        if len(chosen) == reducer["k"]:
+            break
+    return [dict({name: float(values[i]) for name, values in reducer["points"].items()}, score=abs(float(reducer["scores"][i])), index=int(reducer["indices"][i])) for i in chosen]
+
+def shortfall(reducer, chosen=None):
+    """ Returns the number of the k candidates missing because the pool ran out, or 0. A pool with room to spare held every datapoint,
+        so fewer candidates from it means no more exist. """
+    chosen = candidates(reducer) if chosen is None else chosen
+    return reducer["k"] - len(chosen) if len(reducer["scores"]) == reducer["pool"] else 0
+
+def separated_search(space, topology, reducer, chunk=None, precision="double"):
+    """ Feeds a sweep through an empty top-k reducer, running it again with a pool candidate_growth times larger while the pool runs out of
+        separated candidates, until it holds the whole sweep or candidate_pool_limit datapoints. Returns the reducer. """
+    limit = max(min(space_size(space), candidate_pool_limit), reducer["pool"])
+    while True:
+        reduced = reduce_sweep(space, topology, dict(reducer), chunk, precision=precision)
+        if not shortfall(reduced) or reduced["pool"] >= limit:
+            return reduced
+        reducer = dict(reducer, pool=min(reducer["pool"] * candidate_growth, limit))
+
+
+###########################################################################
+# Histograms
+# Counts of |quantity| between edges, with those below the first edge, above the last, and nan kept apart. Counts add exactly across shards.
+
+def histogram(edges, quantity="inductor_voltage"):
+    """ Returns an empty reducer counting |quantity| between increasing edges. """
+    edges = [float(edge) for edge in edges]
+    if len(edges) < 2 or np.any(np.diff(edges) <= 0):
+        raise ValueError("Histogram edges must be at least two increasing values.")
+    return {"type": "histogram", "quantity": quantity, "edges": edges, "counts": [0] * (len(edges) - 1), "below": 0, "above": 0, "invalid": 0}
+
+def reduce_histogram(reducer, first, columns, results):
+    """ Adds a solved chunk of a sweep to a histogram. """
+    values = np.abs(result_column(results, reducer["quantity"])).reshape(-1)
+    valid = ~np.isnan(values)
+    edges = np.asarray(reducer["edges"])
+    counts = np.histogram(values[valid], edges)[0]
+    reducer["counts"] = [int(total) for total in np.asarray(reducer["counts"]) + counts]
+    reducer["below"] += int(np.sum(values[valid] < edges[0]))
+    reducer["above"] += int(np.sum(values[valid] > edges[-1]))
+    reducer["invalid"] += int(np.sum(~valid))
+    return reducer
+
+def merge_histogram(*reducers):
+    """ Combines histograms from separate shards of the same sweep into one. """
+    merged = dict(reducers[0], counts=[int(total) for total in np.sum([reducer["counts"] for reducer in reducers], axis=0)])
+    for name in ("below", "above", "invalid"):
+        merged[name] = sum(reducer[name] for reducer in reducers)
+    return merged
+
+
+###########################################################################
+# Any Reducer
+
+reducer_functions = {"top_k": (reduce_top_k, merge_top_k), "histogram": (reduce_histogram, merge_histogram)} # Adds a chunk, and merges shards, for each type.
+
+def reduce_chunk(reducer, first, columns, results):
+    """ Adds a solved chunk of a sweep to a reducer of any type. """
+    return reducer_functions[reducer["type"]][0](reducer, first, columns, results)
+
+def merge(*reducers):
+    """ Combines reducers of one type from separate shards of the same sweep into one. """
+    if len(set(reducer["type"] for reducer in reducers)) != 1:
+        raise ValueError("Only reducers of the same type may be merged.")
+    return reducer_functions[reducers[0]["type"]][1](*reducers)
+
+
+###########################################################################
+###########################################################################
@@ -0,0 +1,150 @@
+###########################################################################
+###########################################################################
+#
+# Alex Heinrich
+# Circuit Search
+# Finds the best trade-offs between coil voltage, match, and bandwidth.
+#
+###########################################################################
+###########################################################################
+
+###########################################################################
+# Default Defined Parameters
+# These are variables that may be adjusted in the program.
+
+import numpy as np
+from itertools import product
+from Circuit_Models import model_parameters, solve, reflection, result_column, driven_name
+from Circuit_Transfer import transfer_functions, resonance_summary
+
+search_levels = 12 # Number of times promising cells are subdivided.
+search_cells = 4096 # Largest number of cells evaluated at any level. The most dominated cells are discarded to stay within it.
+comparison_chunk_size = 1024 # Number of points compared against all others at once.
+
+# Objectives, each with the direction in which it improves. Bandwidth is searched by default only for circuits with a rational transfer function.
+search_objectives = {"voltage": "maximum", "s11": "minimum", "bandwidth": "maximum"}
+
+
+###########################################################################
+# Objectives
+
+def default_objectives(topology):
+    """ Returns the objectives searched by default for a circuit. """
+    return {name: direction for name, direction in search_objectives.items() if name != "bandwidth" or topology in transfer_functions}
+
+def evaluate_objectives(topology, columns, objectives):
+    """ Solves the circuit at each point and returns |inductor voltage|, |S11| and the loaded bandwidth, as requested. """
+    results = solve(topology, columns)
+    parameters = model_parameters(topology, columns)
+    values = {}
+    if "voltage" in objectives: # Coupled probes are searched at the driven coil.
+        values["voltage"] = np.abs(results[driven_name(topology, "inductor_voltage")])
+    if "s11" in objectives:
+        values["s11"] = np.abs(reflection(results[driven_name(topology, "total_impedance")], parameters[driven_name(topology, "input_impedance")]))
+    if "bandwidth" in objectives:
+        if topology not in transfer_functions:
+            raise ValueError(f"The {topology} circuit has no rational transfer function, so its bandwidth cannot be searched. Search other objectives.")
+        values["bandwidth"] = np.nan_to_num(resonance_summary(topology, columns, parameters["input_impedance"])["bandwidth"], nan=0) # Components alone set the bandwidth.
+    for name in objectives:
+        if name not in values:
+            values[name] = np.abs(result_column(results, name)) # Any other result, or derived quantity, may be targeted by its magnitude.
+    return values
+
+def constraint_violation(values, constraints):
+    """ Sums the relative amount by which each point breaks the constraints; zero for feasible points. """
+    violation = 0
+    for name, (minimum, maximum) in (constraints or {}).items():
+        if minimum is not None:
+            violation = violation + np.maximum(0, minimum - values[name]) / max(abs(minimum), 1e-300)
+        if maximum is not None:
+            violation = violation + np.maximum(0, values[name] - maximum) / max(abs(maximum), 1e-300)
+    return violation + np.zeros(len(next(iter(values.values()))))
+
+
+###########################################################################
+# Dominance
+# Objectives are compared as costs, so that lower is better for each.
+# A feasible point dominates any infeasible one, and infeasible points are ranked by their violation.
+
+def objective_costs(values, objectives):
+    """ Arranges objective values as costs [point, objective]. """
+    return np.stack([-values[name] if search_objectives.get(direction, direction) == "maximum" else values[name] for name, direction in objectives.items()], axis=-1)
+
+def domination_counts(costs, violation):
+    """ Counts the points that dominate each point. Non-dominated points have a count of zero. """
+    counts = np.zeros(len(costs), dtype=np.int64)
+    for start in range(0, len(costs), comparison_chunk_size): # Compares a chunk of points against all points.
+        limit = violation[start:start+comparison_chunk_size, None]
+        no_worse, better = True, False
+        for j in range(costs.shape[1]): # One objective at a time, so only [chunk, point] arrays are formed.
+            cost = costs[start:start+comparison_chunk_size, j, None]
+            no_worse = no_worse & (costs[None, :, j] <= cost)
+            better = better | (costs[None, :, j] < cost)
+        dominated = (violation[None, :] < limit) | ((violation[None, :] == 0) & (limit == 0) & no_worse & better)
+        counts[start:start+comparison_chunk_size] = np.sum(dominated, axis=-1)
+    return counts
+
+def non_dominated(costs, violation):
+    """ Flags the points that no other point dominates. """
+    return domination_counts(costs, violation) == 0
+
+
+###########################################################################
+# Search
+# Cells are boxes in coordinates from 0 to 1 along each axis, mapped to linear or logarithmic values.
+# Each cell is judged by its centre, and only the least dominated cells are subdivided.
+
+def axis_coordinate_values(axis, coordinates):
+    """ Maps coordinates from 0 to 1 onto the values of a linear or logarithmic axis. """
+    if axis["scale"] == "logarithmic":
+        return axis["minimum"] * (axis["maximum"] / axis["minimum"])**coordinates
+    if axis["scale"] == "linear":
+        return axis["minimum"] + (axis["maximum"] - axis["minimum"]) * coordinates
+    raise ValueError("Searches require linear or logarithmic axes.")
+
+def subdivide(lower, width):
+    """ Splits each cell in half along every axis. """
+    offsets = np.array(list(product((0, 1), repeat=lower.shape[1]))) # One child per corner.
+    lower = (lower[:, None, :] + offsets[None, :, :] * width[:, None, :] / 2).reshape(-1, lower.shape[1])
+    return lower, np.repeat(width / 2, len(offsets), axis=0)
+
+def pareto_search(axes, fixed=None, constraints=None, objectives=None, topology="probe", levels=None, cells=None):
+    """ Returns the non-dominated points over the given axes, subject to constraints given as {objective: (minimum, maximum)}. """
+    levels = search_levels if levels is None else levels
+    cells = search_cells if cells is None else cells
+    objectives = default_objectives(topology) if objectives is None else ({name: search_objectives.get(name, "maximum") for name in objectives} if not isinstance(objectives, dict) else objectives)
+    needed = dict(objectives, **{name: "minimum" for name in (constraints or {}) if name not in objectives})
+    divisions = [axis["sampling_rate"] for axis in axes]
+    lower = np.array(list(product(*[np.arange(n) / n for n in divisions])), dtype=float)
+    width = np.tile(1 / np.array(divisions, dtype=float), (len(lower), 1))
+    archive, evaluations = None, 0
+    for level in range(levels+1):
+        centre = lower + width/2
+        columns = dict(fixed or {})
+        for i in range(len(axes)):
+            columns[axes[i]["name"]] = axis_coordinate_values(axes[i], centre[:, i])
+        values = evaluate_objectives(topology, columns, needed)
+        violation = constraint_violation(values, constraints)
+        costs = objective_costs(values, objectives)
+        evaluations += len(lower)
+        points = {axis["name"]: columns[axis["name"]] for axis in axes}
+        points.update(values)
+        points["violation"], points["costs"] = violation, costs
+        if archive is not None: # Only the non-dominated points found so far are kept.
+            points = {name: np.concatenate([archive[name], points[name]]) for name in points}
+        front = non_dominated(points["costs"], points["violation"])
+        archive = {name: value[front] for name, value in points.items()}
+        if level == levels:
+            break
+        counts = domination_counts(costs, violation)
+        keep = np.lexsort((violation, counts))[:max(1, cells // 2**len(axes))] # The most dominated cells are never subdivided.
+        lower, width = subdivide(lower[keep], width[keep])
+    order = np.argsort(archive["costs"][:, 0])
+    result = {name: value[order] for name, value in archive.items() if name != "costs"}
+    result["feasible"] = result["violation"] == 0
+    result["evaluations"] = evaluations
+    return result
+
+
+###########################################################################
+###########################################################################
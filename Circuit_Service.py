@@ -0,0 +1,297 @@
+###########################################################################
+###########################################################################
+#
+# Alex Heinrich
+# Tuning Service
+# Answers evaluate, match, sweep, and optimize requests over local HTTP, with the engines kept loaded.
+#
+###########################################################################
+###########################################################################
+
+###########################################################################
+# Default Defined Parameters
+# These are variables that may be adjusted in the program.
+
+import json
+import time
+import queue
+import argparse
+import threading
+import collections
+import numpy as np
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from Circuit_Models import model_defaults, model_parameters, solve
+from Circuit_Sweep import space_size, solve_chunks
+from Circuit_Reduce import reduce_chunk, candidates, shortfall
+from Circuit_Bound import bound_search
+
+service_host, service_port = "127.0.0.1", 8765 # Only this machine may connect by default.
+batch_window = 0 # Time to wait for more requests before solving a batch. Requests arriving while a batch is solved join the next one anyway. Units of seconds.
+batch_limit = 1024 # Most requests solved in one batch.
+cache_size = 4096 # Number of answers remembered, for repeated requests.
+sweep_limit = 2**22 # Largest sweep answered, as the service would be busy for too long otherwise.
+service_backlog = 128 # Connections waiting to be accepted, beyond which more are refused.
+
+service_queue = queue.Queue() # Evaluate and match requests waiting for the next batch.
+service_cache = collections.OrderedDict() # Answers by request, oldest first.
+service_lock = threading.Lock() # Guards the cache and counts.
+service_counts = {"requests": 0, "batches": 0, "batched requests": 0, "cache hits": 0, "started": time.time()}
+
+
+###########################################################################
+# JSON
+# Complex values are sent as {"real": ..., "imaginary": ...}, with either part a number or a list.
+
+def decode_value(value):
+    """ Returns a request value as an array, complex where it was sent as real and imaginary parts. """
+    if isinstance(value, dict):
+        return np.asarray(value["real"], dtype=float) + 1j*np.asarray(value["imaginary"], dtype=float)
+    return np.asarray(value, dtype=float)
+
+def encode_real(value):
+    """ Returns a real array as JSON-friendly numbers or lists, with nan and infinities as null, which strict JSON allows. """
+    value = np.asarray(value)
+    if value.dtype.kind == "f" and not np.all(np.isfinite(value)):
+        value = np.where(np.isfinite(value), value, None)
+    return value.tolist()
+
+def encode_value(value):
+    """ Returns an array as JSON-friendly numbers or lists, complex values as real and imaginary parts. """
+    value = np.asarray(value)
+    if np.iscomplexobj(value):
+        return {"real": encode_real(value.real), "imaginary": encode_real(value.imag)}
+    return encode_real(value)
+
+def encode_answer(answer):
+    """ Returns a small answer with every number made JSON-friendly, as encode_real. """
+    if isinstance(answer, dict):
+        return {name: encode_answer(value) for name, value in answer.items()}
+    if isinstance(answer, (list, tuple)):
+        return [encode_answer(value) for value in answer]
+    if isinstance(answer, (float, np.floating, np.integer, np.ndarray)):
+        return encode_real(answer)
+    return answer
+
+def decode_parameters(topology, parameters):
+    """ Returns the parameters of a request as arrays, refusing any the circuit does not have. """
+    if topology not in model_defaults:
+        raise ValueError(f"Unknown circuit: {topology}")
+    unknown = set(parameters) - set(model_defaults[topology])
+    if unknown:
+        raise ValueError(f"Unknown {topology} parameters: {', '.join(sorted(unknown))}")
+    return {name: decode_value(value) for name, value in parameters.items()}
+
+
+###########################################################################
+# Matching
+# The probe is matched when Z = conj(Z_in). With 1/Z_L = g - ib and B = ωC_t - b, the parallel branch has
+#   Re(Z_p) = g/(g² + B²), and Im(Z_p) = -B/(g² + B²).
+# Re(Z_p) = R_in gives B = ±sqrt(g/R_in - g²); only the negative root leaves Im(Z_p) > 0, which the coupling capacitor can cancel.
+
+def match_capacitances(frequency, inductance, inductor_resistance, input_impedance=50):
+    """ Returns the tuning and coupling capacitances matching the probe to its input impedance, or nan where no capacitors can. """
+    angular_frequency = 2 * 3.14159265359 * np.asarray(frequency, dtype=float) # Units of radians per second.
+    inductor = inductor_resistance + 1j * angular_frequency * inductance
+    g, b = (1 / inductor).real, -(1 / inductor).imag
+    r_in, x_in = np.real(input_impedance), np.imag(input_impedance)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        susceptance = -np.sqrt(g/r_in - g**2)
+        tuning_capacitance = (susceptance + b) / angular_frequency
+        reactance = -susceptance / (g**2 + susceptance**2) # Im(Z_p) at the match.
+        coupling_capacitance = 1 / (angular_frequency * (reactance + x_in))
+    possible = (tuning_capacitance > 0) & (coupling_capacitance > 0) & np.isfinite(coupling_capacitance)
+    return {"tuning_capacitance": np.where(possible, tuning_capacitance, np.nan), "coupling_capacitance": np.where(possible, coupling_capacitance, np.nan)}
+
+
+###########################################################################
+# Batches
+# Evaluate and match requests are queued, and whatever is waiting is solved as one array, then split back into answers.
+
+def flatten_request(topology, parameters):
+    """ Returns the shape of a request and its parameters broadcast to that shape and flattened. """
+    parameters = model_parameters(topology, parameters)
+    shape = np.broadcast_shapes(*[np.shape(value) for value in parameters.values()])
+    return shape, {name: np.broadcast_to(value, shape).reshape(-1) for name, value in parameters.items()}
+
+def split_results(results, shapes):
+    """ Splits the results of a batch back into those of each request. """
+    bounds = np.cumsum([0] + [int(np.prod(shape, dtype=np.int64)) for shape in shapes])
+    return [{name: value[bounds[i]:bounds[i+1]].reshape(shapes[i]) for name, value in results.items()} for i in range(len(shapes))]
+
+def evaluate_batch(topology, precision, requests):
+    """ Solves the parameters of many evaluate requests together. """
+    shapes, flat = zip(*[flatten_request(topology, request) for request in requests])
+    columns = {name: np.concatenate([parameters[name] for parameters in flat]) for name in flat[0]}
+    return split_results(solve(topology, columns, precision=precision), shapes)
+
+def match_batch(topology, precision, requests):
+    """ Matches the probe for many match requests together, also solving it at each match. """
+    shapes, flat = zip(*[flatten_request("probe", request) for request in requests])
+    columns = {name: np.concatenate([parameters[name] for parameters in flat]) for name in flat[0]}
+    columns.update(match_capacitances(columns["frequency"], columns["inductance"], columns["inductor_resistance"], columns["input_impedance"]))
+    results = solve("probe", columns, precision=precision)
+    return split_results({"tuning_capacitance": columns["tuning_capacitance"], "coupling_capacitance": columns["coupling_capacitance"],
+        "total_impedance": results["total_impedance"], "inductor_voltage": results["inductor_voltage"]}, shapes)
+
+batch_functions = {"evaluate": evaluate_batch, "match": match_batch}
+
+def answer_batch(pending):
+    """ Solves a batch of queued requests, grouped by kind, circuit, and precision, and hands each its answer. """
+    groups = collections.defaultdict(list)
+    for item in pending:
+        groups[(item["kind"], item["topology"], item["precision"])].append(item)
+    for (kind, topology, precision), items in groups.items():
+        try:
+            answers = batch_functions[kind](topology, precision, [item["parameters"] for item in items])
+        except Exception: # One bad request fails alone, rather than its whole batch.
+            answers = []
+            for item in items:
+                try:
+                    answers.append(batch_functions[kind](topology, precision, [item["parameters"]])[0])
+                except Exception as error:
+                    answers.append(error)
+        for item, answer in zip(items, answers):
+            item["answer"] = answer
+            item["done"].set()
+    with service_lock:
+        service_counts["batches"] += 1
+        service_counts["batched requests"] += len(pending)
+
+def batch_loop():
+    """ Solves queued requests in batches, for as long as the service runs. """
+    while True:
+        pending = [service_queue.get()]
+        deadline = time.perf_counter() + batch_window
+        while len(pending) < batch_limit:
+            try:
+                remaining = deadline - time.perf_counter()
+                pending.append(service_queue.get(timeout=remaining) if remaining > 0 else service_queue.get_nowait())
+            except queue.Empty:
+                break
+        answer_batch(pending)
+
+def queued_answer(kind, request):
+    """ Queues an evaluate or match request and waits for its answer. """
+    topology = "probe" if kind == "match" else request.get("topology", "probe")
+    item = {"kind": kind, "topology": topology, "precision": request.get("precision", "double"),
+        "parameters": decode_parameters(topology, request.get("parameters", {})), "done": threading.Event(), "answer": None}
+    service_queue.put(item)
+    item["done"].wait()
+    if isinstance(item["answer"], Exception):
+        raise item["answer"]
+    return {"results": {name: encode_value(value) for name, value in item["answer"].items()}}
+
+
+###########################################################################
+# Requests
+
+def sweep_answer(request):
+    """ Feeds a sweep space through named reducers, as in Circuit_Shard. """
+    space, topology = request["space"], request.get("topology", "probe")
+    if space_size(space) > sweep_limit:
+        raise ValueError(f"Sweeps of more than {sweep_limit} datapoints are refused. Use Circuit_Shard for these.")
+    reducers = request["reducers"]
+    for first, columns, results in solve_chunks(space, topology, None, 0, None, request.get("precision", "double")):
+        for name in reducers:
+            reducers[name] = reduce_chunk(reducers[name], first, columns, results)
+    answer = {"reducers": reducers}
+    answer["candidates"] = {name: [{key: int(value) if key == "index" else float(value) for key, value in candidate.items()} for candidate in candidates(reducer)]
+        for name, reducer in reducers.items() if reducer["type"] == "top_k"}
+    answer["shortfall"] = {name: shortfall(reducer) for name, reducer in reducers.items() if reducer["type"] == "top_k"} # Candidates missing as the pool ran out.
+    return encode_answer(answer)
+
+def optimize_answer(request):
+    """ Finds the largest inductor voltage of the probe over two capacitance axes, as in Circuit_Bound. """
+    return encode_answer(bound_search(request["tuning_axis"], request["coupling_axis"], {name: decode_value(value) for name, value in request.get("fixed", {}).items()}))
+
+def status_answer(request):
+    """ Returns the counts of requests, batches, and cache hits. """
+    with service_lock:
+        return dict(service_counts, uptime=time.time() - service_counts["started"], cached=len(service_cache))
+
+request_functions = {"/evaluate": lambda request: queued_answer("evaluate", request), "/match": lambda request: queued_answer("match", request),
+    "/sweep": sweep_answer, "/optimize": optimize_answer, "/status": status_answer}
+
+def answer(path, body):
+    """ Answers a request, from the cache where it was asked before. """
+    key = path + json.dumps(body, sort_keys=True)
+    with service_lock:
+        service_counts["requests"] += 1
+        if path != "/status" and key in service_cache:
+            service_cache.move_to_end(key)
+            service_counts["cache hits"] += 1
+            return service_cache[key]
+    if path not in request_functions:
+        raise KeyError(f"Unknown request: {path}")
+    response = json.dumps(request_functions[path](body), allow_nan=False).encode('utf-8') # Non-finite numbers are sent as null.
+    if path != "/status":
+        with service_lock:
+            service_cache[key] = response
+            if len(service_cache) > cache_size:
+                service_cache.popitem(last=False)
+    return response
+
+class ServiceHandler(BaseHTTPRequestHandler):
+    """ Answers JSON posted to /evaluate, /match, /sweep, or /optimize, and /status. Connections are kept open between requests. """
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True # Otherwise each small answer waits for the client's delayed acknowledgement.
+
+    def reply(self, status, response):
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(response)))
+        self.end_headers()
+        self.wfile.write(response)
+
+    def do_POST(self):
+        try:
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            self.reply(200, answer(self.path, body))
+        except (ValueError, KeyError, TypeError) as error:
+            message = str(error.args[0]) if isinstance(error, KeyError) and error.args else str(error) # KeyError quotes its message.
+            self.reply(404 if self.path not in request_functions else 400, json.dumps({"error": message}).encode('utf-8'))
+        except Exception as error:
+            self.reply(500, json.dumps({"error": repr(error)}).encode('utf-8'))
+
+    def do_GET(self):
+        if self.path == "/status":
+            self.do_POST()
+        else:
+            self.reply(404, b'{"error": "Requests are posted as JSON."}')
+
+    def log_message(self, format, *arguments): # Requests are not logged, for speed.
+        pass
+
+def serve(host=None, port=None):
+    """ Starts the service, warming up each engine first, and answers requests until interrupted. """
+    for topology in model_defaults:
+        solve(topology)
+    match_capacitances(10**7, 10**(-6), 0.1)
+    threading.Thread(target=batch_loop, daemon=True).start()
+    server = ThreadingHTTPServer((host or service_host, port or service_port), ServiceHandler, bind_and_activate=False)
+    server.daemon_threads = True
+    server.request_queue_size = service_backlog
+    server.server_bind()
+    server.server_activate()
+    print(f"Answering requests at http://{server.server_address[0]}:{server.server_address[1]}/ (evaluate, match, sweep, optimize, status).")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    server.server_close()
+
+
+###########################################################################
+# Global Script
+#   curl -s localhost:8765/match -d '{"parameters": {"frequency": 40e6, "inductance": 0.6e-6, "inductor_resistance": 0.1}}'
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Answers evaluate, match, sweep, and optimize requests as JSON over local HTTP.")
+    parser.add_argument("--host", default=service_host)
+    parser.add_argument("--port", type=int, default=service_port)
+    arguments = parser.parse_args()
+    serve(arguments.host, arguments.port)
+
+
+###########################################################################
+###########################################################################
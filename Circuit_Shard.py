@@ -0,0 +1,174 @@
+###########################################################################
+###########################################################################
+#
+# Alex Heinrich
+# Sweep Shards
+# Splits a sweep into jobs for separate machines, and merges their reductions into one result.
+#
+###########################################################################
+###########################################################################
+
+###########################################################################
+# Default Defined Parameters
+# These are variables that may be adjusted in the program.
+
+import os
+import sys
+import json
+import time
+import argparse
+import subprocess
+import numpy as np
+from Circuit_Sweep import chunk_size, sweep_axis, sweep_space, space_size
+from Circuit_Reduce import top_k, extreme, histogram, reduce_chunk, merge, candidates, shortfall, reducer_json
+from Circuit_Checkpoint import job_name, load_checkpoint, clear_checkpoint, checkpointed_chunks
+
+shard_file = "=shard_{index}.json" # Job of each shard.
+shard_result = "=shard_{index}_result.json" # Reductions of each shard.
+merged_file = "=shard_merged.json" # Reductions of the whole sweep.
+shard_interval = 300 # Time between checkpoints of each shard, which resumes if run again. Units of seconds.
+
+# Sweep split by default: every component of the probe, and frequency.
+shard_space = sweep_space(sweep_axis("frequency", 10*(10**6), 100*(10**6), 20, "logarithmic"),
+    sweep_axis("inductance", 0.1*(10**(-6)), 2*(10**(-6)), 20, "logarithmic"),
+    sweep_axis("inductor_resistance", 0.05, 1, 10),
+    sweep_axis("tuning_capacitance", 1*(10**(-12)), 100*(10**(-12)), 40, "logarithmic"),
+    sweep_axis("coupling_capacitance", 0.5*(10**(-12)), 50*(10**(-12)), 40, "logarithmic"))
+
+# Reductions of each shard by default, by name.
+shard_reducers = {"maximum": extreme("inductor_voltage"),
+    "candidates": top_k(5, {"tuning_capacitance": 5*(10**(-12)), "coupling_capacitance": 1*(10**(-12))}, "inductor_voltage"),
+    "histogram": histogram(np.geomspace(10**(-3), 10**3, 61), "inductor_voltage")}
+
+
+###########################################################################
+# Shards
+# A shard is a range of sweep indices. Reducers merge exactly however the sweep is split, so the merged result is that of one run.
+
+def split_sweep(space, topology, shards, reducers=None, chunk=None, precision="double", directory="."):
+    """ Writes one job file for each of the shards of a sweep, returning their paths. """
+    reducers = shard_reducers if reducers is None else reducers
+    size = space_size(space)
+    if shards > size:
+        raise ValueError(f"A sweep of {size} datapoints can be split into at most {size} shards.")
+    job = job_name("shards", space, topology, reducers, chunk, precision, shards)
+    paths = []
+    for index in range(shards):
+        shard = {"job": job, "index": index, "shards": shards, "space": space, "topology": topology, "start": size*index // shards,
+            "stop": size*(index+1) // shards, "chunk": chunk, "precision": precision, "reducers": reducers}
+        paths.append(os.path.join(directory, shard_file.format(index=index)))
+        with open(paths[-1], 'w', encoding='utf-8') as data_file:
+            json.dump(shard, data_file)
+    return paths
+
+def run_shard(file_name, directory=None, interval=None):
+    """ Runs the job of one shard, feeding each of its chunks through every reducer, and writes its reductions beside the job. Returns their path. """
+    with open(file_name, 'r', encoding='utf-8') as data_file:
+        shard = json.load(data_file)
+    directory = (os.path.dirname(file_name) or ".") if directory is None else directory
+    interval = shard_interval if interval is None else interval
+    job = job_name(shard["job"], shard["index"])
+    state = load_checkpoint(job, directory) or {"next": shard["start"], "complete": False, "reducers": shard["reducers"]}
+    started = time.perf_counter()
+    if not state["complete"]:
+        def keep(first, columns, results):
+            return {"reducers": {name: reduce_chunk(dict(reducer), first, columns, results) for name, reducer in state["reducers"].items()}}
+        state = checkpointed_chunks(job, state, shard["space"], shard["topology"], shard["chunk"] or chunk_size, interval, directory, shard["precision"], keep, None, shard["stop"])
+    result = {"job": shard["job"], "index": shard["index"], "shards": shard["shards"], "points": shard["stop"] - shard["start"],
+        "seconds": time.perf_counter() - started, "reducers": state["reducers"]}
+    path = os.path.join(directory, shard_result.format(index=shard["index"]))
+    with open(path, 'w', encoding='utf-8') as data_file:
+        json.dump(result, data_file, default=reducer_json)
+    clear_checkpoint(job, directory)
+    return path
+
+def merge_shards(file_names):
+    """ Merges the reductions of every shard of a job into those of the whole sweep. """
+    results = []
+    for file_name in file_names:
+        with open(file_name, 'r', encoding='utf-8') as data_file:
+            results.append(json.load(data_file))
+    if len(set(result["job"] for result in results)) != 1:
+        raise ValueError("The shard results come from different jobs.")
+    indices = sorted(result["index"] for result in results)
+    if indices != list(range(results[0]["shards"])):
+        missing = sorted(set(range(results[0]["shards"])) - set(indices))
+        raise ValueError(f"Each shard must be merged once. Missing shards: {missing}" if missing else "A shard was given more than once.")
+    return {"job": results[0]["job"], "shards": results[0]["shards"], "points": sum(result["points"] for result in results),
+        "seconds": sum(result["seconds"] for result in results),
+        "reducers": {name: merge(*[result["reducers"][name] for result in results]) for name in results[0]["reducers"]}}
+
+def run_local(space, topology, shards, reducers=None, chunk=None, precision="double", directory="."):
+    """ Splits a sweep, runs its shards at once as separate processes on this machine, and merges them. """
+    paths = split_sweep(space, topology, shards, reducers, chunk, precision, directory)
+    processes = [subprocess.Popen([sys.executable, os.path.abspath(__file__), "run", path]) for path in paths]
+    if any(process.wait() != 0 for process in processes):
+        raise RuntimeError("A shard failed.")
+    return merge_shards([os.path.join(directory, shard_result.format(index=index)) for index in range(shards)])
+
+def print_merged(merged):
+    """ Prints the merged reductions of a sweep. """
+    print("##################################################################################")
+    print(f"Datapoints:\t\t\t{merged['points']}\nShards:\t\t\t\t{merged['shards']}\nSeconds across shards:\t\t{merged['seconds']:.1f}\n")
+    for name, reducer in merged["reducers"].items():
+        if reducer["type"] == "top_k":
+            print(f"{name.capitalize()} ({reducer['direction']} |{reducer['quantity'].replace('_', ' ')}|):")
+            chosen = candidates(reducer)
+            for candidate in chosen:
+                variables = ", ".join(f"{key.replace('_', ' ')} {value:.4e}" for key, value in candidate.items() if key not in ("score", "index"))
+                print(f"\t{candidate['score']:.6e}\tat {variables}")
+            if shortfall(reducer, chosen):
+                print(f"\t{shortfall(reducer, chosen)} of {reducer['k']} candidates not found, as the pool of {reducer['pool']} ran out. Use a larger pool.")
+        elif reducer["type"] == "histogram":
+            print(f"{name.capitalize()} of |{reducer['quantity'].replace('_', ' ')}|:\t{reducer['below']} below {reducer['edges'][0]:.3e}, "
+                f"{reducer['above']} above {reducer['edges'][-1]:.3e}, {reducer['invalid']} undefined")
+            for i in np.flatnonzero(reducer["counts"]):
+                print(f"\t{reducer['edges'][i]:.3e} to {reducer['edges'][i+1]:.3e}:\t{reducer['counts'][i]}")
+        print()
+    print("##################################################################################\n\n")
+
+
+###########################################################################
+# Global Script
+#   python Circuit_Shard.py split --shards 8 [--space space.json] [--reducers reducers.json]
+#   python Circuit_Shard.py run =shard_3.json                (on each machine)
+#   python Circuit_Shard.py merge =shard_*_result.json
+#   python Circuit_Shard.py local --shards 4                 (every shard at once on this machine)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Splits a sweep into shards for separate machines, runs a shard, or merges their results.")
+    parser.add_argument("action", choices=["split", "run", "merge", "local"])
+    parser.add_argument("files", nargs="*", help="Shard jobs to run, or shard results to merge.")
+    parser.add_argument("--space", help="JSON file of a sweep space, as from Circuit_Sweep. The five dimensional probe sweep by default.")
+    parser.add_argument("--reducers", help="JSON file of named reducers, as from Circuit_Reduce. A maximum, top 5 candidates, and a histogram by default.")
+    parser.add_argument("--topology", default="probe", choices=["probe", "series", "parallel", "seop"])
+    parser.add_argument("--shards", type=int, default=4)
+    parser.add_argument("--chunk", type=int)
+    parser.add_argument("--precision", default="double", choices=["double", "single"])
+    parser.add_argument("--directory", default=".")
+    arguments = parser.parse_args()
+    space, reducers = shard_space, shard_reducers
+    if arguments.space:
+        with open(arguments.space, 'r', encoding='utf-8') as data_file:
+            space = json.load(data_file)
+    if arguments.reducers:
+        with open(arguments.reducers, 'r', encoding='utf-8') as data_file:
+            reducers = json.load(data_file)
+    if arguments.action == "split":
+        for path in split_sweep(space, arguments.topology, arguments.shards, reducers, arguments.chunk, arguments.precision, arguments.directory):
+            print(f"python Circuit_Shard.py run {path}")
+    elif arguments.action == "run":
+        for file_name in arguments.files:
+            print(f"Saved the reductions of {file_name} to {run_shard(file_name)}.")
+    else:
+        if arguments.action == "merge":
+            merged = merge_shards(arguments.files)
+        else:
+            merged = run_local(space, arguments.topology, arguments.shards, reducers, arguments.chunk, arguments.precision, arguments.directory)
+        with open(os.path.join(arguments.directory, merged_file), 'w', encoding='utf-8') as data_file:
+            json.dump(merged, data_file, default=reducer_json)
+        print_merged(merged)
+
+
+###########################################################################
+###########################################################################
@@ -0,0 +1,131 @@
+###########################################################################
+###########################################################################
+#
+# Alex Heinrich
+# Sweep Spaces
+# Any number of variables, each stepped linearly, logarithmically, or through a list of values.
+#
+###########################################################################
+###########################################################################
+
+###########################################################################
+# Default Defined Parameters
+# These are variables that may be adjusted in the program.
+
+import numpy as np
+from Circuit_Models import solve
+
+chunk_size = 2**14 # Number of datapoints handed out at once. Small enough for each chunk's arrays to stay in cache.
+
+# Variables that may be swept, with their units.
+parameter_units = {"frequency": "Hz",
+    "inductance": "H",
+    "inductor_resistance": "Ω",
+    "input_impedance": "Ω",
+    "input_voltage": "V",
+    "tuning_capacitance": "F",
+    "coupling_capacitance": "F",
+    "R_op": "Ω",
+    "C_Rb": "F",
+    "R_sr": "Ω",
+    "R_ex": "Ω",
+    "C_Xe": "F",
+    "R_w": "Ω",
+    "temperature": "K",
+    "receiver_temperature": "K",
+    "coupling_coefficient": "",
+    "line_length": "m",
+    "coil_line_length": "m",
+    "characteristic_impedance": "Ω",
+    "velocity_factor": "",
+    "line_attenuation": "dB/m"}
+
+
+###########################################################################
+# Axes
+# An axis is a dictionary, so that a sweep space may be saved or sent as JSON.
+
+def parameter_unit(name):
+    """ Returns the unit of a variable, also when numbered for one coil of coupled circuits (inductance_2, coupling_coefficient_12), or None if unknown. """
+    base = name.rstrip("0123456789")
+    return parameter_units.get(name, parameter_units.get(base[:-1]) if base.endswith("_") and base != name else None)
+
+def sweep_axis(name, minimum, maximum, sampling_rate, scale="linear"):
+    """ Returns an axis of sampling_rate+1 values from minimum to maximum, spaced linearly or logarithmically. """
+    if parameter_unit(name) is None:
+        raise ValueError(f"Unknown sweep variable: {name}")
+    if scale not in ("linear", "logarithmic"):
+        raise ValueError(f"Unknown axis scale: {scale}")
+    return {"name": name, "scale": scale, "minimum": minimum, "maximum": maximum, "sampling_rate": int(sampling_rate)}
+
+def explicit_axis(name, values):
+    """ Returns an axis that takes each of the given values in turn. """
+    if parameter_unit(name) is None:
+        raise ValueError(f"Unknown sweep variable: {name}")
+    return {"name": name, "scale": "explicit", "values": [float(value) for value in values]}
+
+def axis_values(axis):
+    """ Returns the values taken along an axis. """
+    if axis["scale"] == "explicit":
+        return np.asarray(axis["values"])
+    if axis["scale"] == "logarithmic":
+        return np.geomspace(axis["minimum"], axis["maximum"], axis["sampling_rate"]+1)
+    return np.linspace(axis["minimum"], axis["maximum"], axis["sampling_rate"]+1)
+
+def axis_length(axis):
+    """ Returns the number of values along an axis. """
+    return len(axis["values"]) if axis["scale"] == "explicit" else axis["sampling_rate"]+1
+
+
+###########################################################################
+# Sweep Spaces
+
+def sweep_space(*axes, fixed=None):
+    """ Combines axes into the Cartesian product of their values. Variables not swept take their fixed values. """
+    names = [axis["name"] for axis in axes]
+    if len(set(names)) != len(names):
+        raise ValueError("Each variable may be swept along one axis only.")
+    fixed = {name: value for name, value in (fixed or {}).items() if name not in names}
+    return {"axes": list(axes), "fixed": fixed}
+
+def space_shape(space):
+    """ Returns the number of values along each axis. """
+    return tuple(axis_length(axis) for axis in space["axes"])
+
+def space_size(space):
+    """ Returns the total number of datapoints in a sweep space. """
+    return int(np.prod(space_shape(space), dtype=np.int64))
+
+def index_columns(space, indices, values=None):
+    """ Returns the columns of variables at the given sweep indices. """
+    values = [axis_values(axis) for axis in space["axes"]] if values is None else values
+    indices = np.unravel_index(indices, space_shape(space))
+    columns = dict(space["fixed"])
+    for i in range(len(values)):
+        columns[space["axes"][i]["name"]] = values[i][indices[i]]
+    return columns
+
+def sweep_chunks(space, chunk=None, start=0, stop=None):
+    """ Yields (first index, columns) for consecutive chunks of datapoints, with the last axis varying fastest. """
+    chunk = chunk_size if chunk is None else chunk
+    values = [axis_values(axis) for axis in space["axes"]]
+    stop = space_size(space) if stop is None else min(stop, space_size(space))
+    for first in range(start, stop, chunk):
+        yield first, index_columns(space, np.arange(first, min(first+chunk, stop)), values) # Only this chunk of the product is formed.
+
+def solve_chunks(space, topology, chunk=None, start=0, stop=None, precision="double"):
+    """ Yields (first index, parameter columns, results) as each chunk of a sweep space is solved. """
+    for first, columns in sweep_chunks(space, chunk, start, stop):
+        yield first, columns, solve(topology, columns, precision=precision)
+
+def sweep_point(space, index):
+    """ Returns the variables at one datapoint of a sweep space. """
+    indices = np.unravel_index(index, space_shape(space))
+    point = dict(space["fixed"])
+    for i in range(len(space["axes"])):
+        point[space["axes"][i]["name"]] = axis_values(space["axes"][i])[indices[i]]
+    return point
+
+
+###########################################################################
+###########################################################################
@@ -0,0 +1,186 @@
+###########################################################################
+###########################################################################
+#
+# Alex Heinrich
+# Touchstone Comparison
+# Compares measured one-port (.s1p) files with simulated sweeps.
+#
+###########################################################################
+###########################################################################
+
+###########################################################################
+# Default Defined Parameters
+# These are variables that may be adjusted in the program.
+
+import argparse
+import numpy as np
+from Circuit_Kernel import divide
+from Circuit_Models import solve, reflection
+from Circuit_Sweep import sweep_axis, axis_values
+
+frequency_units = {"hz": 1, "khz": 10**3, "mhz": 10**6, "ghz": 10**9}
+default_options = {"unit": "ghz", "parameter": "s", "format": "ma", "reference": 50.0} # Touchstone defaults, for files without an option line.
+
+
+###########################################################################
+# Reading
+# Comments (!) and keyword lines ([Version], [Network Data], [End], ...) are skipped, so Touchstone 1.0 and 2.0 one-port files both read.
+
+def touchstone_options(line):
+    """ Reads an option line, such as '# MHz S RI R 50'. """
+    options = dict(default_options)
+    words = line.lstrip("#").split("!")[0].lower().split()
+    i = 0
+    while i < len(words):
+        if words[i] in frequency_units:
+            options["unit"] = words[i]
+        elif words[i] in ("s", "y", "z"):
+            options["parameter"] = words[i]
+        elif words[i] in ("ri", "ma", "db"):
+            options["format"] = words[i]
+        elif words[i] == "r":
+            options["reference"] = float(words[i+1])
+            i += 1
+        else:
+            raise ValueError(f"Unsupported Touchstone option: {words[i]}")
+        i += 1
+    return options
+
+def read_touchstone(file_name):
+    """ Reads a one-port Touchstone file, returning its frequencies [Hz], S11, and impedance [Ω]. """
+    with open(file_name, 'r', encoding='utf-8', errors='replace') as data_file:
+        options = dict(default_options)
+        while True: # Reads the header only; the data are parsed in one pass below.
+            position = data_file.tell()
+            line = data_file.readline()
+            if not line:
+                break
+            stripped = line.strip()
+            if stripped.startswith("#"):
+                options = touchstone_options(stripped)
+            elif stripped and not stripped.startswith(("!", "[")):
+                data_file.seek(position)
+                break
+        data = np.loadtxt(data_file, comments=["!", "#", "["], ndmin=2)
+    if data.shape[1] != 3:
+        raise ValueError(f"{file_name} is not a one-port file.")
+    frequency = data[:, 0] * frequency_units[options["unit"]]
+    if options["format"] == "ri":
+        value = data[:, 1] + 1j*data[:, 2]
+    else:
+        size = data[:, 1] if options["format"] == "ma" else 10**(data[:, 1]/20)
+        value = size * np.exp(1j * np.radians(data[:, 2]))
+    reference = options["reference"]
+    if options["parameter"] == "s":
+        s11 = value
+    elif options["parameter"] == "z": # Network data are normalized to the reference impedance.
+        s11 = reflection(value * reference, reference)
+    else:
+        s11 = reflection(divide(reference, value), reference)
+    return {"file": file_name, "frequency": frequency, "s11": s11, "impedance": s11_impedance(s11, reference), "reference": reference}
+
+def s11_impedance(s11, reference=50):
+    """ Converts reflection coefficients into impedances, Z = R(1 + S11)/(1 - S11). """
+    s11 = np.asarray(s11, dtype=complex)
+    return reference * divide(1 + s11, 1 - s11)
+
+
+###########################################################################
+# Comparison
+# Measured S11 is interpolated onto the simulated frequency axis, where it is smooth and bounded, then converted to impedance.
+
+def resample(measurement, frequencies):
+    """ Interpolates measured S11 onto a frequency axis, with nan beyond the measured range. """
+    frequencies = np.asarray(frequencies, dtype=float)
+    order = np.argsort(measurement["frequency"])
+    measured, s11 = measurement["frequency"][order], measurement["s11"][order]
+    real = np.interp(frequencies, measured, s11.real, left=np.nan, right=np.nan)
+    imaginary = np.interp(frequencies, measured, s11.imag, left=np.nan, right=np.nan)
+    return real + 1j*imaginary
+
+def compare_measurements(measurements, frequencies, topology="probe", parameters=None):
+    """ Simulates the circuit over a frequency axis and returns the residuals of every measurement, as [file, frequency] arrays.
+        Parameters may be scalars, or one value per file. """
+    frequencies = np.asarray(frequencies, dtype=float)
+    references = np.array([measurement["reference"] for measurement in measurements])[:, None]
+    measured_s11 = np.stack([resample(measurement, frequencies) for measurement in measurements]) # [file, frequency]
+    columns = {name: np.asarray(value)[..., None] if np.ndim(value) else value for name, value in (parameters or {}).items()}
+    columns["frequency"] = frequencies[None, :]
+    simulated_impedance = solve(topology, columns)["total_impedance"]
+    simulated_s11 = reflection(simulated_impedance, references)
+    measured_s11, simulated_s11 = np.broadcast_arrays(measured_s11, simulated_s11)
+    measured_impedance = s11_impedance(measured_s11, references)
+    s11_residual = measured_s11 - simulated_s11
+    valid = np.isfinite(s11_residual)
+    squared = np.where(valid, np.abs(s11_residual)**2, 0)
+    with np.errstate(invalid='ignore'):
+        rms = np.sqrt(np.sum(squared, axis=-1) / np.sum(valid, axis=-1))
+    return {"files": [measurement["file"] for measurement in measurements], "frequency": frequencies,
+        "measured s11": measured_s11, "simulated s11": simulated_s11,
+        "measured impedance": measured_impedance, "simulated impedance": np.broadcast_to(simulated_impedance, measured_impedance.shape),
+        "s11 residual": s11_residual, "impedance residual": measured_impedance - simulated_impedance,
+        "rms s11 residual": rms, "maximum s11 residual": np.max(np.where(valid, np.abs(s11_residual), 0), axis=-1),
+        "measured match frequency": frequencies[np.argmin(np.nan_to_num(np.abs(measured_s11), nan=np.inf), axis=-1)],
+        "simulated match frequency": frequencies[np.argmin(np.nan_to_num(np.abs(simulated_s11), nan=np.inf), axis=-1)]}
+
+def compare_files(file_names, frequencies=None, topology="probe", parameters=None):
+    """ Reads Touchstone files and compares them with the circuit, over the given frequencies or those of the first file. """
+    measurements = [read_touchstone(file_name) for file_name in file_names]
+    if frequencies is None:
+        frequencies = np.sort(measurements[0]["frequency"])
+    return compare_measurements(measurements, frequencies, topology, parameters)
+
+
+###########################################################################
+# Export
+
+def export_residuals(comparison, file_name="=residuals.txt"):
+    """ Saves the residuals of each file as tab separated values in a text file. """
+    with open(file_name, 'w', encoding='utf-8') as data_file:
+        print("File\tRMS S11 residual\tMaximum S11 residual\tMeasured match frequency [Hz]\tSimulated match frequency [Hz]", file=data_file)
+        for i in range(len(comparison["files"])):
+            print(f"{comparison['files'][i]}\t"
+                f"{comparison['rms s11 residual'][i]}\t"
+                f"{comparison['maximum s11 residual'][i]}\t"
+                f"{comparison['measured match frequency'][i]}\t"
+                f"{comparison['simulated match frequency'][i]}", file=data_file)
+
+def export_overlay(comparison, index=0, file_name="=overlay.txt"):
+    """ Saves the measured and simulated impedance of one file over the frequency axis, for plotting together. """
+    measured, simulated = comparison["measured impedance"][index], comparison["simulated impedance"][index]
+    block = np.column_stack([comparison["frequency"], measured.real, measured.imag, simulated.real, simulated.imag,
+        np.abs(comparison["measured s11"][index]), np.abs(comparison["simulated s11"][index])])
+    titles = ("Frequency [Hz]\tMeasured impedance (real) [Ω]\tMeasured impedance (imaginary) [Ω]\t"
+        "Simulated impedance (real) [Ω]\tSimulated impedance (imaginary) [Ω]\tMeasured |S11|\tSimulated |S11|")
+    np.savetxt(file_name, block, delimiter="\t", header=titles, comments="", fmt="%.17g", encoding='utf-8')
+
+
+###########################################################################
+# Global Script
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compares measured .s1p files with a simulated circuit.")
+    parser.add_argument("files", nargs="+")
+    parser.add_argument("--topology", default="probe", choices=["probe", "series", "parallel"])
+    parser.add_argument("--minimum", type=float, help="Lowest simulated frequency [Hz]. The first file's frequencies are used by default.")
+    parser.add_argument("--maximum", type=float, help="Highest simulated frequency [Hz].")
+    parser.add_argument("--sampling-rate", type=int, default=1000)
+    for name in ("inductance", "inductor_resistance", "tuning_capacitance", "coupling_capacitance"):
+        parser.add_argument(f"--{name.replace('_', '-')}", type=float)
+    arguments = parser.parse_args()
+    frequencies = None
+    if arguments.minimum is not None and arguments.maximum is not None:
+        frequencies = axis_values(sweep_axis("frequency", arguments.minimum, arguments.maximum, arguments.sampling_rate))
+    parameters = {name: getattr(arguments, name) for name in ("inductance", "inductor_resistance", "tuning_capacitance", "coupling_capacitance") if getattr(arguments, name) is not None}
+    comparison = compare_files(arguments.files, frequencies, arguments.topology, parameters)
+    export_residuals(comparison)
+    if len(arguments.files) == 1:
+        export_overlay(comparison)
+    for i in range(len(comparison["files"])):
+        print(f"{comparison['files'][i]}:\tRMS S11 residual {comparison['rms s11 residual'][i]:.3e}\t"
+            f"match at {comparison['measured match frequency'][i]:.6e} Hz (simulated {comparison['simulated match frequency'][i]:.6e} Hz)")
+    print("Data exported successfully.\n")
+
+
+###########################################################################
+###########################################################################
@@ -0,0 +1,198 @@
+###########################################################################
+###########################################################################
+#
+# Alex Heinrich
+# Transfer Function Analyzer
+# Total impedance as a rational function of s = iω.
+#
+###########################################################################
+###########################################################################
+
+###########################################################################
+# Default Defined Parameters
+# These are variables that may be adjusted in the program.
+
+import numpy as np
+
+chunk_size = 2**16 # Number of frequencies evaluated at once for each component set.
+
+# Default parameters of each circuit, matching their scripts.
+transfer_defaults = {"probe": {"inductance": 0.6*(10**(-6)), "inductor_resistance": 0.1, "tuning_capacitance": 25.2*(10**(-12)), "coupling_capacitance": 1.19*(10**(-12))},
+    "series": {"inductance": 0.6*(10**(-6)), "inductor_resistance": 0.1, "coupling_capacitance": 1.19*(10**(-12))},
+    "parallel": {"inductance": 0.6*(10**(-6)), "inductor_resistance": 0.1, "tuning_capacitance": 25.2*(10**(-12))},
+    "seop": {"R_op": 1, "C_Rb": 1*(10**(-6)), "R_sr": 1, "R_ex": 1, "C_Xe": 1*(10**(-6)), "R_w": 1}}
+
+
+###########################################################################
+# Basic Operations
+# A polynomial is an array of coefficients [..., degree+1], highest power first.
+# A rational function is a pair [numerator, denominator] of such arrays.
+
+def polynomial_add(p_1, p_2):
+    """ Adds polynomials, padding the shorter with leading zeros. """
+    size = max(p_1.shape[-1], p_2.shape[-1])
+    p_1 = np.concatenate([np.zeros(p_1.shape[:-1] + (size - p_1.shape[-1],)), p_1], axis=-1)
+    p_2 = np.concatenate([np.zeros(p_2.shape[:-1] + (size - p_2.shape[-1],)), p_2], axis=-1)
+    return p_1 + p_2
+
+def polynomial_multiply(p_1, p_2):
+    """ Multiplies polynomials by convolving their coefficients. """
+    shape = np.broadcast_shapes(p_1.shape[:-1], p_2.shape[:-1])
+    result = np.zeros(shape + (p_1.shape[-1] + p_2.shape[-1] - 1,))
+    for i in range(p_1.shape[-1]):
+        result[..., i:i+p_2.shape[-1]] += p_1[..., i, None] * p_2
+    return result
+
+def rational_add(z_1, z_2):
+    """ Adds rational functions, as for components in series. """
+    numerator = polynomial_add(polynomial_multiply(z_1[0], z_2[1]), polynomial_multiply(z_2[0], z_1[1]))
+    return [numerator, polynomial_multiply(z_1[1], z_2[1])]
+
+def rational_parallel(z_1, z_2):
+    """ Adds rational functions as an inverse reciprocal sum, as for components in parallel. """
+    numerator = polynomial_multiply(z_1[0], z_2[0])
+    denominator = polynomial_add(polynomial_multiply(z_1[0], z_2[1]), polynomial_multiply(z_2[0], z_1[1]))
+    return [numerator, denominator]
+
+def resistor(resistance):
+    """ Returns the impedance R. """
+    resistance = np.asarray(resistance, dtype=float)
+    return [resistance[..., None], np.ones(resistance.shape + (1,))]
+
+def inductor(inductance, resistance=0):
+    """ Returns the impedance sL + R. """
+    inductance, resistance = np.broadcast_arrays(np.asarray(inductance, dtype=float), np.asarray(resistance, dtype=float))
+    return [np.stack([inductance, resistance], axis=-1), np.ones(inductance.shape + (1,))]
+
+def capacitor(capacitance):
+    """ Returns the impedance 1/(sC). """
+    capacitance = np.asarray(capacitance, dtype=float)
+    return [np.ones(capacitance.shape + (1,)), np.stack([capacitance, np.zeros(capacitance.shape)], axis=-1)]
+
+
+###########################################################################
+# Circuits
+# Each follows reduce_circuit() in its script, excluding the input impedance.
+
+def probe_transfer(inductance, inductor_resistance, tuning_capacitance, coupling_capacitance):
+    """ Total impedance of the probe circuit. """
+    parallel_impedance = rational_parallel(inductor(inductance, inductor_resistance), capacitor(tuning_capacitance)) # Inductor and tuning capacitor.
+    return rational_add(parallel_impedance, capacitor(coupling_capacitance)) # Inductor, tuning capacitor, and coupling capacitor.
+
+def series_transfer(inductance, inductor_resistance, coupling_capacitance):
+    """ Total impedance of the series circuit. """
+    return rational_add(inductor(inductance, inductor_resistance), capacitor(coupling_capacitance))
+
+def parallel_transfer(inductance, inductor_resistance, tuning_capacitance):
+    """ Total impedance of the parallel circuit. """
+    return rational_parallel(inductor(inductance, inductor_resistance), capacitor(tuning_capacitance))
+
+def seop_transfer(R_op, C_Rb, R_sr, R_ex, C_Xe, R_w):
+    """ Total impedance of the SEOP circuit. """
+    parallel_1 = rational_parallel(resistor(R_w), capacitor(C_Xe))
+    series_1 = rational_add(parallel_1, resistor(R_ex))
+    parallel_2 = rational_parallel(series_1, resistor(R_sr))
+    parallel_3 = rational_parallel(parallel_2, capacitor(C_Rb))
+    return rational_add(parallel_3, resistor(R_op))
+
+transfer_functions = {"probe": probe_transfer, "series": series_transfer, "parallel": parallel_transfer, "seop": seop_transfer}
+
+def total_transfer(topology, parameters=None):
+    """ Derives the coefficients of the total impedance once for each component set, filling missing parameters with defaults. """
+    filled = dict(transfer_defaults[topology])
+    filled.update({name: value for name, value in (parameters or {}).items() if name in filled})
+    return transfer_functions[topology](**filled)
+
+def loaded_transfer(rational, input_impedance=50, input_voltage=1):
+    """ Returns the total current V/(Z + Z_in) as a rational function. """
+    numerator, denominator = rational
+    input_impedance, input_voltage = np.asarray(input_impedance), np.asarray(input_voltage)
+    return [denominator * input_voltage[..., None], polynomial_add(numerator, denominator * input_impedance[..., None])]
+
+
+###########################################################################
+# Evaluation
+
+def horner(coefficients, s):
+    """ Evaluates polynomials [..., degree+1] at points s [frequency], giving [..., frequency]. """
+    result = np.broadcast_to(coefficients[..., 0, None], coefficients.shape[:-1] + s.shape).astype(complex)
+    for i in range(1, coefficients.shape[-1]):
+        result = result * s + coefficients[..., i, None]
+    return result
+
+def frequency_response(rational, frequencies, chunk=None):
+    """ Evaluates rational functions over a frequency grid, in chunks of frequencies. Returns [..., frequency]. """
+    chunk = chunk_size if chunk is None else chunk
+    frequencies = np.asarray(frequencies, dtype=float)
+    numerator, denominator = rational
+    response = np.empty(np.broadcast_shapes(numerator.shape[:-1], denominator.shape[:-1]) + frequencies.shape, dtype=complex)
+    for start in range(0, frequencies.shape[-1], chunk):
+        s = 1j * 2 * 3.14159265359 * frequencies[start:start+chunk]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            response[..., start:start+chunk] = horner(numerator, s) / horner(denominator, s)
+    return response
+
+
+###########################################################################
+# Poles and Zeros
+# Roots are found as eigenvalues of companion matrices, stacked across component sets.
+
+def polynomial_roots(coefficients):
+    """ Finds the roots of polynomials [..., degree+1], giving [..., degree] complex roots. """
+    coefficients = np.asarray(coefficients, dtype=float)
+    used = np.flatnonzero(np.any(coefficients != 0, axis=tuple(range(coefficients.ndim-1))))
+    if len(used) == 0:
+        return np.zeros(coefficients.shape[:-1] + (0,), dtype=complex)
+    zero_roots = coefficients.shape[-1] - 1 - used[-1] # Trailing zeros are roots at s = 0.
+    coefficients = coefficients[..., used[0]:used[-1]+1]
+    degree = coefficients.shape[-1] - 1
+    roots = np.zeros(coefficients.shape[:-1] + (degree + zero_roots,), dtype=complex)
+    if degree > 0:
+        with np.errstate(divide='ignore', invalid='ignore'):
+            scale = (np.abs(coefficients[..., -1]) / np.abs(coefficients[..., 0]))**(1/degree) # Brings the roots near unit magnitude.
+            scaled = coefficients * scale[..., None]**np.arange(degree, -1, -1)
+            companion = np.zeros(coefficients.shape[:-1] + (degree, degree))
+            companion[..., 0, :] = -scaled[..., 1:] / scaled[..., :1]
+            companion[..., np.arange(1, degree), np.arange(degree-1)] = 1
+            finite = np.all(np.isfinite(companion), axis=(-2, -1))
+            roots[..., :degree] = np.where(finite[..., None], np.linalg.eigvals(np.where(finite[..., None, None], companion, 0)) * scale[..., None], np.nan)
+    return roots
+
+def poles_zeros(topology, parameters=None, input_impedance=None):
+    """ Returns the zeros and poles of the total impedance, and its natural modes when driven through the input impedance. """
+    rational = total_transfer(topology, parameters)
+    result = {"zeros": polynomial_roots(rational[0]), "poles": polynomial_roots(rational[1])}
+    if input_impedance is not None:
+        result["modes"] = polynomial_roots(loaded_transfer(rational, input_impedance)[1]) # Poles of the source current.
+    return result
+
+def resonances(roots):
+    """ Returns the resonant frequency, quality factor and -3 dB bandwidth of each complex pair of roots, sorted by frequency.
+        Real roots, as in the SEOP circuit, do not resonate: each is reported at its corner frequency |p|/2π, which is also its bandwidth,
+        with a quality factor of zero and resonant set False. """
+    roots = np.asarray(roots, dtype=complex)
+    roots = np.where((roots.imag > 0) | ((roots.imag == 0) & (roots.real != 0)), roots, complex(np.nan, np.nan)) # Each resonance is counted once, from its upper root.
+    roots = np.take_along_axis(roots, np.argsort(np.abs(roots), axis=-1), axis=-1)
+    resonant = roots.imag > 0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return {"frequency": np.abs(roots) / (2 * 3.14159265359),
+            "damped frequency": roots.imag / (2 * 3.14159265359),
+            "quality factor": np.where(resonant | np.isnan(roots.real), np.abs(roots) / (2 * np.abs(roots.real)), 0),
+            "bandwidth": np.where(resonant | np.isnan(roots.real), np.abs(roots.real) / 3.14159265359, np.abs(roots) / (2 * 3.14159265359)),
+            "time constant": -1/roots.real,
+            "resonant": resonant}
+
+def resonance_summary(topology, parameters=None, input_impedance=50):
+    """ Returns the highest-Q loaded resonance of each component set, with the series and parallel resonances of the impedance. """
+    roots = poles_zeros(topology, parameters, input_impedance)
+    loaded, series, parallel = resonances(roots["modes"]), resonances(roots["zeros"]), resonances(roots["poles"])
+    quality = np.nan_to_num(loaded["quality factor"], nan=-1)
+    strongest = np.argmax(quality, axis=-1)[..., None]
+    summary = {name: np.take_along_axis(values, strongest, axis=-1)[..., 0] for name, values in loaded.items()}
+    summary["series frequency"] = series["frequency"][..., 0] if series["frequency"].shape[-1] else np.full(quality.shape[:-1], np.nan)
+    summary["parallel frequency"] = parallel["frequency"][..., 0] if parallel["frequency"].shape[-1] else np.full(quality.shape[:-1], np.nan)
+    return summary
+
+
+###########################################################################
+###########################################################################
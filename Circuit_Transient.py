@@ -0,0 +1,273 @@
+###########################################################################
+###########################################################################
+#
+# Alex Heinrich
+# Transient Analyzer
+# Time-domain solutions of the circuit state equations.
+#
+###########################################################################
+###########################################################################
+
+###########################################################################
+# Default Defined Parameters
+# These are variables that may be adjusted in the program.
+
+import numpy as np
+
+pade_order = 7 # Order of the Padé approximant used in the matrix exponential.
+pade_norm = 0.5 # Matrices are scaled below this norm before the Padé approximant is taken.
+
+# Probe parameters, matching the defaults of LRCC_Probe.
+probe_defaults = {"inductance": 0.6*(10**(-6)), "inductor_resistance": 0.1, "tuning_capacitance": 25.2*(10**(-12)), "coupling_capacitance": 1.19*(10**(-12)), "input_impedance": 50}
+ring_level = 10**(-3) # Fraction of the initial amplitude at which a ring-down is considered complete.
+
+# SEOP parameters, matching the defaults of LRC_SEOP.
+seop_defaults = {"R_op": 1, "C_Rb": 1*(10**(-6)), "R_sr": 1, "R_ex": 1, "C_Xe": 1*(10**(-6)), "R_w": 1, "input_impedance": 0}
+
+
+###########################################################################
+# Matrix Exponential
+# Matrices are stacked along the leading axes, so every operation is applied to a whole batch at once.
+
+def matrix_exponential(matrix):
+    """ Computes exp(matrix) for a stack of square matrices by scaling and squaring. """
+    matrix = np.asarray(matrix, dtype=float)
+    identity = np.broadcast_to(np.eye(matrix.shape[-1]), matrix.shape)
+    norm = np.abs(matrix).sum(axis=-2).max(axis=-1) # One-norm of each matrix.
+    squarings = np.maximum(0, np.ceil(np.log2(np.maximum(norm, 1e-300)/pade_norm))).astype(int)
+    scaled = matrix / (2.0**squarings)[..., None, None]
+    numerator, denominator, power, coefficient = identity.copy(), identity.copy(), identity.copy(), 1.0
+    for k in range(1, pade_order+1): # Builds the Padé numerator and denominator term by term.
+        coefficient *= (pade_order - k + 1) / (k * (2*pade_order - k + 1))
+        power = power @ scaled
+        numerator = numerator + coefficient * power
+        denominator = denominator + ((-1)**k) * coefficient * power
+    result = np.linalg.solve(denominator, numerator)
+    for i in range(int(squarings.max(initial=0))): # Squares back only the matrices that were scaled this many times.
+        result = np.where((i < squarings)[..., None, None], result @ result, result)
+    return result
+
+def discretize(state_matrix, input_matrix, time_step):
+    """ Returns the exact zero-order-hold transition and input matrices for one time step. """
+    state_matrix, input_matrix = np.asarray(state_matrix, dtype=float), np.asarray(input_matrix, dtype=float)
+    size = state_matrix.shape[-1]
+    augmented = np.zeros(state_matrix.shape[:-2] + (size+1, size+1)) # [[A, B], [0, 0]] yields [[Φ, Γ], [0, 1]].
+    augmented[..., :size, :size] = state_matrix
+    augmented[..., :size, size] = input_matrix
+    exponential = matrix_exponential(augmented * np.asarray(time_step, dtype=float)[..., None, None])
+    return exponential[..., :size, :size], exponential[..., :size, size]
+
+def step_states(state_matrix, input_matrix, drive, time_step, initial_state=None):
+    """ Integrates x' = Ax + Bu over a sampled drive, holding each sample constant for one time step. """
+    transition, input_gain = discretize(state_matrix, input_matrix, time_step)
+    drive = np.asarray(drive, dtype=float)
+    state = np.zeros(transition.shape[:-1]) if initial_state is None else np.array(initial_state, dtype=float)
+    states = np.empty(drive.shape[-1:] + state.shape) # [time, ..., state]
+    states[0] = state
+    for i in range(1, drive.shape[-1]): # Each step is one small matrix product, however long the time step.
+        state = (transition @ state[..., None])[..., 0] + input_gain * drive[..., i-1, None]
+        states[i] = state
+    return states
+
+def step_response(state_matrix, input_matrix, times, amplitude=1, initial_state=None):
+    """ Evaluates the response to a constant drive switched on at t = 0, directly at each requested time. """
+    times = np.asarray(times, dtype=float)
+    state_matrix, input_matrix = np.asarray(state_matrix, dtype=float), np.asarray(input_matrix, dtype=float)
+    transition, input_gain = discretize(state_matrix[..., None, :, :], input_matrix[..., None, :], times) # [..., time, state]
+    states = input_gain * np.asarray(amplitude, dtype=float)[..., None, None]
+    if initial_state is not None:
+        states = states + (transition @ np.asarray(initial_state, dtype=float)[..., None, :, None])[..., 0]
+    return np.moveaxis(states, -2, 0) # [time, ..., state]
+
+def time_constants(state_matrix):
+    """ Returns the time constants -1/Re(λ) of each natural mode, sorted from slowest to fastest. """
+    eigenvalues = np.linalg.eigvals(np.asarray(state_matrix, dtype=float))
+    return np.sort(-1/eigenvalues.real, axis=-1)[..., ::-1]
+
+def modal_decomposition(state_matrix):
+    """ Diagonalizes the state matrices, so that exp(At) may be taken at any time without stepping. """
+    eigenvalues, eigenvectors = np.linalg.eig(np.asarray(state_matrix, dtype=float))
+    return eigenvalues, eigenvectors, np.linalg.inv(eigenvectors)
+
+def modal_propagate(modes, delay, state):
+    """ Applies exp(A·delay) to complex states, where delay is [..., time] and state is [..., time, state]. """
+    eigenvalues, eigenvectors, inverse = modes
+    modal_state = (inverse[..., None, :, :] @ state[..., None])[..., 0]
+    modal_state = modal_state * np.exp(eigenvalues[..., None, :] * delay[..., None]) # Exact phase and decay for any number of cycles.
+    return (eigenvectors[..., None, :, :] @ modal_state[..., None])[..., 0]
+
+
+###########################################################################
+# Gated Sinusoids
+# A waveform is a list of segments, each a sinusoid switched on at "start" and off at "stop".
+# A frequency of 0 gives a rectangular pulse of the given amplitude.
+
+def gated_sinusoid(start, stop, frequency, amplitude=1, phase=0):
+    """ Returns one waveform segment, amplitude·cos(2πf(t - start) + phase) for start <= t < stop. """
+    return {"start": start, "stop": stop, "frequency": frequency, "amplitude": amplitude, "phase": phase}
+
+def waveform_values(segments, times):
+    """ Evaluates a waveform at the given times. """
+    times = np.asarray(times, dtype=float)
+    values = np.zeros(times.shape)
+    for segment in segments:
+        gate = (segment["start"] <= times) & (times < segment["stop"])
+        angle = 2 * 3.14159265359 * segment["frequency"] * (times - segment["start"]) + segment["phase"]
+        values = values + np.where(gate, segment["amplitude"] * np.cos(angle), 0)
+    return values
+
+def sinusoid_response(state_matrix, input_matrix, times, segments):
+    """ Evaluates the exact response to a sum of gated sinusoids at the requested times, starting from rest. """
+    state_matrix, input_matrix = np.asarray(state_matrix, dtype=float), np.asarray(input_matrix, dtype=float)
+    times = np.asarray(times, dtype=float)
+    modes = modal_decomposition(state_matrix)
+    identity = np.eye(state_matrix.shape[-1])
+    states = np.zeros(state_matrix.shape[:-2] + times.shape + state_matrix.shape[-1:])
+    for segment in segments:
+        angular_frequency = 2 * 3.14159265359 * segment["frequency"]
+        phasor = segment["amplitude"] * np.exp(1j * segment["phase"])
+        particular = np.linalg.solve(1j * angular_frequency * identity - state_matrix, input_matrix[..., None] * phasor)[..., 0] # Steady-state phasor of each state.
+        elapsed = np.clip(times, segment["start"], segment["stop"]) - segment["start"]
+        forced = particular[..., None, :] * np.exp(1j * angular_frequency * elapsed)[..., None] # Steady state at the current or stopping time.
+        transient = modal_propagate(modes, np.broadcast_to(elapsed, state_matrix.shape[:-2] + times.shape), np.broadcast_to(particular[..., None, :], forced.shape))
+        segment_state = forced - transient # Zero at the start of the segment.
+        released = np.maximum(times - segment["stop"], 0) # Free ring-down after the segment is switched off.
+        segment_state = modal_propagate(modes, np.broadcast_to(released, state_matrix.shape[:-2] + times.shape), segment_state)
+        states = states + np.where((times >= segment["start"])[..., None], segment_state.real, 0)
+    return np.moveaxis(states, -2, 0) # [time, ..., state]
+
+def ring_times(state_matrix, level=None):
+    """ Returns the frequency, time constant and quality factor of each mode, and the time for ringing to decay to some level. """
+    level = ring_level if level is None else level
+    eigenvalues = np.linalg.eigvals(np.asarray(state_matrix, dtype=float))
+    eigenvalues = np.take_along_axis(eigenvalues, np.argsort(-eigenvalues.imag, axis=-1), axis=-1)
+    time_constant = -1/eigenvalues.real
+    oscillating = eigenvalues.imag > 0
+    slowest = np.where(oscillating.any(axis=-1), np.where(oscillating, time_constant, 0).max(axis=-1), time_constant.max(axis=-1))
+    return {"mode frequency": eigenvalues.imag / (2 * 3.14159265359),
+        "time constant": time_constant,
+        "quality factor": np.abs(eigenvalues) / (2 * np.abs(eigenvalues.real)),
+        "ring time": slowest * np.log(1/level)}
+
+
+###########################################################################
+# Probe Circuit
+# States are the inductor current, the tuning capacitor voltage, and the coupling capacitor voltage.
+# Only the real part of the input impedance is included, as a source resistance. It may not be zero: an ideal source across the two capacitors
+# would set their total voltage at once, so the capacitors would no longer be independent states, and a step in the drive would give impulses of current.
+
+def probe_state_space(inductance, inductor_resistance, tuning_capacitance, coupling_capacitance, input_impedance=50):
+    """ Builds the state and input matrices of the probe circuit for arrays of parameter sets. """
+    inductance, inductor_resistance, tuning_capacitance, coupling_capacitance, input_impedance = np.broadcast_arrays(*[np.asarray(value, dtype=float) for value in (inductance, inductor_resistance, tuning_capacitance, coupling_capacitance, np.real(input_impedance))])
+    if np.any(input_impedance == 0):
+        raise ValueError("The transient probe needs a source resistance. Give the input impedance a real part, such as the 50 ohms of the defaults.")
+    state_matrix = np.zeros(inductance.shape + (3, 3))
+    state_matrix[..., 0, 0] = -inductor_resistance / inductance
+    state_matrix[..., 0, 1] = 1/inductance
+    state_matrix[..., 1, 0] = -1/tuning_capacitance
+    state_matrix[..., 1, 1] = -1/(input_impedance * tuning_capacitance)
+    state_matrix[..., 1, 2] = -1/(input_impedance * tuning_capacitance)
+    state_matrix[..., 2, 1] = -1/(input_impedance * coupling_capacitance)
+    state_matrix[..., 2, 2] = -1/(input_impedance * coupling_capacitance)
+    input_matrix = np.zeros(inductance.shape + (3,))
+    input_matrix[..., 1] = 1/(input_impedance * tuning_capacitance)
+    input_matrix[..., 2] = 1/(input_impedance * coupling_capacitance)
+    return state_matrix, input_matrix
+
+def probe_parameters(parameters=None):
+    """ Fills any missing probe parameters with the defaults. """
+    filled = dict(probe_defaults)
+    filled.update(parameters or {})
+    return [filled[name] for name in ("inductance", "inductor_resistance", "tuning_capacitance", "coupling_capacitance", "input_impedance")]
+
+def probe_branches(states, drive, inductance, inductor_resistance, tuning_capacitance, coupling_capacitance, input_impedance=50):
+    """ Recovers the branch voltages and currents of the probe circuit from its states. """
+    inductor_current, tuning_voltage, coupling_voltage = states[..., 0], states[..., 1], states[..., 2]
+    total_current = (drive - tuning_voltage - coupling_voltage) / np.real(input_impedance)
+    return {"Inductor voltage": tuning_voltage,
+        "Inductor current": inductor_current,
+        "Tuning voltage": tuning_voltage,
+        "Tuning current": total_current - inductor_current,
+        "Coupling voltage": coupling_voltage,
+        "Total current": total_current}
+
+def probe_pulse(times, segments, parameters=None):
+    """ Solves the probe circuit for a waveform of gated sinusoids, for each parameter set. Returns states as [time, ..., state]. """
+    values = probe_parameters(parameters)
+    state_matrix, input_matrix = probe_state_space(*values)
+    states = sinusoid_response(state_matrix, input_matrix, times, segments)
+    drive = np.asarray(waveform_values(segments, times)).reshape(np.shape(times) + (1,)*(states.ndim - 2))
+    return states, probe_branches(states, drive, *values)
+
+def probe_drive(drive, time_step, parameters=None, initial_state=None):
+    """ Solves the probe circuit for an arbitrary sampled drive voltage, given as [..., time]. """
+    values = probe_parameters(parameters)
+    state_matrix, input_matrix = probe_state_space(*values)
+    drive = np.asarray(drive, dtype=float)
+    drive = np.broadcast_to(drive, np.broadcast_shapes(state_matrix.shape[:-2], drive.shape[:-1]) + drive.shape[-1:])
+    states = step_states(state_matrix, input_matrix, drive, time_step, initial_state)
+    return states, probe_branches(states, np.moveaxis(drive, -1, 0), *values)
+
+def probe_ring_times(parameters=None, level=None):
+    """ Returns the ring-down time constants of the probe circuit for each parameter set. """
+    return ring_times(probe_state_space(*probe_parameters(parameters))[0], level)
+
+
+###########################################################################
+# SEOP Circuit
+# States are the voltages across C_Rb and C_Xe, driven by the source through R_op.
+
+def seop_state_space(R_op, C_Rb, R_sr, R_ex, C_Xe, R_w, input_impedance=0):
+    """ Builds the state and input matrices of the SEOP circuit for arrays of parameter sets. """
+    R_op, C_Rb, R_sr, R_ex, C_Xe, R_w, input_impedance = np.broadcast_arrays(*[np.asarray(value, dtype=float) for value in (R_op, C_Rb, R_sr, R_ex, C_Xe, R_w, np.real(input_impedance))])
+    source_resistance = R_op + input_impedance # Resistance between the source and the rubidium node.
+    state_matrix = np.zeros(R_op.shape + (2, 2))
+    state_matrix[..., 0, 0] = -(1/source_resistance + 1/R_sr + 1/R_ex) / C_Rb
+    state_matrix[..., 0, 1] = 1/(R_ex * C_Rb)
+    state_matrix[..., 1, 0] = 1/(R_ex * C_Xe)
+    state_matrix[..., 1, 1] = -(1/R_ex + 1/R_w) / C_Xe
+    input_matrix = np.zeros(R_op.shape + (2,))
+    input_matrix[..., 0] = 1/(source_resistance * C_Rb)
+    return state_matrix, input_matrix
+
+def seop_parameters(parameters=None):
+    """ Fills any missing SEOP parameters with the defaults. """
+    filled = dict(seop_defaults)
+    filled.update(parameters or {})
+    return [filled[name] for name in ("R_op", "C_Rb", "R_sr", "R_ex", "C_Xe", "R_w", "input_impedance")]
+
+def seop_branches(states, drive, R_op, C_Rb, R_sr, R_ex, C_Xe, R_w, input_impedance=0):
+    """ Recovers the branch currents of the SEOP circuit from its capacitor voltages. """
+    C_Rb_voltage, C_Xe_voltage = states[..., 0], states[..., 1]
+    total_current = (drive - C_Rb_voltage) / (np.asarray(R_op) + np.real(input_impedance))
+    R_sr_current = C_Rb_voltage / np.asarray(R_sr)
+    R_ex_current = (C_Rb_voltage - C_Xe_voltage) / np.asarray(R_ex)
+    R_w_current = C_Xe_voltage / np.asarray(R_w)
+    return {"C_Rb voltage": C_Rb_voltage,
+        "C_Xe voltage": C_Xe_voltage,
+        "total current": total_current,
+        "C_Rb current": total_current - R_sr_current - R_ex_current,
+        "R_sr current": R_sr_current,
+        "R_ex current": R_ex_current,
+        "C_Xe current": R_ex_current - R_w_current,
+        "R_w current": R_w_current}
+
+def seop_step(times, parameters=None, amplitude=1, initial_state=None):
+    """ Solves the SEOP circuit after a voltage step, for each parameter set. Returns states as [time, ..., state]. """
+    values = seop_parameters(parameters)
+    state_matrix, input_matrix = seop_state_space(*values)
+    states = step_response(state_matrix, input_matrix, times, amplitude, initial_state)
+    return states, seop_branches(states, np.asarray(amplitude, dtype=float), *values)
+
+def seop_drive(drive, time_step, parameters=None, initial_state=None):
+    """ Solves the SEOP circuit for an arbitrary sampled drive voltage, given as [..., time]. """
+    values = seop_parameters(parameters)
+    state_matrix, input_matrix = seop_state_space(*values)
+    drive = np.asarray(drive, dtype=float)
+    drive = np.broadcast_to(drive, np.broadcast_shapes(state_matrix.shape[:-2], drive.shape[:-1]) + drive.shape[-1:])
+    states = step_states(state_matrix, input_matrix, drive, time_step, initial_state)
+    return states, seop_branches(states, np.moveaxis(drive, -1, 0), *values)
+
+
+###########################################################################
+###########################################################################
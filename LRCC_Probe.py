@@ -13,7 +13,7 @@
 # These are variables that may be adjusted in the program.
 
 # Voltage Supply
-input_voltage, input_impedance = [1, 0], [50, 0] # Units of volts and ohms.
+input_voltage, input_impedance = complex(1, 0), complex(50, 0) # Units of volts and ohms.
 frequency, frequency_set = 10*(10**6), 10*(10**6) # Units of hertz. Enter the same value for both parameters.
 angular_frequency = 2 * 3.14159265359 * frequency # Units of radians per second.
 frequency_list = [] # List initialization.
@@ -23,66 +23,37 @@ inductor_resistance = 0.1 # Units of ohms.
 inductance, inductance_set = 0.6*(10**(-6)), 0.6*(10**(-6)) # Units of henrys.
 tuning_capacitance, tuning_capacitance_set = 25.2*(10**(-12)), 25.2*(10**(-12)) # Units of farads.
 coupling_capacitance, coupling_capacitance_set = 1.19*(10**(-12)), 1.19*(10**(-12)) # Units of farads.
-inductor_impedance = [0, 0] # Units of ohms. Serves as a placeholder until calculation.
-tuning_impedance = [0, 0] # Units of ohms. Serves as a placeholder until calculation.
-coupling_impedance = [0, 0] # Units of ohms. Serves as a placeholder until calculation.
+inductor_impedance = 0j # Units of ohms. Serves as a placeholder until calculation.
+tuning_impedance = 0j # Units of ohms. Serves as a placeholder until calculation.
+coupling_impedance = 0j # Units of ohms. Serves as a placeholder until calculation.
 inductor_list, tuning_list, coupling_list, total_list = [], [], [], [] # List initialization.
 # list = [[Voltage (real), Voltage (imaginary)], [Current (real), Current (imaginary)], [Impedance (real), Impedance (imaginary)], capacitance]"
 
 # Other
 sampling_rate = 100 # Sets the number of datapoints calculated across the specified range.
 fixed_calculation_counter = 0 # Used to correct undesired data duplication.
-total_impedance, total_current = [], []
+total_impedance, total_current = 0j, 0j
 tuning_minimum, tuning_maximum, coupling_minimum, coupling_maximum, tuning_gradation, coupling_gradation = 0, 0, 0, 0, 0, 0 # Value initialization.
 print_view = 0 # Used for troubleshooting. Set to 1 to view optional messages.
 
+# Export Filters
+# Only rows passing every filter are formatted and written by export_data().
+export_voltage_minimum = 0 # Rows with a smaller inductor voltage magnitude are skipped. Units of volts.
+export_s11_maximum = 1 # Rows with a larger reflection coefficient magnitude |S11| are skipped. Set to 1 to keep every row.
+export_window = 0 # Keeps only rows within this many datapoints of the peak inductor voltage, along each variable. Set to 0 to keep every row.
+export_stride = 1 # Keeps every nth row that passes the other filters.
+export_derived = [] # Derived quantities appended to each row, computed only when listed: "{component}_power", "{component}_reactive_power", or "{component}_q" for total, inductor, tuning, or coupling.
+
+# Tuning Candidates
+candidate_count = 5 # Number of tuning points reported after a dense calculation.
+candidate_separation = 0.5*(10**(-12)) # Smallest difference in either capacitor between reported tuning points. Units of farads.
+
 
 ###########################################################################
 # Basic Operations
-# Here, z_n[0] is the real component, and z_n[1] is the imaginary component.
-
-def add(z_1, z_2):
-    """ Adds complex numbers. """
-    real_sum = z_1[0] + z_2[0]
-    imaginary_sum = z_1[1] + z_2[1]
-    result = [real_sum, imaginary_sum]
-    return result
-
-def subtract(z_1, z_2):
-    """ Subtracts complex numbers. """
-    real_difference = z_1[0] - z_2[0]
-    imaginary_difference = z_1[1] - z_2[1]
-    result = [real_difference, imaginary_difference]
-    return result
-    
-def multiply(z_1, z_2):
-    """ Multiplies complex numbers. """
-    real_product = (z_1[0] * z_2[0]) - (z_1[1] * z_2[1])
-    imaginary_product = (z_1[0] * z_2[1]) + (z_1[1] * z_2[0])
-    result = [real_product, imaginary_product]
-    return result
-    
-def divide(z_1, z_2):
-    """ Divides complex numbers. """
-    real_numerator = (z_1[0] * z_2[0]) + (z_1[1] * z_2[1])
-    imaginary_numerator = (z_1[1] * z_2[0]) - (z_1[0] * z_2[1])
-    denominator = (z_2[0])**2 + (z_2[1])**2
-    real_quotient = real_numerator / denominator
-    imaginary_quotient = imaginary_numerator / denominator
-    result = [real_quotient, imaginary_quotient]
-    return result
-    
-def parallel(z_1, z_2):
-    """ Adds two complex numbers as an inverse reciprocal sum. """
-    numerator = multiply(z_1, z_2)
-    denominator = add(z_1, z_2)
-    result = divide(numerator, denominator)
-    return result
-    
-def magnitude(z_1, z_2):
-    result = (z_1**2 + z_2**2)**(1/2)
-    return result
-    
+# Complex numbers are native Python complex numbers, using the shared kernel.
+from Circuit_Kernel import add, subtract, multiply, divide, parallel, magnitude
+
 
 ###########################################################################
 # Functions
@@ -92,9 +63,9 @@ def impedance_calculations():
     global angular_frequency, inductor_impedance, tuning_impedance, coupling_impedance
     if print_view == 1: print("impedance_calculations():") # Used for troubleshooting.
     angular_frequency = 2 * 3.14159265359 * frequency # Units of radians per second.
-    inductor_impedance = [inductor_resistance, angular_frequency * inductance] # Units of ohms.
-    tuning_impedance = [0, -1/(angular_frequency * tuning_capacitance)] # Units of ohms.
-    coupling_impedance = [0, -1/(angular_frequency * coupling_capacitance)] # Units of ohms.
+    inductor_impedance = complex(inductor_resistance, angular_frequency * inductance) # Units of ohms.
+    tuning_impedance = divide(-1j, angular_frequency * tuning_capacitance) # Units of ohms.
+    coupling_impedance = divide(-1j, angular_frequency * coupling_capacitance) # Units of ohms.
     reduce_circuit()
 
 def reduce_circuit():
@@ -164,60 +135,95 @@ def export_data():
             "Coupling current (imaginary) [A]\t"
             "Coupling impedance (real) [Ω]\t"
             "Coupling impedance (imaginary) [Ω]\t")
+        if export_derived:
+            from Circuit_Models import derived_column, derived_title
+            export_titles += "\t".join(derived_title(name) for name in export_derived)
         print(export_titles, file=data_file)
-        for i in range(len(total_list)):
+        for i in export_rows():
             export_values = (f"{frequency_list[i]}\t"
-                f"{total_list[i][0][0]}\t"
-                f"{total_list[i][0][1]}\t"
-                f"{total_list[i][1][0]}\t"
-                f"{total_list[i][1][1]}\t"
-                f"{total_list[i][2][0]}\t"
-                f"{total_list[i][2][1]}\t"
+                f"{total_list[i][0].real}\t"
+                f"{total_list[i][0].imag}\t"
+                f"{total_list[i][1].real}\t"
+                f"{total_list[i][1].imag}\t"
+                f"{total_list[i][2].real}\t"
+                f"{total_list[i][2].imag}\t"
                 f"{inductor_list[i][-1]}\t"
-                f"{inductor_list[i][0][0]}\t"
-                f"{inductor_list[i][0][1]}\t"
-                f"{inductor_list[i][1][0]}\t"
-                f"{inductor_list[i][1][1]}\t"
-                f"{inductor_list[i][2][0]}\t"
-                f"{inductor_list[i][2][1]}\t"
+                f"{inductor_list[i][0].real}\t"
+                f"{inductor_list[i][0].imag}\t"
+                f"{inductor_list[i][1].real}\t"
+                f"{inductor_list[i][1].imag}\t"
+                f"{inductor_list[i][2].real}\t"
+                f"{inductor_list[i][2].imag}\t"
                 f"{tuning_list[i][-1]}\t"
-                f"{tuning_list[i][0][0]}\t"
-                f"{tuning_list[i][0][1]}\t"
-                f"{tuning_list[i][1][0]}\t"
-                f"{tuning_list[i][1][1]}\t"
-                f"{tuning_list[i][2][0]}\t"
-                f"{tuning_list[i][2][1]}\t"
+                f"{tuning_list[i][0].real}\t"
+                f"{tuning_list[i][0].imag}\t"
+                f"{tuning_list[i][1].real}\t"
+                f"{tuning_list[i][1].imag}\t"
+                f"{tuning_list[i][2].real}\t"
+                f"{tuning_list[i][2].imag}\t"
                 f"{coupling_list[i][-1]}\t"
-                f"{coupling_list[i][0][0]}\t"
-                f"{coupling_list[i][0][1]}\t"
-                f"{coupling_list[i][1][0]}\t"
-                f"{coupling_list[i][1][1]}\t"
-                f"{coupling_list[i][2][0]}\t"
-                f"{coupling_list[i][2][1]}")
+                f"{coupling_list[i][0].real}\t"
+                f"{coupling_list[i][0].imag}\t"
+                f"{coupling_list[i][1].real}\t"
+                f"{coupling_list[i][1].imag}\t"
+                f"{coupling_list[i][2].real}\t"
+                f"{coupling_list[i][2].imag}")
+            if export_derived:
+                branches = {"total": total_list[i], "inductor": inductor_list[i], "tuning": tuning_list[i], "coupling": coupling_list[i]}
+                column = lambda name: branches[name.rsplit("_", 1)[0]][("voltage", "current", "impedance").index(name.rsplit("_", 1)[1])]
+                export_values += "".join(f"\t{derived_column(column, name).real}" for name in export_derived)
             print(export_values, file=data_file)
 
+def export_rows():
+    """ Yields the index of each row that passes the export filters. Only the window around the peak is searched when one is set. """
+    width = sampling_rate + 1
+    dense = (len(total_list) == width**2) and (width > 1) # Rows from dense_calculation() form a square grid of both capacitors.
+    if export_window > 0:
+        voltages = [magnitude(inductor_list[i][0]) for i in range(len(inductor_list))]
+        peak = voltages.index(max(voltages))
+        if dense:
+            tuning_rows = range(max(peak//width - export_window, 0), min(peak//width + export_window + 1, width))
+            coupling_rows = range(max(peak%width - export_window, 0), min(peak%width + export_window + 1, width))
+            rows = (j*width + k for j in tuning_rows for k in coupling_rows)
+        else:
+            rows = range(max(peak - export_window, 0), min(peak + export_window + 1, len(total_list)))
+    else:
+        rows = range(len(total_list))
+    kept = 0
+    for i in rows:
+        if magnitude(inductor_list[i][0]) < export_voltage_minimum:
+            continue
+        if export_s11_maximum < 1:
+            s11 = divide(subtract(total_list[i][2], input_impedance.conjugate()), add(total_list[i][2], input_impedance))
+            if magnitude(s11) > export_s11_maximum:
+                continue
+        if kept % export_stride == 0:
+            yield i
+        kept += 1
+
 def print_values():
     """ Prints values in the program. """
     print("##################################################################################")
     defined_parameters = (f"Sampling rate:\t\t\t{sampling_rate}\n"
-        f"Supply voltage [V]:\t\t({input_voltage[0]:.2f})+i({input_voltage[1]:.2f})\n"
-        f"Supply impedance [Ω]:\t\t({input_impedance[0]:.2f})+i({input_impedance[1]:.2f})\n"
+        f"Supply voltage [V]:\t\t({input_voltage.real:.2f})+i({input_voltage.imag:.2f})\n"
+        f"Supply impedance [Ω]:\t\t({input_impedance.real:.2f})+i({input_impedance.imag:.2f})\n"
         f"Frequency [Hz]:\t\t\t{(frequency):.2e}\n"
         f"Angular frequency [s⁻¹]:\t{angular_frequency:.2e}\n"
         f"Inductance [H]:\t\t\t{inductance:.2e}\n"
         f"Tuning capacitance [F]:\t\t{tuning_capacitance:.2e}\n"
-        f"Coupling capacitance [F]:\t{coupling_capacitance:.2e}\n")
-    calculated_values = (f"Total current [A]:\t\t({total_list[0][1][0]:.2e})+i({total_list[0][1][1]:.2e})\n"
-        f"Total impedance [Ω]:\t\t({total_list[0][2][0]:.2e})+i({total_list[0][2][1]:.2e})\n"
-        f"Inductor voltage [V]:\t\t({inductor_list[0][0][0]:.2e})+i({inductor_list[0][0][1]:.2e})\n"
-        f"Inductor current [A]:\t\t({inductor_list[0][1][0]:.2e})+i({inductor_list[0][1][1]:.2e})\n"
-        f"Inductor impedance [Ω]:\t\t({inductor_list[0][2][0]:.2e})+i({inductor_list[0][2][1]:.2e})\n"
-        f"Tuning voltage [V]:\t\t({tuning_list[0][0][0]:.2e})+i({tuning_list[0][0][1]:.2e})\n"
-        f"Tuning current [A]:\t\t({tuning_list[0][1][0]:.2e})+i({tuning_list[0][1][1]:.2e})\n"
-        f"Tuning impedance [Ω]:\t\t({tuning_list[0][2][0]:.2e})+i({tuning_list[0][2][1]:.2e})\n"
-        f"Coupling voltage [V]:\t\t({coupling_list[0][0][0]:.2e})+i({coupling_list[0][0][1]:.2e})\n"
-        f"Coupling current [A]:\t\t({coupling_list[0][1][0]:.2e})+i({coupling_list[0][1][1]:.2e})\n"
-        f"Coupling impedance [Ω]:\t\t({coupling_list[0][2][0]:.2e})+i({coupling_list[0][2][1]:.2e})")
+        f"Coupling capacitance [F]:\t{coupling_capacitance:.2e}\n"
+        f"Export filters:\t\t\tV ≥ {export_voltage_minimum:.2e}, |S11| ≤ {export_s11_maximum:.2f}, window {export_window}, stride {export_stride}\n")
+    calculated_values = (f"Total current [A]:\t\t({total_list[0][1].real:.2e})+i({total_list[0][1].imag:.2e})\n"
+        f"Total impedance [Ω]:\t\t({total_list[0][2].real:.2e})+i({total_list[0][2].imag:.2e})\n"
+        f"Inductor voltage [V]:\t\t({inductor_list[0][0].real:.2e})+i({inductor_list[0][0].imag:.2e})\n"
+        f"Inductor current [A]:\t\t({inductor_list[0][1].real:.2e})+i({inductor_list[0][1].imag:.2e})\n"
+        f"Inductor impedance [Ω]:\t\t({inductor_list[0][2].real:.2e})+i({inductor_list[0][2].imag:.2e})\n"
+        f"Tuning voltage [V]:\t\t({tuning_list[0][0].real:.2e})+i({tuning_list[0][0].imag:.2e})\n"
+        f"Tuning current [A]:\t\t({tuning_list[0][1].real:.2e})+i({tuning_list[0][1].imag:.2e})\n"
+        f"Tuning impedance [Ω]:\t\t({tuning_list[0][2].real:.2e})+i({tuning_list[0][2].imag:.2e})\n"
+        f"Coupling voltage [V]:\t\t({coupling_list[0][0].real:.2e})+i({coupling_list[0][0].imag:.2e})\n"
+        f"Coupling current [A]:\t\t({coupling_list[0][1].real:.2e})+i({coupling_list[0][1].imag:.2e})\n"
+        f"Coupling impedance [Ω]:\t\t({coupling_list[0][2].real:.2e})+i({coupling_list[0][2].imag:.2e})")
     print(defined_parameters)
     print(calculated_values)
     print("##################################################################################\n\n")
@@ -225,7 +231,8 @@ def print_values():
 def update_fixed_values():
     """ Updates a parameter based on user entry. It accepts scientific notation (ex. 6.63e-34). """
     global frequency, sampling_rate, inductance, tuning_capacitance, coupling_capacitance, frequency_set, inductance_set, tuning_capacitance_set, coupling_capacitance_set
-    action = int(input("Select a value to change:\n1) Frequency\n2) Sampling rate\n3) Inductance\n4) Inductor resistance\n5) Tuning capacitance\n6) Coupling capacitance\n0) Quit to main menu.\n\n"))
+    global export_voltage_minimum, export_s11_maximum, export_window, export_stride
+    action = int(input("Select a value to change:\n1) Frequency\n2) Sampling rate\n3) Inductance\n4) Inductor resistance\n5) Tuning capacitance\n6) Coupling capacitance\n7) Export filters\n0) Quit to main menu.\n\n"))
     print("\n")
     if action == 0:
         main()
@@ -241,6 +248,11 @@ def update_fixed_values():
         tuning_capacitance = float(input("Enter tuning capacitance [F]:\t"))
     elif action == 6:
         coupling_capacitance = float(input("Enter coupling capacitance [F]:\t"))
+    elif action == 7:
+        export_voltage_minimum = float(input("Enter a minimum inductor voltage [V]:\t")) # Enter 0 to keep every row.
+        export_s11_maximum = float(input("Enter a maximum |S11|:\t\t\t")) # Enter 1 to keep every row.
+        export_window = int(float(input("Enter a window around the peak:\t\t"))) # Enter 0 to keep every row.
+        export_stride = max(int(float(input("Enter a stride:\t\t\t\t"))), 1) # Enter 1 to keep every row.
     frequency_set, inductance_set, tuning_capacitance_set, coupling_capacitance_set = frequency, inductance, tuning_capacitance, coupling_capacitance
     print("\n")
     impedance_calculations()
@@ -327,12 +339,19 @@ def dense_calculation(force=False):
         tuning_gradation = (tuning_maximum - tuning_minimum)/sampling_rate # Sets the number of farads between each value.
         coupling_gradation = (coupling_maximum - coupling_minimum)/sampling_rate # Sets the number of farads between each value.
         print(f"Sampling rate:\t\t\t{sampling_rate}\nTuning gradation [F]:\t\t{tuning_gradation:.2e}\nCoupling gradation [F]:\t\t{coupling_gradation:.2e}\n")
+        from Circuit_Plan import script_plan, print_plan
+        plan = script_plan((sampling_rate+1)**2, "probe") # Every datapoint is kept in the lists, so they must fit in memory.
+        print_plan(plan)
+        if plan["storage"] is None:
+            print("Lower the sampling rate, or use Branch and bound, or Circuit_Plan, which keeps the results on disk.\n\n")
+            return False
         for i in range(sampling_rate+1): # Cycles through tuning parameters.
             for i in range(sampling_rate+1): # Cycles through coupling parameters.
                 fixed_calculation() # Calculates values for the current parameters.
                 coupling_capacitance += coupling_gradation # Sets the next parameter.
             coupling_capacitance = coupling_minimum # Sets the minimum as the first value in the series.
             tuning_capacitance += tuning_gradation # Sets the next parameter.
+        return True
     else:
         main()
 
@@ -345,7 +364,7 @@ def complex_algebra():
     y_2 = float(input("Enter Im(z_2):\t")) # Sets second imaginary component.
     print("\n")
     if (x_1 + y_1 + x_2 + y_2) != 0:
-        z_1, z_2 = [x_1, y_1], [x_2, y_2] # Pairs each component as a list.
+        z_1, z_2 = complex(x_1, y_1), complex(x_2, y_2) # Pairs each component as a complex number.
         operation = int(input("Select an operation:\n1) Addition.\n2) Subtraction.\n3) Multiplication.\n4) Division.\n5) Parallel components.\n0) Quit to main menu.\n\n"))
         print("\n")
         if operation != 0:
@@ -359,22 +378,86 @@ def complex_algebra():
                 result = divide(z_1, z_2)
             if operation == 5:
                 result = parallel(z_1, z_2)
-            print(f"Result:\t({result[0]})+i({result[1]})\n\n")
+            print(f"Result:\t({result.real})+i({result.imag})\n\n")
         else:
             main()
     else:
         main()
 
+def pulse_calculation():
+    """ Solves the circuit over time for an RF burst at the current frequency, then reports the ring-down. """
+    from Circuit_Transient import gated_sinusoid, probe_pulse, probe_ring_times
+    parameters = {"inductance": inductance, "inductor_resistance": inductor_resistance, "tuning_capacitance": tuning_capacitance, "coupling_capacitance": coupling_capacitance, "input_impedance": input_impedance.real}
+    ring_values = probe_ring_times(parameters)
+    for i in range(len(ring_values["mode frequency"])):
+        if ring_values["mode frequency"][i] >= 0:
+            print(f"Mode frequency [Hz]:\t\t{ring_values['mode frequency'][i]:.2e}\n"
+                f"Time constant [s]:\t\t{ring_values['time constant'][i]:.2e}\n"
+                f"Quality factor:\t\t\t{ring_values['quality factor'][i]:.2e}\n")
+    print(f"Ring-down time [s]:\t\t{ring_values['ring time']:.2e}\n")
+    print("Enter 0 for each variable to quit to main menu.")
+    burst = float(input("Enter a burst duration [s]:\t")) # Sets the length of the RF pulse.
+    duration = float(input("Enter a total duration [s]:\t")) # Sets the length of the calculation, including ring-down.
+    print("\n")
+    if (burst + duration) != 0:
+        times = [duration*i/sampling_rate for i in range(sampling_rate+1)] # Each time is solved exactly, however many cycles lie between them.
+        states, branches = probe_pulse(times, [gated_sinusoid(0, burst, frequency, input_voltage.real)], parameters)
+        with open("=transient.txt", 'w', encoding='utf-8') as data_file:
+            print("Time [s]\t" + "\t".join(f"{name} [{'V' if 'voltage' in name else 'A'}]" for name in branches), file=data_file)
+            for i in range(len(times)):
+                print(f"{times[i]}\t" + "\t".join(f"{branches[name][i]}" for name in branches), file=data_file)
+        print("Data exported successfully.\n\n")
+
 def brute_force():
-    global sampling_rate
+    """ Solves the brute force domain of both capacitors as a checkpointed grid on disk. If interrupted, choosing it again resumes where it stopped. """
     action = int(input("Warning! This function makes millions of computations and may take some time.\n1) Confirm.\n0) Exit.\n\n"))
     print("\n")
     if action == 1:
-        sampling_rate = 3000
-        dense_calculation(True)
+        import numpy as np
+        from Circuit_Sweep import sweep_axis, sweep_space
+        from Circuit_Checkpoint import checkpointed_grid, clear_checkpoint
+        fixed = {"frequency": frequency, "input_voltage": input_voltage, "input_impedance": input_impedance, "inductance": inductance, "inductor_resistance": inductor_resistance}
+        space = sweep_space(sweep_axis("tuning_capacitance", 1e-14, 1e-3, 3000), sweep_axis("coupling_capacitance", 1e-14, 1e-3, 3000), fixed=fixed)
+        print("Progress is saved as it runs. If interrupted, choose Brute force again to resume.\n")
+        grid, job = checkpointed_grid(space, "probe", ["inductor_voltage"])
+        voltage = np.nan_to_num(np.abs(grid["columns"]["inductor_voltage"]), nan=-np.inf)
+        i, j = np.unravel_index(np.argmax(voltage), voltage.shape)
+        print(f"Maximum inductor voltage [V]:\t{voltage[i, j]:.2e}\n"
+            f"Tuning capacitance [F]:\t\t{grid['axes'][0][i]:.2e}\n"
+            f"Coupling capacitance [F]:\t{grid['axes'][1][j]:.2e}\n\n")
+        action_2 = int(input(f"Do you want to export every datapoint to =data.txt? It is solved again in chunks, giving {voltage.size} rows.\n1) Yes.\n0) No.\n\n"))
+        print("\n")
+        if action_2 == 1:
+            from Circuit_Filter import export_sweep
+            export_sweep(space, "probe", file_name="=data.txt", derived=export_derived)
+            print("Data exported successfully.\n\n")
+        action_3 = int(input("Do you want to plot the inductor voltage magnitude over both capacitors?\n1) Yes.\n0) No.\n\n"))
+        print("\n")
+        if action_3 == 1:
+            import matplotlib.pyplot as plt
+            with np.errstate(divide='ignore'):
+                plt.pcolormesh(grid["axes"][0], grid["axes"][1], np.log10(np.abs(grid["columns"]["inductor_voltage"])).T, shading="nearest")
+            plt.colorbar(label="log10 of inductor voltage magnitude [V]")
+            plt.xlabel("Tuning capacitance [F]")
+            plt.ylabel("Coupling capacitance [F]")
+            plt.show()
+        del grid, voltage
+        clear_checkpoint(job) # The grid is kept until it has been exported and plotted.
+        return False # Nothing is held in the lists, so the menu neither exports nor plots them.
     else:
         main()
 
+def bound_calculation():
+    """ Finds the largest inductor voltage over the brute force domain of both capacitors by branch and bound, rather than solving every datapoint. """
+    from Circuit_Sweep import sweep_axis
+    from Circuit_Bound import bound_search
+    fixed = {"frequency": frequency, "input_voltage": input_voltage, "input_impedance": input_impedance, "inductance": inductance, "inductor_resistance": inductor_resistance}
+    result = bound_search(sweep_axis("tuning_capacitance", 1e-14, 1e-3, 3000), sweep_axis("coupling_capacitance", 1e-14, 1e-3, 3000), fixed)
+    print(f"Maximum inductor voltage [V]:\t{result['inductor_voltage']:.2e}\n"
+        f"Tuning capacitance [F]:\t\t{result['tuning_capacitance']:.2e}\n"
+        f"Coupling capacitance [F]:\t{result['coupling_capacitance']:.2e}\n"
+        f"Datapoints solved:\t\t{result['evaluations']} of {result['grid size']}\n\n")
+
 def information():
     print("Circuit diagram:\n")
     print(".................................................................................\n"
@@ -410,21 +493,20 @@ def reset_variables():
     
 def reset_lists():
     """ Clears the data from the last calculation to prepare for the next. Used in main(). """
-    global total_list, frequency_list, inductor_list, tuning_list, coupling_list
+    global total_list, frequency_list, inductor_list, tuning_list, coupling_list, total_impedance, total_current
     if print_view == 1: print("reset_lists():\n") # Used for troubleshooting.
     total_list.clear()
     frequency_list.clear()
     inductor_list.clear()
     tuning_list.clear()
     coupling_list.clear()
-    total_impedance.clear()
-    total_current.clear()
+    total_impedance, total_current = 0j, 0j
     fixed_calculation_counter = 0
 
 def maximum_inductance_voltage(index):
     inductor_voltage_list, loop_kill, tip_counter = [], 0, 0
     for i in range(len(inductor_list)):
-        mag = magnitude(inductor_list[i][1][0],inductor_list[i][1][1])
+        mag = magnitude(inductor_list[i][1])
         inductor_voltage_list.append(mag)
     maximum_voltage = max(inductor_voltage_list)
     if index == 0:
@@ -452,6 +534,21 @@ def maximum_inductance_voltage(index):
     elif index == 1:
         return inductor_voltage_list
 
+def best_candidates():
+    """ Prints the tuning points with the largest inductor voltage, each differing from the others by the candidate separation. """
+    import numpy as np
+    from Circuit_Reduce import top_k, reduce_chunk, candidates
+    reducer = top_k(candidate_count, {"tuning_capacitance": candidate_separation, "coupling_capacitance": candidate_separation}, pool=len(inductor_list)) # Every row is already held.
+    columns = {"tuning_capacitance": np.array([tuning_list[i][-1] for i in range(len(tuning_list))]),
+        "coupling_capacitance": np.array([coupling_list[i][-1] for i in range(len(coupling_list))])}
+    reducer = reduce_chunk(reducer, 0, columns, {"inductor_voltage": np.array([inductor_list[i][0] for i in range(len(inductor_list))])})
+    print("Best tuning points:")
+    for candidate in candidates(reducer):
+        print(f"Inductor voltage [V]:\t\t{candidate['score']:.2e}\t"
+            f"Tuning capacitance [F]:\t{candidate['tuning_capacitance']:.2e}\t"
+            f"Coupling capacitance [F]:\t{candidate['coupling_capacitance']:.2e}")
+    print("\n")
+
 def plot_data():
     action_1 = int(input("Select a variable for the x-axis:\n1) Tuning capacitance.\n2) Coupling capacitance.\n3) Inductor voltage magnitude.\n4) Frequency.\n0) Quit to main menu.\n\n"))
     print("\n")
@@ -555,11 +652,15 @@ def main():
         elif action_1 == 2:
             update_fixed_values() # Allows the user to change a parameter.
         elif action_1 == 3:
-            action_2 = int(input("Select calculation:\n1) Fixed calculation (no variables).\n2) Cluster calculation (one variable).\n3) Dense calculation (two capacitors).\n4) Brute force (two capacitors).\n5) Complex algebra (four variables).\n0) Quit to main menu.\n\n"))
+            action_2 = int(input("Select calculation:\n1) Fixed calculation (no variables).\n2) Cluster calculation (one variable).\n3) Dense calculation (two capacitors).\n4) Brute force (two capacitors).\n5) Complex algebra (four variables).\n6) Pulse response (time).\n7) Branch and bound (two capacitors).\n0) Quit to main menu.\n\n"))
             print("\n")
             if action_2 != 0:
                 if action_2 == 5:
                     complex_algebra() # Operates on complex numbers.
+                elif action_2 == 6:
+                    pulse_calculation() # Solves the circuit in time for an RF burst.
+                elif action_2 == 7:
+                    bound_calculation() # Finds the brute force maximum without solving the whole grid.
                 else:
                     operation = 1
                     if action_2 == 1:
@@ -570,11 +671,13 @@ def main():
                         operation = cluster_calculation() # Solves the circuit for one variable.
                         operation = 1
                     elif action_2 == 3:
-                        dense_calculation() # Solves the circuit for two variables.
+                        operation = dense_calculation() # Solves the circuit for two variables, unless it would not fit in memory.
                     elif action_2 == 4:
-                        brute_force() # Calls dense_calculation with an exceedingly large sample_rate and range of capacitance values.
+                        operation = brute_force() # Solves an exceedingly large range of capacitance values, checkpointed on disk.
                     if operation:
                         maximum_inductance_voltage(0)
+                        if action_2 in (3, 4):
+                            best_candidates() # Reports alternatives, in case a capacitor value is unavailable.
                         if action_2 != 4:
                             export_data() # Exports the resulting data to a text file.
                             action_3 = int(input("\nData exported successfully. Do you want to plot data?\n1) Yes.\n0) No.\n\n"))
@@ -600,10 +703,11 @@ def main():
 ###########################################################################
 # Global Script
 
-print("\n##################################################################################")
-print("Welcome!")
-print("##################################################################################\n\n")
-main()
+if __name__ == "__main__": # Allows the functions to be imported without starting the menus.
+    print("\n##################################################################################")
+    print("Welcome!")
+    print("##################################################################################\n\n")
+    main()
 
 
 ###########################################################################
@@ -12,20 +12,20 @@
 # Global Values
 
 # Voltage Supply Values
-input_voltage, input_impedance = [1, 0], [50, 0] # Units of volts and ohms.
+input_voltage, input_impedance = complex(1, 0), complex(50, 0) # Units of volts and ohms.
 frequency, frequency_set = 40*(10**6), 40*(10**6) # Units of hertz. Enter the same value for both parameters.
 angular_frequency = 2 * 3.14159265359 * frequency
 
 # Component Values
 inductor_resistance = 0.1
-inductance, inductance_set, inductor_impedance, inductor_list = 0.6*(10**(-6)), 0.6*(10**(-6)), [0, 0], []
-tuning_capacitance, tuning_capacitance_set, tuning_impedance, tuning_list = 25.2*(10**(-12)), 25.2*(10**(-12)), [0, 0], []
+inductance, inductance_set, inductor_impedance, inductor_list = 0.6*(10**(-6)), 0.6*(10**(-6)), 0j, []
+tuning_capacitance, tuning_capacitance_set, tuning_impedance, tuning_list = 25.2*(10**(-12)), 25.2*(10**(-12)), 0j, []
 total_list, frequency_list = [], []
 
 # Calculation Values
 sampling_rate = 100 # Sets the number of datapoints calculated across the specified range.
 fixed_calculation_counter = 0
-total_impedance, total_current = [], []
+total_impedance, total_current = 0j, 0j
 
 # Other
 print_view = 0 # Used for troubleshooting.
@@ -33,45 +33,9 @@ print_view = 0 # Used for troubleshooting.
 
 ###########################################################################
 # Basic Operations
+# Complex numbers are native Python complex numbers, using the shared kernel.
+from Circuit_Kernel import add, subtract, multiply, divide, parallel
 
-def add(z_1, z_2):
-    """ Adds complex numbers as two-item lists. """
-    real_sum = z_1[0] + z_2[0]
-    imaginary_sum = z_1[1] + z_2[1]
-    result = [real_sum, imaginary_sum]
-    return result
-
-def subtract(z_1, z_2):
-    """ Subtracts complex numbers as two-item lists. """
-    real_difference = z_1[0] - z_2[0]
-    imaginary_difference = z_1[1] - z_2[1]
-    result = [real_difference, imaginary_difference]
-    return result
-    
-def multiply(z_1, z_2):
-    """ Multiplies complex numbers as two-item lists. """
-    real_product = (z_1[0] * z_2[0]) - (z_1[1] * z_2[1])
-    imaginary_product = (z_1[0] * z_2[1]) + (z_1[1] * z_2[0])
-    result = [real_product, imaginary_product]
-    return result
-    
-def divide(z_1, z_2):
-    """ Divides complex numbers as two-item lists. """
-    real_numerator = (z_1[0] * z_2[0]) + (z_1[1] * z_2[1])
-    imaginary_numerator = (z_1[1] * z_2[0]) - (z_1[0] * z_2[1])
-    denominator = (z_2[0])**2 + (z_2[1])**2
-    real_quotient = real_numerator / denominator
-    imaginary_quotient = imaginary_numerator / denominator
-    result = [real_quotient, imaginary_quotient]
-    return result
-    
-def parallel(z_1, z_2):
-    """ Adds two components in parallel. """
-    numerator = multiply(z_1, z_2)
-    denominator = add(z_1, z_2)
-    result = divide(numerator, denominator)
-    return result
-    
 
 ###########################################################################
 # Functions
@@ -81,8 +45,8 @@ def impedance_calculations():
     global angular_frequency, inductor_impedance, tuning_impedance
     if print_view == 1: print("impedance_calculations():")
     angular_frequency = 2 * 3.14159265359 * frequency
-    inductor_impedance = [inductor_resistance, angular_frequency * inductance]
-    tuning_impedance = [0, -1/(angular_frequency * tuning_capacitance)]
+    inductor_impedance = complex(inductor_resistance, angular_frequency * inductance)
+    tuning_impedance = divide(-1j, angular_frequency * tuning_capacitance)
     reduce_circuit()
 
 def reduce_circuit():
@@ -113,12 +77,12 @@ def export_data():
     with open("=data.txt", 'w', encoding='utf-8') as data_file:
         print(f"Frequency [Hz]\tTotal voltage (real) [V]\tTotal voltage (imaginary) [V]\tTotal current (real) [A]\tTotal current (imaginary) [A]\tTotal impedance (real) [Ω]\tTotal impedance (imaginary) [Ω]\tInductance [H]\tInductor voltage (real) [V]\tInductor voltage (imaginary) [V]\tInductor current (real) [A]\tInductor current (imaginary) [A]\tInductor impedance (real) [Ω]\tInductor impedance (imaginary) [Ω]\tTuning capacitance [F]\tTuning voltage (real) [V]\tTuning voltage (imaginary) [V]\tTuning current (real) [A]\tTuning current (imaginary) [A]\tTuning impedance (real) [Ω]\tTuning impedance (imaginary) [Ω]\t", file=data_file)
         for i in range(len(total_list)):
-            print(f"{frequency_list[i]}\t{total_list[i][0][0]}\t{total_list[i][0][1]}\t{total_list[i][1][0]}\t{total_list[i][1][1]}\t{total_list[i][2][0]}\t{total_list[i][2][1]}\t{inductor_list[i][-1]}\t{inductor_list[i][0][0]}\t{inductor_list[i][0][1]}\t{inductor_list[i][1][0]}\t{inductor_list[i][1][1]}\t{inductor_list[i][2][0]}\t{inductor_list[i][2][1]}\t{tuning_list[i][-1]}\t{tuning_list[i][0][0]}\t{tuning_list[i][0][1]}\t{tuning_list[i][1][0]}\t{tuning_list[i][1][1]}\t{tuning_list[i][2][0]}\t{tuning_list[i][2][1]}", file=data_file)
+            print(f"{frequency_list[i]}\t{total_list[i][0].real}\t{total_list[i][0].imag}\t{total_list[i][1].real}\t{total_list[i][1].imag}\t{total_list[i][2].real}\t{total_list[i][2].imag}\t{inductor_list[i][-1]}\t{inductor_list[i][0].real}\t{inductor_list[i][0].imag}\t{inductor_list[i][1].real}\t{inductor_list[i][1].imag}\t{inductor_list[i][2].real}\t{inductor_list[i][2].imag}\t{tuning_list[i][-1]}\t{tuning_list[i][0].real}\t{tuning_list[i][0].imag}\t{tuning_list[i][1].real}\t{tuning_list[i][1].imag}\t{tuning_list[i][2].real}\t{tuning_list[i][2].imag}", file=data_file)
 
 def print_values():
     print("##################################################################################")
-    print(f"Sampling rate:\t\t\t{sampling_rate}\n\nSupply voltage [V]:\t\t({input_voltage[0]:.2f})+i({input_voltage[1]:.2f})\nSupply impedance [Ω]:\t\t({input_impedance[0]:.2f})+i({input_impedance[1]:.2f})\nFrequency [Hz]:\t\t\t{(frequency):.2e}\nAngular frequency [s⁻¹]:\t{angular_frequency:.2e}\n")
-    print(f"Total current [A]:\t\t({total_list[0][1][0]:.2e})+i({total_list[0][1][1]:.2e})\nTotal impedance [Ω]:\t\t({total_list[0][2][0]:.2e})+i({total_list[0][2][1]:.2e})\nInductor voltage [V]:\t\t({inductor_list[0][0][0]:.2e})+i({inductor_list[0][0][1]:.2e})\nInductor current [A]:\t\t({inductor_list[0][1][0]:.2e})+i({inductor_list[0][1][1]:.2e})\nInductor impedance [Ω]:\t\t({inductor_list[0][2][0]:.2e})+i({inductor_list[0][2][1]:.2e})\nTuning voltage [V]:\t\t({tuning_list[0][0][0]:.2e})+i({tuning_list[0][0][1]:.2e})\nTuning current [A]:\t\t({tuning_list[0][1][0]:.2e})+i({tuning_list[0][1][1]:.2e})\nTuning impedance [Ω]:\t\t({tuning_list[0][2][0]:.2e})+i({tuning_list[0][2][1]:.2e})")
+    print(f"Sampling rate:\t\t\t{sampling_rate}\n\nSupply voltage [V]:\t\t({input_voltage.real:.2f})+i({input_voltage.imag:.2f})\nSupply impedance [Ω]:\t\t({input_impedance.real:.2f})+i({input_impedance.imag:.2f})\nFrequency [Hz]:\t\t\t{(frequency):.2e}\nAngular frequency [s⁻¹]:\t{angular_frequency:.2e}\n")
+    print(f"Total current [A]:\t\t({total_list[0][1].real:.2e})+i({total_list[0][1].imag:.2e})\nTotal impedance [Ω]:\t\t({total_list[0][2].real:.2e})+i({total_list[0][2].imag:.2e})\nInductor voltage [V]:\t\t({inductor_list[0][0].real:.2e})+i({inductor_list[0][0].imag:.2e})\nInductor current [A]:\t\t({inductor_list[0][1].real:.2e})+i({inductor_list[0][1].imag:.2e})\nInductor impedance [Ω]:\t\t({inductor_list[0][2].real:.2e})+i({inductor_list[0][2].imag:.2e})\nTuning voltage [V]:\t\t({tuning_list[0][0].real:.2e})+i({tuning_list[0][0].imag:.2e})\nTuning current [A]:\t\t({tuning_list[0][1].real:.2e})+i({tuning_list[0][1].imag:.2e})\nTuning impedance [Ω]:\t\t({tuning_list[0][2].real:.2e})+i({tuning_list[0][2].imag:.2e})")
     print("##################################################################################\n\n")
 
 def update_fixed_values():
@@ -213,7 +177,7 @@ def complex_algebra():
     y_2 = float(input("Enter Im(z_2):\t"))
     print("\n")
     if (x_1 + y_1 + x_2 + y_2) != 0:
-        z_1, z_2 = [x_1, y_1], [x_2, y_2]
+        z_1, z_2 = complex(x_1, y_1), complex(x_2, y_2)
         operation = int(input("Select an operation:\n1) Addition.\n2) Subtraction.\n3) Multiplication.\n4) Division.\n5) Parallel components.\n0) Quit to main menu.\n\n"))
         print("\n")
         if operation != 0:
@@ -227,7 +191,7 @@ def complex_algebra():
                 result = divide(z_1, z_2)
             if operation == 5:
                 result = parallel(z_1, z_2)
-            print(f"Result:\t({result[0]})+i({result[1]})\n\n")
+            print(f"Result:\t({result.real})+i({result.imag})\n\n")
 
 def reset_variables():
     global frequency, inductance, tuning_capacitance, coupling_capacitance
@@ -235,15 +199,14 @@ def reset_variables():
     frequency, inductance, tuning_capacitance, coupling_capacitance = frequency_set, inductance_set, tuning_capacitance_set, coupling_capacitance_set
     
 def reset_lists():
-    global total_list, frequency_list, inductor_list, tuning_list, coupling_list
+    global total_list, frequency_list, inductor_list, tuning_list, coupling_list, total_impedance, total_current
     if print_view == 1: print("reset_lists():\n")
     total_list.clear()
     frequency_list.clear()
     inductor_list.clear()
     tuning_list.clear()
     coupling_list.clear()
-    total_impedance.clear()
-    total_current.clear()
+    total_impedance, total_current = 0j, 0j
     fixed_calculation_counter = 0
 
 def main():
@@ -283,10 +246,11 @@ def main():
 ###########################################################################
 # Global Script
 
-print("\n##################################################################################")
-print("Welcome!")
-print("##################################################################################\n\n")
-main()
+if __name__ == "__main__": # Allows the functions to be imported without starting the menus.
+    print("\n##################################################################################")
+    print("Welcome!")
+    print("##################################################################################\n\n")
+    main()
 
 
 ###########################################################################
@@ -11,24 +11,24 @@
 # Global Values
 
 # Voltage Supply Values
-input_voltage, input_impedance = [1, 0], [0, 0]
+input_voltage, input_impedance = complex(1, 0), complex(0, 0)
 frequency, frequency_set = 1, 1
 angular_frequency = 2 * 3.14159265359 * frequency
 
 # Component Values
-R_op, R_op_set, R_op_impedance, R_op_list = 1, 1, [0, 0], []
-C_Rb, C_Rb_set, C_Rb_impedance, C_Rb_list = 1*10^(-6), 1*10^(-6), [0, 0], []
-R_sr, R_sr_set, R_sr_impedance, R_sr_list = 1, 1, [0, 0], []
-R_ex, R_ex_set, R_ex_impedance, R_ex_list = 1, 1, [0, 0], []
-C_Xe, C_Xe_set, C_Xe_impedance, C_Xe_list = 1*10^(-6), 1*10^(-6), [0, 0], []
-R_w, R_w_set, R_w_impedance, R_w_list = 1, 1, [0, 0], []
+R_op, R_op_set, R_op_impedance, R_op_list = 1, 1, 0j, []
+C_Rb, C_Rb_set, C_Rb_impedance, C_Rb_list = 1*(10**(-6)), 1*(10**(-6)), 0j, []
+R_sr, R_sr_set, R_sr_impedance, R_sr_list = 1, 1, 0j, []
+R_ex, R_ex_set, R_ex_impedance, R_ex_list = 1, 1, 0j, []
+C_Xe, C_Xe_set, C_Xe_impedance, C_Xe_list = 1*(10**(-6)), 1*(10**(-6)), 0j, []
+R_w, R_w_set, R_w_impedance, R_w_list = 1, 1, 0j, []
 total_list, frequency_list = [], []
 
 # Calculation Values
 sampling_rate = 1000 # Sets the number of datapoints calculated across the specified range.
 gradation_list = [] # Holds the value taken by the variable for each datapoint.
 fixed_calculation_counter = 0
-total_impedance, total_current = [], []
+total_impedance, total_current = 0j, 0j
 
 # Other
 print_view = 0 # Used for troubleshooting.
@@ -36,44 +36,9 @@ print_view = 0 # Used for troubleshooting.
 
 ###########################################################################
 # Basic Operations
+# Complex numbers are native Python complex numbers, using the shared kernel.
+from Circuit_Kernel import add, subtract, multiply, divide, parallel
 
-def add(z_1, z_2):
-    """ Adds complex numbers, given as two-item lists. """
-    real_sum = z_1[0] + z_2[0]
-    imaginary_sum = z_1[1] + z_2[1]
-    result = [real_sum, imaginary_sum]
-    return result
-
-def subtract(z_1, z_2):
-    """ Subtracts complex numbers, given as two-item lists. """
-    real_difference = z_1[0] - z_2[0]
-    imaginary_difference = z_1[1] - z_2[1]
-    result = [real_difference, imaginary_difference]
-    return result
-    
-def multiply(z_1, z_2):
-    """ Multiplies complex numbers, given as two-item lists. """
-    real_product = (z_1[0] * z_2[0]) - (z_1[1] * z_2[1])
-    imaginary_product = (z_1[0] * z_2[1]) + (z_1[1] * z_2[0])
-    result = [real_product, imaginary_product]
-    return result
-    
-def divide(z_1, z_2):
-    """ Divides complex numbers, given as two-item lists. """
-    real_numerator = (z_1[0] * z_2[0]) + (z_1[1] * z_2[1])
-    imaginary_numerator = (z_1[1] * z_2[0]) - (z_1[0] * z_2[1])
-    denominator = (z_2[0])**2 + (z_2[1])**2
-    real_quotient = real_numerator / denominator
-    imaginary_quotient = imaginary_numerator / denominator
-    result = [real_quotient, imaginary_quotient]
-    return result
-    
-def parallel(z_1, z_2):
-    numerator = multiply(z_1, z_2)
-    denominator = add(z_1, z_2)
-    result = divide(numerator, denominator)
-    return result
-    
 
 ###########################################################################
 # Functions
@@ -83,12 +48,12 @@ def impedance_calculations():
     global angular_frequency, R_op_impedance, C_Rb_impedance, R_sr_impedance, R_ex_impedance, C_Xe_impedance, R_w_impedance
     if print_view == 1: print("impedance_calculations():")
     angular_frequency = 2 * 3.14159265359 * frequency
-    R_op_impedance = [R_op, 0]
-    C_Rb_impedance = [0, -1/(angular_frequency * C_Rb)]
-    R_sr_impedance = [R_sr, 0]
-    R_ex_impedance = [R_ex, 0]
-    C_Xe_impedance = [0, -1/(angular_frequency * C_Xe)]
-    R_w_impedance = [R_w, 0]
+    R_op_impedance = complex(R_op, 0)
+    C_Rb_impedance = divide(-1j, angular_frequency * C_Rb)
+    R_sr_impedance = complex(R_sr, 0)
+    R_ex_impedance = complex(R_ex, 0)
+    C_Xe_impedance = divide(-1j, angular_frequency * C_Xe)
+    R_w_impedance = complex(R_w, 0)
     if print_view == 1: print(f"R_op_impedance:\t{R_op_impedance}\nC_Rb_impedance:\t{C_Rb_impedance}\nR_sr_impedance:\t{R_sr_impedance}\nR_ex_impedance:\t{R_ex_impedance}\nC_Xe_impedance:\t{C_Xe_impedance}\nR_w_impedance:\t{R_w_impedance}\n") # Optional.
     reduce_circuit()
 
@@ -103,7 +68,7 @@ def reduce_circuit():
     series_2 = add(parallel_3, R_op_impedance)
     total_impedance = add(series_2, input_impedance)
     total_current = divide(input_voltage, total_impedance)
-    total_impedance = [total_impedance[0]-input_impedance[0], total_impedance[1]]
+    total_impedance = complex(total_impedance.real-input_impedance.real, total_impedance.imag)
     return total_impedance, total_current
     
 def solve_circuit(total_current, parallel_impedance):
@@ -144,11 +109,11 @@ def export_data():
     with open("=data.txt", 'w', encoding='utf-8') as data_file:
         print(f"Frequency [Hz]\tTotal voltage (real) [V]\tTotal voltage (imaginary) [V]\tTotal current (real) [A]\tTotal current (imaginary) [A]\tTotal impedance (real) [Ω]\tTotal impedance (imaginary) [Ω]\tR_op voltage (real) [V]\tR_op voltage (imaginary) [V]\tR_op current (real) [A]\tR_op current (imaginary) [A]\tR_op impedance (real) [Ω]\tR_op impedance (imaginary) [Ω]\tC_Rb voltage (real) [V]\tC_Rb voltage (imaginary) [V]\tC_Rb current (real) [A]\tC_Rb current (imaginary) [A]\tC_Rb impedance (real) [Ω]\tC_Rb impedance (imaginary) [Ω]\tR_sr voltage (real) [V]\tR_sr voltage (imaginary) [V]\tR_sr current (real) [A]\tR_sr current (imaginary) [A]\tR_sr impedance (real) [Ω]\tR_sr impedance (imaginary) [Ω]\tR_ex voltage (real) [V]\tR_ex voltage (imaginary) [V]\tR_ex current (real) [A]\tR_ex current (imaginary) [A]\tR_ex impedance (real) [Ω]\tR_ex impedance (imaginary) [Ω]\tC_Xe voltage (real) [V]\tC_Xe voltage (imaginary) [V]\tC_Xe current (real) [A]\tC_Xe current (imaginary) [A]\tC_Xe impedance (real) [Ω]\tC_Xe impedance (imaginary) [Ω]\tR_w voltage (real) [V]\tR_w voltage (imaginary) [V]\tR_w current (real) [A]\tR_w current (imaginary) [A]\tR_w impedance (real) [Ω]\tR_w impedance (imaginary) [Ω]", file=data_file)
         for i in range(len(total_list)):
-            print(f"{frequency_list[i]}\t{total_list[i][0][0]}\t{total_list[i][0][1]}\t{total_list[i][1][0]}\t{total_list[i][1][1]}\t{total_list[i][2][0]}\t{total_list[i][2][1]}\t{R_op_list[i][0][0]}\t{R_op_list[i][0][1]}\t{R_op_list[i][1][0]}\t{R_op_list[i][1][1]}\t{R_op_list[i][2][0]}\t{R_op_list[i][2][1]}\t{C_Rb_list[i][0][0]}\t{C_Rb_list[i][0][1]}\t{C_Rb_list[i][1][0]}\t{C_Rb_list[i][1][1]}\t{C_Rb_list[i][2][0]}\t{C_Rb_list[i][2][1]}\t{R_sr_list[i][0][0]}\t{R_sr_list[i][0][1]}\t{R_sr_list[i][1][0]}\t{R_sr_list[i][1][1]}\t{R_sr_list[i][2][0]}\t{R_sr_list[i][2][1]}\t{R_ex_list[i][0][0]}\t{R_ex_list[i][0][1]}\t{R_ex_list[i][1][0]}\t{R_ex_list[i][1][1]}\t{R_ex_list[i][2][0]}\t{R_ex_list[i][2][1]}\t{C_Xe_list[i][0][0]}\t{C_Xe_list[i][0][1]}\t{C_Xe_list[i][1][0]}\t{C_Xe_list[i][1][1]}\t{C_Xe_list[i][2][0]}\t{C_Xe_list[i][2][1]}\t{R_w_list[i][0][0]}\t{R_w_list[i][0][1]}\t{R_w_list[i][1][0]}\t{R_w_list[i][1][1]}\t{R_w_list[i][2][0]}\t{R_w_list[i][2][1]}", file=data_file)
+            print(f"{frequency_list[i]}\t{total_list[i][0].real}\t{total_list[i][0].imag}\t{total_list[i][1].real}\t{total_list[i][1].imag}\t{total_list[i][2].real}\t{total_list[i][2].imag}\t{R_op_list[i][0].real}\t{R_op_list[i][0].imag}\t{R_op_list[i][1].real}\t{R_op_list[i][1].imag}\t{R_op_list[i][2].real}\t{R_op_list[i][2].imag}\t{C_Rb_list[i][0].real}\t{C_Rb_list[i][0].imag}\t{C_Rb_list[i][1].real}\t{C_Rb_list[i][1].imag}\t{C_Rb_list[i][2].real}\t{C_Rb_list[i][2].imag}\t{R_sr_list[i][0].real}\t{R_sr_list[i][0].imag}\t{R_sr_list[i][1].real}\t{R_sr_list[i][1].imag}\t{R_sr_list[i][2].real}\t{R_sr_list[i][2].imag}\t{R_ex_list[i][0].real}\t{R_ex_list[i][0].imag}\t{R_ex_list[i][1].real}\t{R_ex_list[i][1].imag}\t{R_ex_list[i][2].real}\t{R_ex_list[i][2].imag}\t{C_Xe_list[i][0].real}\t{C_Xe_list[i][0].imag}\t{C_Xe_list[i][1].real}\t{C_Xe_list[i][1].imag}\t{C_Xe_list[i][2].real}\t{C_Xe_list[i][2].imag}\t{R_w_list[i][0].real}\t{R_w_list[i][0].imag}\t{R_w_list[i][1].real}\t{R_w_list[i][1].imag}\t{R_w_list[i][2].real}\t{R_w_list[i][2].imag}", file=data_file)
 
 def print_values():
     print("##################################################################################")
-    print(f"Sampling rate:\t\t\t{sampling_rate}\n\nSupply voltage [V]:\t\t({input_voltage[0]:.2f})+i({input_voltage[1]:.2f})\nSupply impedance [Ω]:\t\t({input_impedance[0]:.2f})+i({input_impedance[1]:.2f})\nFrequency [MHz]:\t\t{(frequency*10**(-6)):.2f}\nAngular frequency [s⁻¹]:\t{angular_frequency:.2e}\n")
+    print(f"Sampling rate:\t\t\t{sampling_rate}\n\nSupply voltage [V]:\t\t({input_voltage.real:.2f})+i({input_voltage.imag:.2f})\nSupply impedance [Ω]:\t\t({input_impedance.real:.2f})+i({input_impedance.imag:.2f})\nFrequency [MHz]:\t\t{(frequency*10**(-6)):.2f}\nAngular frequency [s⁻¹]:\t{angular_frequency:.2e}\n")
     print(f"Frequency:\t\t\t{frequency_list[0]}\nTotal voltage:\t\t\t{total_list[0][0]}\nTotal current:\t\t\t{total_list[0][1]}\nTotal impedance:\t\t{total_list[0][2]}\nR_op voltage:\t\t\t{R_op_list[0][0]}\nR_op current:\t\t\t{R_op_list[0][1]}\nR_op impedance:\t\t\t{R_op_list[0][2]}\nC_Rb voltage:\t\t\t{C_Rb_list[0][0]}\nC_Rb current:\t\t\t{C_Rb_list[0][1]}\nC_Rb impedance:\t\t\t{C_Rb_list[0][2]}\nR_sr voltage:\t\t\t{R_sr_list[0][0]}\nR_sr current:\t\t\t{R_sr_list[0][1]}\nR_sr impedance:\t\t\t{R_sr_list[0][2]}\nR_ex voltage:\t\t\t{R_ex_list[0][0]}\nR_ex current:\t\t\t{R_ex_list[0][1]}\nR_ex impedance:\t\t\t{R_ex_list[0][2]}\nC_Xe voltage:\t\t\t{C_Xe_list[0][0]}\nC_Xe current:\t\t\t{C_Xe_list[0][1]}\nC_Xe impedance:\t\t\t{C_Xe_list[0][2]}\nR_w voltage:\t\t\t{R_w_list[0][0]}\nR_w current:\t\t\t{R_w_list[0][1]}\nR_w impedance:\t\t\t{R_w_list[0][2]}")
     print("##################################################################################\n\n")
 
@@ -179,8 +144,8 @@ def update_fixed_values():
 def fixed_calculation():
     global tuning_impedance, fixed_calculation_counter
     impedance_calculations()
-    total_current, parallel_impedance = reduce_circuit()
-    solve_circuit(total_current, parallel_impedance)
+    total_impedance, total_current = reduce_circuit()
+    solve_circuit(total_current, total_impedance)
 
 def cluster_calculation():
     global frequency, R_op, C_Rb, R_sr, R_ex, C_Xe, R_w
@@ -232,6 +197,26 @@ def dense_calculation():
             tuning_gradation_list.append(tuning_capacitance) # Maintains a memory of each parameter taken by the variable.
         #print(f"tuning_capacitance: {tuning_capacitance}\ncoupling_capacitance: {coupling_capacitance}\n")
 
+def transient_calculation():
+    """ Solves the circuit over time after the input voltage is switched on. """
+    from Circuit_Transient import seop_step, time_constants, seop_state_space
+    parameters = {"R_op": R_op, "C_Rb": C_Rb, "R_sr": R_sr, "R_ex": R_ex, "C_Xe": C_Xe, "R_w": R_w, "input_impedance": input_impedance.real}
+    time_constant_list = time_constants(seop_state_space(**parameters)[0])
+    print(f"Time constants [s]:\t\t{time_constant_list[0]:.2e}, {time_constant_list[1]:.2e}\n")
+    print("Enter 0 to quit to main menu.")
+    duration = float(input("Enter a duration [s]:\t"))
+    print("\n")
+    if duration != 0:
+        times = [duration*i/sampling_rate for i in range(sampling_rate+1)] # Allows for a variable number of datapoints.
+        states, branches = seop_step(times, parameters, input_voltage.real)
+        with open("=transient.txt", 'w', encoding='utf-8') as data_file:
+            print("Time [s]\t" + "\t".join(f"{name} [{'V' if 'voltage' in name else 'A'}]" for name in branches), file=data_file)
+            for i in range(len(times)):
+                print(f"{times[i]}\t" + "\t".join(f"{branches[name][i]}" for name in branches), file=data_file)
+        return True
+    else:
+        return False
+
 def complex_algebra():
     print("Enter 0 for each variable to quit to main menu.")
     x_1 = float(input("Enter Re(z_1):\t"))
@@ -240,7 +225,7 @@ def complex_algebra():
     y_2 = float(input("Enter Im(z_2):\t"))
     print("\n")
     if (x_1 + y_1 + x_2 + y_2) != 0:
-        z_1, z_2 = [x_1, y_1], [x_2, y_2]
+        z_1, z_2 = complex(x_1, y_1), complex(x_2, y_2)
         operation = int(input("Select an operation:\n1) Addition.\n2) Subtraction.\n3) Multiplication.\n4) Division.\n5) Parallel components.\n0) Quit to main menu.\n\n"))
         print("\n")
         if operation != 0:
@@ -254,7 +239,7 @@ def complex_algebra():
                 result = divide(z_1, z_2)
             if operation == 5:
                 result = parallel(z_1, z_2)
-            print(f"Result:\t({result[0]})+i({result[1]})\n\n")
+            print(f"Result:\t({result.real})+i({result.imag})\n\n")
 
 def reset_variables():
     global frequency, R_op, C_Rb, R_sr, R_ex, C_Xe, R_w
@@ -262,7 +247,7 @@ def reset_variables():
     frequency, R_op, C_Rb, R_sr, R_ex, C_Xe, R_w = frequency_set, R_op_set, C_Rb_set, R_sr_set, R_ex_set, C_Xe_set, R_w_set
     
 def reset_lists():
-    global R_op_list, C_Rb_list, R_sr_list, R_ex_list, C_Xe_list, R_w_list, total_list, frequency_list
+    global R_op_list, C_Rb_list, R_sr_list, R_ex_list, C_Xe_list, R_w_list, total_list, frequency_list, total_impedance, total_current
     if print_view == 1: print("reset_lists():\n")
     R_op_list.clear()
     C_Rb_list.clear()
@@ -273,8 +258,7 @@ def reset_lists():
     total_list.clear()
     frequency_list.clear()
     gradation_list.clear()
-    total_impedance.clear()
-    total_current.clear()
+    total_impedance, total_current = 0j, 0j
     fixed_calculation_counter = 0
 
 def main():
@@ -289,7 +273,7 @@ def main():
         elif action_1 == 2:
             update_fixed_values()
         elif action_1 == 3:
-            action_2 = int(input("Select calculation:\n1) Fixed calculation (no variables).\n2) Cluster calculation (one variable).\n3) Dense calculation (two variables).\n4) Complex algebra (four variables).\n0) Quit to main menu.\n\n"))
+            action_2 = int(input("Select calculation:\n1) Fixed calculation (no variables).\n2) Cluster calculation (one variable).\n3) Dense calculation (two variables).\n4) Complex algebra (four variables).\n5) Transient calculation (time).\n0) Quit to main menu.\n\n"))
             print("\n")
             if action_2 != 0:
                 if action_2 == 1:
@@ -306,7 +290,12 @@ def main():
                     print("Data exported successfully.\n\n")
                 elif action_2 == 4:
                     complex_algebra()
-                export_data()
+                elif action_2 == 5:
+                    operation = transient_calculation()
+                    if operation:
+                        print("Data exported successfully.\n\n")
+                if action_2 != 5:
+                    export_data()
         reset_variables()
         reset_lists()
         main()
@@ -314,10 +303,11 @@ def main():
 ###########################################################################
 # Global Script
 
-print("\n##################################################################################")
-print("Welcome!")
-print("##################################################################################\n\n")
-main()
+if __name__ == "__main__": # Allows the functions to be imported without starting the menus.
+    print("\n##################################################################################")
+    print("Welcome!")
+    print("##################################################################################\n\n")
+    main()
 
 
 ###########################################################################
@@ -14,7 +14,7 @@
 # These are variables that may be adjusted in the program.
 
 # Voltage Supply
-input_voltage, input_impedance = [1, 0], [0, 0] # Units of volts and ohms.
+input_voltage, input_impedance = complex(1, 0), complex(0, 0) # Units of volts and ohms.
 frequency, frequency_set = 40*(10**6), 40*(10**6) # Units of hertz. Enter the same value for both parameters.
 angular_frequency = 2 * 3.14159265359 * frequency # Units of radians per second.
 frequency_list = [] # List initialization.
@@ -23,59 +23,22 @@ frequency_list = [] # List initialization.
 inductor_resistance = 0.1 # Units of ohms.
 inductance, inductance_set = 0.6*(10**(-6)), 0.6*(10**(-6)) # Units of henrys.
 coupling_capacitance, coupling_capacitance_set = 1.19*(10**(-12)), 1.19*(10**(-12)) # Units of farads.
-inductor_impedance = [0, 0] # Units of ohms. Serves as a placeholder until calculation.
-coupling_impedance = [0, 0] # Units of ohms. Serves as a placeholder until calculation.
+inductor_impedance = 0j # Units of ohms. Serves as a placeholder until calculation.
+coupling_impedance = 0j # Units of ohms. Serves as a placeholder until calculation.
 inductor_list, coupling_list, total_list = [], [], [] # List initialization.
 
 # Other
 sampling_rate = 10000 # Sets the number of datapoints calculated across the specified range.
 fixed_calculation_counter = 0 # Used to correct undesired data duplication.
-total_impedance, total_current = [], []
+total_impedance, total_current = 0j, 0j
 print_view = 0 # Used for troubleshooting. Set to 1 to view optional messages.
 
 
 ###########################################################################
 # Basic Operations
-# Here, z_n[0] is the real component, and z_n[1] is the imaginary component.
+# Complex numbers are native Python complex numbers, using the shared kernel.
+from Circuit_Kernel import add, subtract, multiply, divide, parallel
 
-def add(z_1, z_2):
-    """ Adds complex numbers. """
-    real_sum = z_1[0] + z_2[0]
-    imaginary_sum = z_1[1] + z_2[1]
-    result = [real_sum, imaginary_sum]
-    return result
-
-def subtract(z_1, z_2):
-    """ Subtracts complex numbers. """
-    real_difference = z_1[0] - z_2[0]
-    imaginary_difference = z_1[1] - z_2[1]
-    result = [real_difference, imaginary_difference]
-    return result
-    
-def multiply(z_1, z_2):
-    """ Multiplies complex numbers. """
-    real_product = (z_1[0] * z_2[0]) - (z_1[1] * z_2[1])
-    imaginary_product = (z_1[0] * z_2[1]) + (z_1[1] * z_2[0])
-    result = [real_product, imaginary_product]
-    return result
-    
-def divide(z_1, z_2):
-    """ Divides complex numbers. """
-    real_numerator = (z_1[0] * z_2[0]) + (z_1[1] * z_2[1])
-    imaginary_numerator = (z_1[1] * z_2[0]) - (z_1[0] * z_2[1])
-    denominator = (z_2[0])**2 + (z_2[1])**2
-    real_quotient = real_numerator / denominator
-    imaginary_quotient = imaginary_numerator / denominator
-    result = [real_quotient, imaginary_quotient]
-    return result
-    
-def parallel(z_1, z_2):
-    """ Adds two complex numbers as an inverse reciprocal sum. """
-    numerator = multiply(z_1, z_2)
-    denominator = add(z_1, z_2)
-    result = divide(numerator, denominator)
-    return result
-    
 
 ###########################################################################
 # Functions
@@ -85,8 +48,8 @@ def impedance_calculations():
     global angular_frequency, inductor_impedance, tuning_impedance, coupling_impedance
     if print_view == 1: print("impedance_calculations():") # Used for troubleshooting.
     angular_frequency = 2 * 3.14159265359 * frequency # Units of radians per second.
-    inductor_impedance = [inductor_resistance, angular_frequency * inductance] # Units of ohms.
-    coupling_impedance = [0, -1/(angular_frequency * coupling_capacitance)] # Units of ohms.
+    inductor_impedance = complex(inductor_resistance, angular_frequency * inductance) # Units of ohms.
+    coupling_impedance = divide(-1j, angular_frequency * coupling_capacitance) # Units of ohms.
     reduce_circuit()
 
 def reduce_circuit():
@@ -139,32 +102,32 @@ def export_data():
         print(export_titles, file=data_file)
         for i in range(len(total_list)):
             export_values = (f"{frequency_list[i]}\t"
-                f"{total_list[i][0][0]}\t"
-                f"{total_list[i][0][1]}\t"
-                f"{total_list[i][1][0]}\t"
-                f"{total_list[i][1][1]}\t"
-                f"{total_list[i][2][0]}\t"
-                f"{total_list[i][2][1]}\t"
+                f"{total_list[i][0].real}\t"
+                f"{total_list[i][0].imag}\t"
+                f"{total_list[i][1].real}\t"
+                f"{total_list[i][1].imag}\t"
+                f"{total_list[i][2].real}\t"
+                f"{total_list[i][2].imag}\t"
                 f"{inductor_list[i][-1]}\t"
-                f"{inductor_list[i][0][0]}\t"
-                f"{inductor_list[i][0][1]}\t"
-                f"{inductor_list[i][1][0]}\t"
-                f"{inductor_list[i][1][1]}\t"
-                f"{inductor_list[i][2][0]}\t"
-                f"{inductor_list[i][2][1]}\t"
+                f"{inductor_list[i][0].real}\t"
+                f"{inductor_list[i][0].imag}\t"
+                f"{inductor_list[i][1].real}\t"
+                f"{inductor_list[i][1].imag}\t"
+                f"{inductor_list[i][2].real}\t"
+                f"{inductor_list[i][2].imag}\t"
                 f"{coupling_list[i][-1]}\t"
-                f"{coupling_list[i][0][0]}\t"
-                f"{coupling_list[i][0][1]}\t"
-                f"{coupling_list[i][1][0]}\t"
-                f"{coupling_list[i][1][1]}\t"
-                f"{coupling_list[i][2][0]}\t"
-                f"{coupling_list[i][2][1]}")
+                f"{coupling_list[i][0].real}\t"
+                f"{coupling_list[i][0].imag}\t"
+                f"{coupling_list[i][1].real}\t"
+                f"{coupling_list[i][1].imag}\t"
+                f"{coupling_list[i][2].real}\t"
+                f"{coupling_list[i][2].imag}")
             print(export_values, file=data_file)
 
 def print_values():
     print("##################################################################################")
-    print(f"Sampling rate:\t\t\t{sampling_rate}\n\nSupply voltage [V]:\t\t({input_voltage[0]:.2f})+i({input_voltage[1]:.2f})\nSupply impedance [Ω]:\t\t({input_impedance[0]:.2f})+i({input_impedance[1]:.2f})\nFrequency [Hz]:\t\t\t{(frequency):.2e}\nAngular frequency [s⁻¹]:\t{angular_frequency:.2e}\n")
-    print(f"Total current [A]:\t\t({total_list[0][1][0]:.2e})+i({total_list[0][1][1]:.2e})\nTotal impedance [Ω]:\t\t({total_list[0][2][0]:.2e})+i({total_list[0][2][1]:.2e})\nInductor voltage [V]:\t\t({inductor_list[0][0][0]:.2e})+i({inductor_list[0][0][1]:.2e})\nInductor current [A]:\t\t({inductor_list[0][1][0]:.2e})+i({inductor_list[0][1][1]:.2e})\nInductor impedance [Ω]:\t\t({inductor_list[0][2][0]:.2e})+i({inductor_list[0][2][1]:.2e})\nCoupling voltage [V]:\t\t({coupling_list[0][0][0]:.2e})+i({coupling_list[0][0][1]:.2e})\nCoupling current [A]:\t\t({coupling_list[0][1][0]:.2e})+i({coupling_list[0][1][1]:.2e})\nCoupling impedance [Ω]:\t\t({coupling_list[0][2][0]:.2e})+i({coupling_list[0][2][1]:.2e})")
+    print(f"Sampling rate:\t\t\t{sampling_rate}\n\nSupply voltage [V]:\t\t({input_voltage.real:.2f})+i({input_voltage.imag:.2f})\nSupply impedance [Ω]:\t\t({input_impedance.real:.2f})+i({input_impedance.imag:.2f})\nFrequency [Hz]:\t\t\t{(frequency):.2e}\nAngular frequency [s⁻¹]:\t{angular_frequency:.2e}\n")
+    print(f"Total current [A]:\t\t({total_list[0][1].real:.2e})+i({total_list[0][1].imag:.2e})\nTotal impedance [Ω]:\t\t({total_list[0][2].real:.2e})+i({total_list[0][2].imag:.2e})\nInductor voltage [V]:\t\t({inductor_list[0][0].real:.2e})+i({inductor_list[0][0].imag:.2e})\nInductor current [A]:\t\t({inductor_list[0][1].real:.2e})+i({inductor_list[0][1].imag:.2e})\nInductor impedance [Ω]:\t\t({inductor_list[0][2].real:.2e})+i({inductor_list[0][2].imag:.2e})\nCoupling voltage [V]:\t\t({coupling_list[0][0].real:.2e})+i({coupling_list[0][0].imag:.2e})\nCoupling current [A]:\t\t({coupling_list[0][1].real:.2e})+i({coupling_list[0][1].imag:.2e})\nCoupling impedance [Ω]:\t\t({coupling_list[0][2].real:.2e})+i({coupling_list[0][2].imag:.2e})")
     print("##################################################################################\n\n")
 
 def update_fixed_values():
@@ -260,7 +223,7 @@ def complex_algebra():
     y_2 = float(input("Enter Im(z_2):\t")) # Sets second imaginary component.
     print("\n")
     if (x_1 + y_1 + x_2 + y_2) != 0:
-        z_1, z_2 = [x_1, y_1], [x_2, y_2] # Pairs each component as a list.
+        z_1, z_2 = complex(x_1, y_1), complex(x_2, y_2) # Pairs each component as a complex number.
         operation = int(input("Select an operation:\n1) Addition.\n2) Subtraction.\n3) Multiplication.\n4) Division.\n5) Parallel components.\n0) Quit to main menu.\n\n"))
         print("\n")
         if operation != 0:
@@ -274,7 +237,7 @@ def complex_algebra():
                 result = divide(z_1, z_2)
             if operation == 5:
                 result = parallel(z_1, z_2)
-            print(f"Result:\t({result[0]})+i({result[1]})\n\n")
+            print(f"Result:\t({result.real})+i({result.imag})\n\n")
 
 def reset_variables():
     """ Reverts to the default values, rather than the last values calculated. Used in main(). """
@@ -284,14 +247,13 @@ def reset_variables():
     
 def reset_lists():
     """ Clears the data from the last calculation to prepare for the next. Used in main(). """
-    global total_list, frequency_list, inductor_list, coupling_list
+    global total_list, frequency_list, inductor_list, coupling_list, total_impedance, total_current
     if print_view == 1: print("reset_lists():\n")
     total_list.clear()
     frequency_list.clear()
     inductor_list.clear()
     coupling_list.clear()
-    total_impedance.clear()
-    total_current.clear()
+    total_impedance, total_current = 0j, 0j
     fixed_calculation_counter = 0
 
 def main():
@@ -335,10 +297,11 @@ def main():
 ###########################################################################
 # Global Script
 
-print("\n##################################################################################")
-print("Welcome!")
-print("##################################################################################\n\n")
-main()
+if __name__ == "__main__": # Allows the functions to be imported without starting the menus.
+    print("\n##################################################################################")
+    print("Welcome!")
+    print("##################################################################################\n\n")
+    main()
 
 
 ###########################################################################